@@ -0,0 +1,28 @@
+from typing import Any, Iterable, Iterator
+
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that serializes with pydantic-core in one pass.
+
+    Endpoints can return pydantic models (or lists/dicts of them) directly,
+    skipping jsonable_encoder's dict round-trip and the stdlib json encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _ndjson_lines(items: Iterable[Any]) -> Iterator[bytes]:
+    for item in items:
+        yield to_json(item) + b"\n"
+
+
+def ndjson_response(items: Iterable[Any], **kwargs: Any) -> StreamingResponse:
+    """Stream `items` as newline-delimited JSON, one line per item as it is produced."""
+    return StreamingResponse(_ndjson_lines(items), media_type=NDJSON_MEDIA_TYPE, **kwargs)
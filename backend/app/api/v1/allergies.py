@@ -1,13 +1,17 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import String, column, func, select, values
 from sqlalchemy.orm import Session
 
 from app.api import dependencies as deps
 from app.db.session import get_db
-from app.models.allergy import Allergy
-from app.models.ingredient import Ingredient
+from app.features.search.cache import InvalidCursorError, decode_cursor, encode_cursor
+from app.models.allergy import Allergy, AllergyIngredientMap, AllergyRecipeExclusion, allergy_terms
+from app.models.catalog import CatalogVersion
+from app.models.ingredient import Ingredient, RecipeIngredient
 from app.schemas.allergy_mapping import (
+    AllergyBulkMapRequest,
     AllergyCreate,
     AllergyIngredientMapCreate,
     AllergyOut,
@@ -39,14 +43,63 @@ def create_allergy(
 
     obj = Allergy(name=payload.name.strip(), description=payload.description)
     db.add(obj)
+    db.flush()
+    AllergyRecipeExclusion.refresh(db, [obj.id])
+    CatalogVersion.bump(db)
     db.commit()
     db.refresh(obj)
     return obj
 
 
+def _mapped_ingredients_page(
+    db: Session, allergy_id: int, limit: int, cursor: Optional[str]
+) -> tuple[list[MappedIngredientOut], Optional[str]]:
+    # One joined projection in ingredient id order; the cursor seeks past the
+    # last id on the uq_allergy_ingredient index.
+    stmt = (
+        select(AllergyIngredientMap.ingredient_id, Ingredient.name)
+        .join(Ingredient, Ingredient.id == AllergyIngredientMap.ingredient_id)
+        .where(AllergyIngredientMap.allergy_id == allergy_id)
+        .order_by(AllergyIngredientMap.ingredient_id.asc())
+        .limit(limit)
+    )
+    if cursor:
+        try:
+            token = decode_cursor(cursor, kind="mapped-ingredients")
+            if token.get("a") != allergy_id:
+                raise InvalidCursorError("Invalid cursor")
+            after_id = int(token["after"])
+        except (InvalidCursorError, KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        stmt = stmt.where(AllergyIngredientMap.ingredient_id > after_id)
+
+    rows = db.execute(stmt).all()
+    out = [MappedIngredientOut(ingredient_id=i, ingredient_name=name) for i, name in rows]
+    next_cursor: Optional[str] = None
+    if len(rows) == limit:
+        next_cursor = encode_cursor({"k": "mapped-ingredients", "a": allergy_id, "after": rows[-1][0]})
+    return out, next_cursor
+
+
+def _ingredient_ids_by_name(db: Session, names: list[str]) -> dict[str, int]:
+    # Case-insensitive exact names (lowest id per name) in one query on the
+    # lower(name) index.
+    name_rows = values(column("name", String), name="names").data([(n,) for n in names])
+    stmt = (
+        select(name_rows.c.name, func.min(Ingredient.id))
+        .select_from(name_rows)
+        .join(Ingredient, func.lower(Ingredient.name) == func.lower(name_rows.c.name))
+        .group_by(name_rows.c.name)
+    )
+    return dict(db.execute(stmt).all())
+
+
 @router.get("/{allergy_id}/mapped-ingredients", response_model=List[MappedIngredientOut])
 def list_mapped_ingredients(
     allergy_id: int,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user=Depends(deps.get_current_active_user),
 ) -> Any:
@@ -54,11 +107,9 @@ def list_mapped_ingredients(
     if allergy is None:
         raise HTTPException(status_code=404, detail="Allergy not found")
 
-    out: list[MappedIngredientOut] = []
-    for m in allergy.ingredient_mappings:
-        if m.ingredient is None:
-            continue
-        out.append(MappedIngredientOut(ingredient_id=m.ingredient_id, ingredient_name=m.ingredient.name))
+    out, next_cursor = _mapped_ingredients_page(db, allergy_id, limit, cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return out
 
 
@@ -66,6 +117,8 @@ def list_mapped_ingredients(
 def map_ingredient(
     allergy_id: int,
     payload: AllergyIngredientMapCreate,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db),
     current_user=Depends(deps.get_current_active_superuser),
 ) -> Any:
@@ -73,32 +126,34 @@ def map_ingredient(
     if allergy is None:
         raise HTTPException(status_code=404, detail="Allergy not found")
 
-    if payload.ingredient_id is None and not payload.ingredient_name:
+    ingredient_ids = set(payload.ingredient_ids)
+    if payload.ingredient_id is not None:
+        ingredient_ids.add(payload.ingredient_id)
+    names = sorted({n.strip() for n in [payload.ingredient_name or "", *payload.ingredient_names] if n.strip()})
+    if not ingredient_ids and not names:
         raise HTTPException(status_code=422, detail="Provide ingredient_id or ingredient_name")
 
-    ingredient: Ingredient | None = None
-    if payload.ingredient_id is not None:
-        ingredient = db.get(Ingredient, payload.ingredient_id)
-    else:
-        ingredient = (
-            db.query(Ingredient)
-            .filter(Ingredient.name.ilike(payload.ingredient_name.strip()))
-            .order_by(Ingredient.id.asc())
-            .first()
-        )
-
-    if ingredient is None:
-        raise HTTPException(status_code=404, detail="Ingredient not found")
-
-    allergy.add_ingredient_mapping(db=db, ingredient_id=ingredient.id)
+    if ingredient_ids:
+        found = set(db.execute(select(Ingredient.id).where(Ingredient.id.in_(ingredient_ids))).scalars())
+        missing = sorted(ingredient_ids - found)
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Unknown ingredient_id(s): {missing}")
+    if names:
+        by_name = _ingredient_ids_by_name(db, names)
+        missing_names = [n for n in names if n not in by_name]
+        if missing_names:
+            raise HTTPException(status_code=404, detail=f"Unknown ingredient name(s): {missing_names}")
+        ingredient_ids.update(by_name.values())
+
+    pairs = [(allergy.id, i) for i in ingredient_ids]
+    Allergy.map_ingredients(db, pairs)
+    AllergyRecipeExclusion.add_mapped(db, pairs)
+    CatalogVersion.bump(db)
     db.commit()
-    db.refresh(allergy)
 
-    out: list[MappedIngredientOut] = []
-    for m in allergy.ingredient_mappings:
-        if m.ingredient is None:
-            continue
-        out.append(MappedIngredientOut(ingredient_id=m.ingredient_id, ingredient_name=m.ingredient.name))
+    out, next_cursor = _mapped_ingredients_page(db, allergy_id, limit, None)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return out
 
 
@@ -117,32 +172,55 @@ def auto_map(
     if not name:
         raise HTTPException(status_code=400, detail="Allergy name is empty")
 
-    queries = {name}
-    if name.endswith("s") and len(name) > 3:
-        queries.add(name[:-1])
-
-    mapped_ids: set[int] = set()
-    for q in sorted(queries, key=len, reverse=True):
-        like = f"%{q}%"
-        rows = (
-            db.query(Ingredient)
-            .filter(Ingredient.name.ilike(like))
-            .order_by(Ingredient.id.asc())
-            .limit(limit)
-            .all()
-        )
-        for ing in rows:
-            mapped_ids.add(ing.id)
-            if len(mapped_ids) >= limit:
-                break
-        if len(mapped_ids) >= limit:
-            break
-
-    for ing_id in sorted(mapped_ids):
-        allergy.add_ingredient_mapping(db=db, ingredient_id=ing_id)
+    mapped_ids = Allergy.map_ingredients_by_terms(db, {allergy.id: allergy_terms(name)}, limit)[allergy.id]
+    AllergyRecipeExclusion.add_mapped(db, [(allergy.id, i) for i in mapped_ids])
+    CatalogVersion.bump(db)
+    db.commit()
+    return AutoMapResponse(allergy_id=allergy_id, mapped_count=len(mapped_ids), ingredient_ids=mapped_ids)
+
 
+@router.post("/bulk-map", response_model=List[AutoMapResponse])
+def bulk_map(
+    payload: AllergyBulkMapRequest,
+    db: Session = Depends(get_db),
+    current_user=Depends(deps.get_current_active_superuser),
+) -> Any:
+    allergy_ids = {item.allergy_id for item in payload.items}
+    names = dict(db.execute(select(Allergy.id, Allergy.name).where(Allergy.id.in_(allergy_ids))).all())
+    unknown = sorted(allergy_ids - set(names))
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown allergy_id(s): {unknown}")
+
+    ingredient_ids = {i for item in payload.items for i in item.ingredient_ids}
+    if ingredient_ids:
+        found = set(db.execute(select(Ingredient.id).where(Ingredient.id.in_(ingredient_ids))).scalars())
+        missing = sorted(ingredient_ids - found)
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Unknown ingredient_id(s): {missing}")
+
+    terms: dict[int, list[str]] = {}
+    explicit: dict[int, set[int]] = {allergy_id: set() for allergy_id in allergy_ids}
+    for item in payload.items:
+        explicit[item.allergy_id].update(item.ingredient_ids)
+        item_terms = list(item.terms)
+        if item.auto:
+            item_terms.extend(allergy_terms(names[item.allergy_id] or ""))
+        if item_terms:
+            terms.setdefault(item.allergy_id, []).extend(item_terms)
+
+    pairs = [(a, i) for a, ids in explicit.items() for i in ids]
+    Allergy.map_ingredients(db, pairs)
+    matched = Allergy.map_ingredients_by_terms(db, terms, payload.limit)
+    pairs.extend((a, i) for a, ids in matched.items() for i in ids)
+    AllergyRecipeExclusion.add_mapped(db, pairs)
+    CatalogVersion.bump(db)
     db.commit()
-    return AutoMapResponse(allergy_id=allergy_id, mapped_count=len(mapped_ids), ingredient_ids=sorted(mapped_ids))
+
+    out: list[AutoMapResponse] = []
+    for allergy_id in sorted(allergy_ids):
+        ids = sorted(explicit[allergy_id] | set(matched.get(allergy_id, [])))
+        out.append(AutoMapResponse(allergy_id=allergy_id, mapped_count=len(ids), ingredient_ids=ids))
+    return out
 
 
 @router.delete("/{allergy_id}/mapped-ingredients/{ingredient_id}", response_model=AutoMapResponse)
@@ -160,5 +238,12 @@ def unmap_ingredient(
     if not removed:
         raise HTTPException(status_code=404, detail="Mapping not found")
 
+    # Only recipes using the ingredient can lose this allergy's exclusion.
+    db.flush()
+    recipe_ids = db.execute(
+        select(RecipeIngredient.recipe_id).where(RecipeIngredient.ingredient_id == ingredient_id).distinct()
+    ).scalars().all()
+    AllergyRecipeExclusion.refresh(db, [allergy.id], recipe_ids=recipe_ids)
+    CatalogVersion.bump(db)
     db.commit()
     return AutoMapResponse(allergy_id=allergy_id, mapped_count=0, ingredient_ids=[])
@@ -29,6 +29,25 @@ class Settings(BaseSettings):
     # Gemini (LLM)
     GEMINI_API_KEY: str = ""
     GEMINI_MODEL: str = "gemini-1.5-flash"
+    GEMINI_TIMEOUT_SECONDS: float = 2.5
+    GEMINI_CIRCUIT_FAILURE_THRESHOLD: int = 3
+    GEMINI_CIRCUIT_COOLDOWN_SECONDS: float = 60.0
+
+    # Search pagination (server-side state kept behind cursors)
+    SEARCH_CURSOR_TTL_SECONDS: int = 900
+    SEARCH_CURSOR_CACHE_SIZE: int = 2048
+
+    # First-page search results, keyed by query, allergies, BMI bucket and catalog version
+    SEARCH_RESULT_CACHE_SIZE: int = 1024
+    SEARCH_RESULT_CACHE_TTL_SECONDS: int = 300
+    SEARCH_CATALOG_VERSION_MAX_AGE_SECONDS: float = 2.0
+
+    # Semantic (TF-IDF) search index; empty path keeps it in memory only
+    SEARCH_SEMANTIC_INDEX_PATH: str = ""
+    SEARCH_SEMANTIC_INDEX_TTL_SECONDS: int = 600
+
+    # Memory-mapped catalog snapshot (app.scripts.export_catalog_snapshot); empty disables it
+    CATALOG_SNAPSHOT_PATH: str = ""
     
     # First superuser
     FIRST_SUPERUSER_EMAIL: str = "admin@example.com"
@@ -38,6 +57,11 @@ class Settings(BaseSettings):
     SEED_DEFAULT_ALLERGIES: bool = True
     SEED_DEFAULT_ALLERGIES_AUTOMAP_LIMIT: int = 25
 
+    # Background mapping of ingredients created by ingest to existing allergies
+    ALLERGY_REMAP_WORKER: bool = True
+    ALLERGY_REMAP_INTERVAL_SECONDS: float = 30.0
+    ALLERGY_REMAP_BATCH_SIZE: int = 1000
+
     class Config:
         case_sensitive = True
         env_file = str(env_path)
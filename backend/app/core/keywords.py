@@ -0,0 +1,81 @@
+from typing import Dict, Generic, Iterable, Iterator, List, Set, Tuple, TypeVar
+
+
+V = TypeVar("V")
+
+
+def _is_word_char(ch: str) -> bool:
+    # Same characters as regex \w.
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher(Generic[V]):
+    """Aho-Corasick automaton that finds every keyword of a fixed set in one pass.
+
+    Keywords map to a value (a category); matching is case-insensitive. `words`
+    only match as whole words (like regex \\b...\\b), `substrings` match
+    anywhere. Transitions are precomputed, so scanning costs one dict lookup
+    per character however many keywords there are.
+    """
+
+    def __init__(
+        self,
+        words: Iterable[Tuple[str, V]] = (),
+        substrings: Iterable[Tuple[str, V]] = (),
+    ) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        # Per state: (keyword length, whole word, value) of keywords ending here.
+        out: List[List[Tuple[int, bool, V]]] = [[]]
+        for whole_word, keywords in ((True, words), (False, substrings)):
+            for keyword, value in keywords:
+                key = keyword.lower()
+                if not key:
+                    continue
+                state = 0
+                for ch in key:
+                    nxt = goto[state].get(ch)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto[state][ch] = nxt
+                        goto.append({})
+                        out.append([])
+                    state = nxt
+                out[state].append((len(key), whole_word, value))
+
+        # Breadth-first: fail links, inherited outputs, then full transitions.
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in range(len(goto) - 1)]
+        queue = list(goto[0].values())
+        for state in queue:
+            f = fail[state]
+            out[state] = out[state] + out[f]
+            delta[state] = {**delta[f], **goto[state]}
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[f].get(ch, 0)
+                queue.append(nxt)
+
+        self._delta = delta
+        self._out = out
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, V]]:
+        """(start, end, value) of every keyword occurrence in `text.lower()`."""
+        text = text.lower()
+        delta, out = self._delta, self._out
+        state = 0
+        n = len(text)
+        for i, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            if not out[state]:
+                continue
+            end = i + 1
+            for length, whole_word, value in out[state]:
+                start = end - length
+                if whole_word and (
+                    (start > 0 and _is_word_char(text[start - 1])) or (end < n and _is_word_char(text[end]))
+                ):
+                    continue
+                yield start, end, value
+
+    def values(self, text: str) -> Set[V]:
+        """Every value with at least one keyword in `text`."""
+        return {value for _, _, value in self.finditer(text)}
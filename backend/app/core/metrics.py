@@ -0,0 +1,103 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Seconds; covers sub-millisecond cache hits up to a slow LLM call.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one label, rendered in Prometheus text format."""
+
+    def __init__(self, name: str, help_text: str, label: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # label value -> (per-bucket counts incl. +Inf, sum, count)
+        self._series: Dict[str, Tuple[List[int], float, int]] = {}
+
+    def observe(self, label_value: str, seconds: float) -> None:
+        idx = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            counts, total, n = self._series.get(label_value) or ([0] * (len(self.buckets) + 1), 0.0, 0)
+            counts[idx] += 1
+            self._series[label_value] = (counts, total + seconds, n + 1)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {k: (list(c), s, n) for k, (c, s, n) in self._series.items()}
+        for value in sorted(series):
+            counts, total, n = series[value]
+            running = 0
+            for bound, c in zip(self.buckets, counts):
+                running += c
+                lines.append(f'{self.name}_bucket{{{self.label}="{value}",le="{bound:g}"}} {running}')
+            lines.append(f'{self.name}_bucket{{{self.label}="{value}",le="+Inf"}} {n}')
+            lines.append(f'{self.name}_sum{{{self.label}="{value}"}} {total:.6f}')
+            lines.append(f'{self.name}_count{{{self.label}="{value}"}} {n}')
+        return lines
+
+
+_registry: Dict[str, Histogram] = {}
+_registry_lock = threading.Lock()
+
+
+def histogram(name: str, help_text: str, label: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    with _registry_lock:
+        h = _registry.get(name)
+        if h is None:
+            h = _registry[name] = Histogram(name, help_text, label, buckets)
+        return h
+
+
+def render_all() -> str:
+    with _registry_lock:
+        hists = [_registry[k] for k in sorted(_registry)]
+    lines: List[str] = []
+    for h in hists:
+        lines.extend(h.render())
+    return "\n".join(lines) + "\n"
+
+
+class StageTimer:
+    """Times named stages of one request into a histogram.
+
+    Durations are always observed; `timings` keeps per-request milliseconds
+    (summed when a stage repeats) for callers that want to return them.
+    """
+
+    def __init__(self, hist: Histogram) -> None:
+        self.hist = hist
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float) -> None:
+        self.hist.observe(name, seconds)
+        self.timings[name] = round(self.timings.get(name, 0.0) + seconds * 1000.0, 3)
+
+
+def stage(timer: Optional[StageTimer], name: str):
+    """`timer.stage(name)`, or a no-op context when timing is not wired through."""
+    if timer is None:
+        return _noop()
+    return timer.stage(name)
+
+
+@contextmanager
+def _noop() -> Iterator[None]:
+    yield
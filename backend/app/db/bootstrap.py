@@ -0,0 +1,245 @@
+"""Create and upgrade tables and seed startup data.
+
+This used to run when app.main was imported, in every API worker. It now
+runs once per deploy, before the workers start:
+
+    python -m app.scripts.bootstrap
+
+Concurrent runs are serialized by a Postgres advisory lock.
+"""
+
+import logging
+
+from sqlalchemy import exists, func, inspect, select, text
+from sqlalchemy.dialects.postgresql import insert
+
+from app import models
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.db.session import engine, SessionLocal, Base
+from app.models.allergy import (
+    ALLERGY_ALIASES,
+    DEFAULT_ALLERGIES,
+    Allergy,
+    AllergyIngredientMap,
+    AllergyRecipeExclusion,
+)
+from app.models.catalog import CatalogVersion
+from app.models.ingredient import Ingredient, RecipeIngredient
+from app.models.recipe import RecipeCard, RecipeNutritionalInfo
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# create_all() needs every model registered on Base.
+_ = models
+
+# Session-level advisory lock key ("mpboot"), held for a whole bootstrap run.
+BOOTSTRAP_LOCK_KEY = 0x6D70626F6F74
+
+
+def _ensure_user_is_superuser_column() -> None:
+    insp = inspect(engine)
+    try:
+        cols = {c.get("name") for c in insp.get_columns("users")}
+    except Exception:
+        return
+    if "is_superuser" in cols:
+        return
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE users ADD COLUMN is_superuser BOOLEAN DEFAULT FALSE"))
+        conn.execute(text("UPDATE users SET is_superuser = FALSE WHERE is_superuser IS NULL"))
+
+def _ensure_allergen_mask_columns() -> bool:
+    # Filled in by the allergy exclusion refresh; returns True when a column was added.
+    insp = inspect(engine)
+    try:
+        recipe_cols = {c.get("name") for c in insp.get_columns("recipes")}
+        allergy_cols = {c.get("name") for c in insp.get_columns("allergies")}
+    except Exception:
+        return False
+    if "allergen_mask" in recipe_cols and "mask_bit" in allergy_cols:
+        return False
+    with engine.begin() as conn:
+        if "allergen_mask" not in recipe_cols:
+            conn.execute(text("ALTER TABLE recipes ADD COLUMN allergen_mask BIGINT NOT NULL DEFAULT 0"))
+        if "mask_bit" not in allergy_cols:
+            conn.execute(text("ALTER TABLE allergies ADD COLUMN mask_bit SMALLINT UNIQUE"))
+    return True
+
+
+def _ensure_nutrition_search_indexes() -> None:
+    # create_all() skips tables that already exist; add the generated
+    # calorie_bucket column and the nutrient indexes search filters rely on.
+    insp = inspect(engine)
+    try:
+        cols = {c.get("name") for c in insp.get_columns("recipe_nutritional_info")}
+    except Exception:
+        return
+    table = RecipeNutritionalInfo.__table__
+    if "calorie_bucket" not in cols:
+        expr = table.c.calorie_bucket.computed.sqltext
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"ALTER TABLE recipe_nutritional_info ADD COLUMN calorie_bucket VARCHAR GENERATED ALWAYS AS ({expr}) STORED"
+            ))
+    for index in table.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+def _ensure_ingredient_name_index() -> None:
+    # Unique lower(name) index for ingredient upserts; it cannot be built while
+    # ingredients differ only by case, so those databases keep working without it.
+    index = next(i for i in Ingredient.__table__.indexes if i.name == "uq_ingredients_lower_name")
+    insp = inspect(engine)
+    try:
+        names = {i.get("name") for i in insp.get_indexes("ingredients")}
+    except Exception:
+        return
+    if index.name in names:
+        return
+    with engine.begin() as conn:
+        dupes = conn.execute(text(
+            "SELECT count(*) FROM (SELECT 1 FROM ingredients GROUP BY lower(name) HAVING count(*) > 1) d"
+        )).scalar()
+        if dupes:
+            logger.warning("%s not created: %d ingredient names differ only by case", index.name, dupes)
+            return
+        index.create(bind=conn)
+
+def _ensure_first_superuser() -> None:
+    email = getattr(settings, "FIRST_SUPERUSER_EMAIL", "") or ""
+    password = getattr(settings, "FIRST_SUPERUSER_PASSWORD", "") or ""
+    email = email.strip()
+    if not email or not password:
+        return
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == email).first()
+        if user is None:
+            user = User(
+                email=email,
+                hashed_password=get_password_hash(password),
+                full_name="Admin",
+                is_active=True,
+                is_superuser=True,
+            )
+            db.add(user)
+            db.commit()
+            return
+
+        if not getattr(user, "is_superuser", False):
+            user.is_superuser = True
+            db.commit()
+    finally:
+        db.close()
+
+def _ensure_default_allergies() -> bool:
+    # Returns True when an allergy or mapping was added.
+    if not getattr(settings, "SEED_DEFAULT_ALLERGIES", True):
+        return False
+
+    limit = int(getattr(settings, "SEED_DEFAULT_ALLERGIES_AUTOMAP_LIMIT", 25) or 25)
+    if limit < 1:
+        limit = 1
+
+    db = SessionLocal()
+    try:
+        # Existing allergies match case-insensitively; missing ones are added in one INSERT.
+        key = func.lower(Allergy.name)
+        ids: dict[str, int] = dict(
+            db.execute(select(key, Allergy.id).where(key.in_([name for name, _ in DEFAULT_ALLERGIES]))).all()
+        )
+        missing = [{"name": name, "description": desc} for name, desc in DEFAULT_ALLERGIES if name not in ids]
+        if missing:
+            stmt = insert(Allergy).values(missing).on_conflict_do_nothing(index_elements=[Allergy.name])
+            ids.update({name: allergy_id for allergy_id, name in db.execute(stmt.returning(Allergy.id, Allergy.name))})
+
+        # Only allergies with no mappings yet are auto-mapped.
+        unmapped = set(
+            db.execute(
+                select(Allergy.id).where(
+                    Allergy.id.in_(ids.values()),
+                    ~exists().where(AllergyIngredientMap.allergy_id == Allergy.id),
+                )
+            ).scalars()
+        )
+        matched = Allergy.map_ingredients_by_terms(
+            db,
+            {allergy_id: ALLERGY_ALIASES.get(name, []) for name, allergy_id in ids.items() if allergy_id in unmapped},
+            limit,
+        )
+        db.commit()
+        return bool(missing) or any(matched.values())
+    finally:
+        db.close()
+
+def _exclusions_missing() -> bool:
+    # An empty exclusion table while allergies and recipe links exist: created
+    # by a migration or create_all, or never refreshed since.
+    with engine.connect() as conn:
+        return bool(
+            conn.execute(
+                select(
+                    ~exists().select_from(AllergyRecipeExclusion)
+                    & exists().select_from(Allergy)
+                    & exists().select_from(RecipeIngredient)
+                )
+            ).scalar()
+        )
+
+def _refresh_allergy_exclusions() -> None:
+    db = SessionLocal()
+    try:
+        AllergyRecipeExclusion.refresh(db)
+        CatalogVersion.bump(db)
+        db.commit()
+    finally:
+        db.close()
+
+def _ensure_recipe_cards() -> None:
+    # Recipes added outside the seed script get a card on next startup.
+    db = SessionLocal()
+    try:
+        if RecipeCard.refresh(db, only_missing=True):
+            CatalogVersion.bump(db)
+        db.commit()
+    finally:
+        db.close()
+
+
+def bootstrap() -> bool:
+    """Run every startup step unless another process is already doing it.
+
+    Returns False when another run held the lock; this one waits for it to
+    finish and then returns without repeating the work.
+    """
+    # Session-level lock on an autocommit connection, so it is not left idle in
+    # a transaction for the whole run.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+        acquired = lock_conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": BOOTSTRAP_LOCK_KEY}).scalar()
+        if not acquired:
+            logger.info("Another bootstrap run holds the lock; waiting for it to finish")
+            lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": BOOTSTRAP_LOCK_KEY})
+        try:
+            if not acquired:
+                return False
+            existing = set(inspect(engine).get_table_names())
+            Base.metadata.create_all(bind=engine)
+            changed = bool(set(Base.metadata.tables) - existing)
+            _ensure_user_is_superuser_column()
+            changed |= _ensure_allergen_mask_columns()
+            _ensure_nutrition_search_indexes()
+            _ensure_ingredient_name_index()
+            _ensure_first_superuser()
+            changed |= _ensure_default_allergies()
+            # Exclusions and masks only depend on the schema, allergies and
+            # mappings; the API and ingest keep them current otherwise.
+            if changed or _exclusions_missing():
+                _refresh_allergy_exclusions()
+            else:
+                logger.info("Allergy exclusions are up to date")
+            _ensure_recipe_cards()
+            return True
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": BOOTSTRAP_LOCK_KEY})
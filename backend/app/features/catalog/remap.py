@@ -0,0 +1,69 @@
+import logging
+import threading
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.allergy import IngredientRemapQueue
+
+
+logger = logging.getLogger(__name__)
+
+
+def drain_remap_queue(db: Session, batch_size: int = 1000) -> tuple[int, int]:
+    """Map every queued ingredient, committing per batch; returns (ingredients, matches)."""
+    ingredients = matches = 0
+    while True:
+        done, matched = IngredientRemapQueue.drain(db, batch_size)
+        db.commit()
+        if not done:
+            return ingredients, matches
+        ingredients += done
+        matches += matched
+
+
+class RemapWorker:
+    """Daemon thread that drains the ingredient re-mapping queue every `interval` seconds.
+
+    Several API workers may each run one; drains claim rows with SKIP LOCKED.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        batch_size: int = 1000,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ) -> None:
+        self.interval = max(float(interval), 1.0)
+        self.batch_size = max(int(batch_size), 1)
+        self._session_factory = session_factory
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="allergy-remap", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        # The first drain waits one interval, so worker boot does no database work.
+        while not self._stop.wait(self.interval):
+            db = self._session_factory()
+            try:
+                ingredients, matches = drain_remap_queue(db, self.batch_size)
+                if ingredients:
+                    logger.info("Re-mapped %d new ingredients to allergies (%d matches)", ingredients, matches)
+            except Exception:
+                db.rollback()
+                logger.exception("Allergy re-mapping failed")
+            finally:
+                db.close()
@@ -0,0 +1,349 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.allergy import Allergy, AllergyRecipeExclusion
+from app.models.catalog import CatalogVersion
+from app.models.ingredient import Ingredient, RecipeIngredient
+from app.models.recipe import CuisineType, Recipe, RecipeNutritionalInfo
+
+
+# File layout: magic, format version, header length, JSON header, then every
+# array at a 64-byte aligned offset listed in the header.
+_MAGIC = b"MPCATSNP"
+FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct("<8sIIQ")
+_ALIGN = 64
+
+NUTRIENT_COLUMNS = ("calories", "protein_g", "carbs_g", "fat_g", "fiber_g", "sugar_g", "sodium_mg")
+# Bit i of `flags` is FLAG_BITS[i].
+FLAG_BITS = ("is_vegetarian", "is_vegan", "is_gluten_free", "is_dairy_free", "has_nutrition")
+# Code 0 is "no cuisine"; code i + 1 is CUISINES[i].
+CUISINES = tuple(c.name for c in CuisineType)
+# Arrays of a RecipeVectorIndex (app.features.search.semantic) stored as "semantic.<name>".
+SEMANTIC_ARRAYS = ("recipe_ids", "indptr", "indices", "data", "idf")
+
+
+class SnapshotFormatError(ValueError):
+    pass
+
+
+class StringTable:
+    """Strings packed into one UTF-8 blob, sliced by an offsets array."""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray) -> None:
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return int(self._offsets.shape[0]) - 1
+
+    def __getitem__(self, i: int) -> str:
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        return self._blob[start:end].tobytes().decode("utf-8")
+
+
+def _pack_strings(values: Iterable[str], blob: bytearray) -> np.ndarray:
+    offsets = [len(blob)]
+    for value in values:
+        blob += (value or "").encode("utf-8")
+        offsets.append(len(blob))
+    return np.asarray(offsets, dtype=np.int64)
+
+
+def export_snapshot(
+    db: Session,
+    path: str,
+    *,
+    semantic_arrays: Optional[Dict[str, np.ndarray]] = None,
+    semantic_built_at: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Write the recipe catalog to `path` as one memory-mappable file; returns its header.
+
+    Every query runs in one REPEATABLE READ transaction, so the arrays agree
+    with each other and with the recorded catalog version. The file is written
+    beside `path` and renamed over it, so processes that already mapped the
+    old file keep a consistent view.
+    """
+    db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    catalog_version = CatalogVersion.current(db)
+
+    recipes = db.execute(
+        select(
+            Recipe.id,
+            Recipe.name,
+            Recipe.prep_time,
+            Recipe.cook_time,
+            Recipe.servings,
+            Recipe.cuisine_type,
+            Recipe.is_vegetarian,
+            Recipe.is_vegan,
+            Recipe.is_gluten_free,
+            Recipe.is_dairy_free,
+            RecipeNutritionalInfo.calories,
+            RecipeNutritionalInfo.protein_g,
+            RecipeNutritionalInfo.carbs_g,
+            RecipeNutritionalInfo.fat_g,
+            RecipeNutritionalInfo.fiber_g,
+            RecipeNutritionalInfo.sugar_g,
+            RecipeNutritionalInfo.sodium_mg,
+        )
+        .outerjoin(RecipeNutritionalInfo, RecipeNutritionalInfo.recipe_id == Recipe.id)
+        .order_by(Recipe.id)
+    ).all()
+    n = len(recipes)
+    recipe_ids = np.fromiter((r[0] for r in recipes), dtype=np.int64, count=n)
+    # prep_time, cook_time, servings; -1 where unknown.
+    times = np.array(
+        [[-1 if v is None else v for v in r[2:5]] for r in recipes], dtype=np.int32
+    ).reshape(n, 3)
+    cuisine_codes = {c: i + 1 for i, c in enumerate(CuisineType)}
+    cuisine = np.fromiter((cuisine_codes.get(r[5], 0) for r in recipes), dtype=np.uint8, count=n)
+    flags = np.zeros(n, dtype=np.uint8)
+    for bit, col in enumerate(range(6, 10)):
+        flags |= np.fromiter((bool(r[col]) for r in recipes), dtype=np.uint8, count=n) << bit
+    has_nutrition = np.fromiter((r[10] is not None for r in recipes), dtype=np.uint8, count=n)
+    flags |= has_nutrition << FLAG_BITS.index("has_nutrition")
+    nutrients = np.array(
+        [[np.nan if v is None else v for v in r[10:17]] for r in recipes], dtype=np.float32
+    ).reshape(n, len(NUTRIENT_COLUMNS))
+
+    ingredients = db.execute(select(Ingredient.id, Ingredient.name).order_by(Ingredient.id)).all()
+    ingredient_ids = np.fromiter((r[0] for r in ingredients), dtype=np.int64, count=len(ingredients))
+
+    # CSR recipe -> ingredient: row i lists positions in ingredient_ids, in recipe order.
+    links = np.array(
+        db.execute(
+            select(RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id)
+            .order_by(RecipeIngredient.recipe_id, RecipeIngredient.id)
+        ).all(),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    link_rows = np.searchsorted(recipe_ids, links[:, 0])
+    ingredient_indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(link_rows, minlength=n), out=ingredient_indptr[1:])
+    ingredient_indices = np.searchsorted(ingredient_ids, links[:, 1]).astype(np.int32)
+
+    # One packed bitmap over recipes per allergy: bit set = recipe excluded.
+    allergies = db.execute(select(Allergy.id, Allergy.name).order_by(Allergy.id)).all()
+    allergy_ids = np.fromiter((r[0] for r in allergies), dtype=np.int64, count=len(allergies))
+    excluded = np.zeros((len(allergies), n), dtype=bool)
+    pairs = np.array(
+        db.execute(select(AllergyRecipeExclusion.allergy_id, AllergyRecipeExclusion.recipe_id)).all(),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    if pairs.size:
+        excluded[np.searchsorted(allergy_ids, pairs[:, 0]), np.searchsorted(recipe_ids, pairs[:, 1])] = True
+    allergen_bitmaps = np.packbits(excluded, axis=1, bitorder="little")
+
+    blob = bytearray()
+    arrays: Dict[str, np.ndarray] = {
+        "recipe_ids": recipe_ids,
+        "nutrients": nutrients,
+        "times": times,
+        "flags": flags,
+        "cuisine": cuisine,
+        "ingredient_ids": ingredient_ids,
+        "ingredient_indptr": ingredient_indptr,
+        "ingredient_indices": ingredient_indices,
+        "allergy_ids": allergy_ids,
+        "allergen_bitmaps": allergen_bitmaps,
+        "recipe_names": _pack_strings((r[1] for r in recipes), blob),
+        "ingredient_names": _pack_strings((r[1] for r in ingredients), blob),
+        "allergy_names": _pack_strings((r[1] for r in allergies), blob),
+    }
+    arrays["strings"] = np.frombuffer(bytes(blob), dtype=np.uint8)
+    for name, array in (semantic_arrays or {}).items():
+        arrays[f"semantic.{name}"] = array
+
+    header: Dict[str, Any] = {
+        "format": FORMAT_VERSION,
+        "catalog_version": catalog_version,
+        "created_at": time.time(),
+        "semantic_built_at": semantic_built_at,
+        "nutrient_columns": list(NUTRIENT_COLUMNS),
+        "flag_bits": list(FLAG_BITS),
+        "cuisines": list(CUISINES),
+        "counts": {"recipes": n, "ingredients": len(ingredients), "allergies": len(allergies)},
+        "arrays": {},
+    }
+    # Offsets depend on the header length, so lay out against a size estimate
+    # and grow it until the encoded header fits.
+    reserved = 4096
+    while True:
+        offset = _align(_PREAMBLE.size + reserved)
+        layout: Dict[str, Dict[str, Any]] = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            arrays[name] = array
+            layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+            offset = _align(offset + array.nbytes)
+        header["arrays"] = layout
+        encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        if len(encoded) <= reserved:
+            break
+        reserved = len(encoded) * 2
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_PREAMBLE.pack(_MAGIC, FORMAT_VERSION, 0, len(encoded)))
+        f.write(encoded)
+        for name, array in arrays.items():
+            f.seek(layout[name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(offset)
+    os.replace(tmp, path)
+    return header
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class CatalogSnapshot:
+    """Read-only view of a file written by export_snapshot.
+
+    The file is memory-mapped and every array is a zero-copy numpy view of it,
+    so opening costs one header parse, and processes that map the same file
+    share one page-cache copy.
+    """
+
+    def __init__(self, path: str, header: Dict[str, Any], mm: mmap.mmap) -> None:
+        self.path = path
+        self.header = header
+        self._mm = mm
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def open(cls, path: str) -> "CatalogSnapshot":
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, _, header_len = _PREAMBLE.unpack_from(mm, 0)
+            if magic != _MAGIC:
+                raise SnapshotFormatError(f"{path} is not a catalog snapshot")
+            if version != FORMAT_VERSION:
+                raise SnapshotFormatError(f"{path} has snapshot format {version}, expected {FORMAT_VERSION}")
+            header = json.loads(mm[_PREAMBLE.size:_PREAMBLE.size + header_len])
+        except Exception:
+            mm.close()
+            raise
+        return cls(path, header, mm)
+
+    def close(self) -> None:
+        self._arrays.clear()
+        try:
+            self._mm.close()
+        except BufferError:
+            # Views handed out are still alive; the mapping closes with them.
+            pass
+
+    @property
+    def catalog_version(self) -> int:
+        return int(self.header["catalog_version"])
+
+    @property
+    def size(self) -> int:
+        return int(self.header["counts"]["recipes"])
+
+    def has(self, name: str) -> bool:
+        return name in self.header["arrays"]
+
+    def array(self, name: str) -> np.ndarray:
+        array = self._arrays.get(name)
+        if array is None:
+            spec = self.header["arrays"][name]
+            dtype = np.dtype(spec["dtype"])
+            shape = tuple(spec["shape"])
+            count = int(np.prod(shape)) if shape else 1
+            array = np.frombuffer(self._mm, dtype=dtype, count=count, offset=spec["offset"]).reshape(shape)
+            self._arrays[name] = array
+        return array
+
+    @property
+    def recipe_ids(self) -> np.ndarray:
+        return self.array("recipe_ids")
+
+    def positions(self, recipe_ids: Sequence[int]) -> np.ndarray:
+        """Row of each recipe id in the snapshot arrays, -1 when absent."""
+        ids = np.asarray(recipe_ids, dtype=np.int64)
+        all_ids = self.recipe_ids
+        pos = np.searchsorted(all_ids, ids)
+        found = pos < all_ids.shape[0]
+        found[found] = all_ids[pos[found]] == ids[found]
+        return np.where(found, pos, -1)
+
+    def nutrient(self, column: str) -> np.ndarray:
+        """One NUTRIENT_COLUMNS column for every recipe; NaN where unknown."""
+        return self.array("nutrients")[:, self.header["nutrient_columns"].index(column)]
+
+    def flag(self, name: str) -> np.ndarray:
+        bit = self.header["flag_bits"].index(name)
+        return (self.array("flags") >> bit) & 1 == 1
+
+    def cuisine(self, row: int) -> Optional[CuisineType]:
+        code = int(self.array("cuisine")[row])
+        return CuisineType[self.header["cuisines"][code - 1]] if code else None
+
+    def recipe_name(self, row: int) -> str:
+        return self._strings("recipe_names")[row]
+
+    def ingredient_ids_of(self, row: int) -> np.ndarray:
+        indptr = self.array("ingredient_indptr")
+        positions = self.array("ingredient_indices")[indptr[row]:indptr[row + 1]]
+        return self.array("ingredient_ids")[positions]
+
+    def ingredient_names_of(self, row: int) -> List[str]:
+        indptr = self.array("ingredient_indptr")
+        names = self._strings("ingredient_names")
+        return [names[int(j)] for j in self.array("ingredient_indices")[indptr[row]:indptr[row + 1]]]
+
+    def excluded(self, allergy_ids: Iterable[int]) -> np.ndarray:
+        """Boolean mask over recipes excluded by any of `allergy_ids`."""
+        known = self.array("allergy_ids")
+        wanted = np.isin(known, np.fromiter((int(a) for a in allergy_ids), dtype=np.int64))
+        if not wanted.any():
+            return np.zeros(self.size, dtype=bool)
+        packed = np.bitwise_or.reduce(self.array("allergen_bitmaps")[wanted], axis=0)
+        return np.unpackbits(packed, count=self.size, bitorder="little").astype(bool)
+
+    def semantic_arrays(self) -> Optional[Dict[str, np.ndarray]]:
+        if not all(self.has(f"semantic.{name}") for name in SEMANTIC_ARRAYS):
+            return None
+        return {name: self.array(f"semantic.{name}") for name in SEMANTIC_ARRAYS}
+
+    def _strings(self, kind: str) -> StringTable:
+        return StringTable(self.array("strings"), self.array(kind))
+
+
+_snapshot: Optional[Tuple[Tuple[str, int, int], CatalogSnapshot]] = None
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot(path: str) -> Optional[CatalogSnapshot]:
+    """The snapshot at `path`, re-mapped when the file is replaced; None if there is none."""
+    global _snapshot
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (path, st.st_ino, st.st_mtime_ns)
+    cached = _snapshot
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with _snapshot_lock:
+        if _snapshot is not None and _snapshot[0] == key:
+            return _snapshot[1]
+        snapshot = CatalogSnapshot.open(path)
+        # The previous mapping is left to the garbage collector: arrays handed
+        # out from it may still be in use.
+        _snapshot = (key, snapshot)
+        return snapshot
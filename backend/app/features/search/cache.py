@@ -0,0 +1,67 @@
+import base64
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Optional, TypeVar
+
+
+V = TypeVar("V")
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+class TTLCache(Generic[V]):
+    """Small thread-safe LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = max(int(maxsize), 1)
+        self.ttl = float(ttl)
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, tuple[float, V]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= now:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: V) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    raw = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, *, kind: str) -> Dict[str, Any]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise InvalidCursorError("Invalid cursor")
+    if not isinstance(payload, dict) or payload.get("k") != kind:
+        raise InvalidCursorError("Invalid cursor")
+    return payload
@@ -1,34 +1,118 @@
-from typing import Any
+from typing import Any, Optional, Union
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.api import dependencies as deps
+from app.api.responses import FastJSONResponse, ndjson_response
 from app.db.session import get_db
 from app.models.user import User
 
-from .schemas import RecipeResult, SearchNLRequest, SearchResponse
-from .service import list_recipes, search_nl
+from .cache import InvalidCursorError
+from .schemas import (
+    RecipeResult,
+    RecipeSummary,
+    ResultView,
+    SearchBatchResponse,
+    SearchNLBatchRequest,
+    SearchNLRequest,
+    SearchResponse,
+)
+from .service import iter_recipes, iter_search_nl, list_recipes, search_nl, search_nl_batch
 
 
 router = APIRouter()
 
 
-@router.get("/recipes", response_model=list[RecipeResult])
+@router.get(
+    "/recipes",
+    response_model=list[Union[RecipeResult, RecipeSummary]],
+    response_class=FastJSONResponse,
+)
 def get_recipes(
     limit: int = 10,
+    cursor: Optional[str] = None,
+    view: ResultView = ResultView.FULL,
+    stream: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     # current_user kept to match existing auth patterns; not used yet.
-    return list_recipes(db=db, limit=limit)
+    if stream:
+        # NDJSON, one recipe per line, for exports; no X-Next-Cursor.
+        try:
+            items = iter_recipes(db=db, limit=limit, cursor=cursor, view=view)
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return ndjson_response(items)
+    try:
+        results, next_cursor = list_recipes(db=db, limit=limit, cursor=cursor, view=view)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Results are already built from the response models; returning the
+    # response directly skips re-validation and jsonable_encoder.
+    response = FastJSONResponse(results)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
 
 
-@router.post("/nl", response_model=SearchResponse)
+@router.post("/nl", response_model=SearchResponse, response_class=FastJSONResponse)
 def search_natural_language(
     payload: SearchNLRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
-    parsed, applied, results = search_nl(db=db, user=current_user, query=payload.query, limit=payload.limit)
-    return {"applied": applied, "results": results}
+    if payload.stream:
+        try:
+            items = iter_search_nl(
+                db=db,
+                user=current_user,
+                query=payload.query,
+                limit=payload.limit,
+                cursor=payload.cursor,
+                view=payload.view,
+                mode=payload.mode,
+                facets=payload.facets,
+            )
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return ndjson_response(items)
+    try:
+        parsed, applied, results, next_cursor = search_nl(
+            db=db,
+            user=current_user,
+            query=payload.query,
+            limit=payload.limit,
+            cursor=payload.cursor,
+            view=payload.view,
+            mode=payload.mode,
+            debug=payload.debug,
+            facets=payload.facets,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse({"applied": applied, "results": results, "next_cursor": next_cursor})
+
+
+@router.post("/nl/batch", response_model=SearchBatchResponse, response_class=FastJSONResponse)
+def search_natural_language_batch(
+    payload: SearchNLBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    outputs = search_nl_batch(
+        db=db,
+        user=current_user,
+        queries=payload.queries,
+        limit=payload.limit,
+        view=payload.view,
+        mode=payload.mode,
+        debug=payload.debug,
+    )
+    return FastJSONResponse({
+        "responses": [
+            {"applied": applied, "results": results, "next_cursor": next_cursor}
+            for _, applied, results, next_cursor in outputs
+        ]
+    })
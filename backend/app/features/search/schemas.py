@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Annotated, Any, Dict, List, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -15,9 +15,43 @@ class DietType(str, Enum):
     NON_VEG = "non_veg"
 
 
+class ResultView(str, Enum):
+    SUMMARY = "summary"
+    FULL = "full"
+
+
+class SearchMode(str, Enum):
+    KEYWORD = "keyword"
+    SEMANTIC = "semantic"
+
+
 class SearchNLRequest(BaseModel):
     query: str = Field(..., min_length=1)
     limit: int = Field(10, ge=1, le=50)
+    # next_cursor from a previous response; the query is not re-parsed.
+    cursor: Optional[str] = None
+    # "summary" omits instructions and ingredient lists (card views).
+    view: ResultView = ResultView.FULL
+    # "semantic" ranks by local TF-IDF similarity (catches near-synonyms).
+    mode: SearchMode = SearchMode.KEYWORD
+    # Adds per-stage timings (ms) under applied["timings"].
+    debug: bool = False
+    # Adds match counts per calorie bucket, cuisine and macro flag under applied["facets"].
+    facets: bool = False
+    # Stream results as NDJSON, then one {"applied", "next_cursor"} line.
+    stream: bool = False
+
+
+MAX_BATCH_QUERIES = 10
+
+
+class SearchNLBatchRequest(BaseModel):
+    # First pages only; page further with /search/nl and each next_cursor.
+    queries: List[Annotated[str, Field(min_length=1)]] = Field(..., min_length=1, max_length=MAX_BATCH_QUERIES)
+    limit: int = Field(10, ge=1, le=50)
+    view: ResultView = ResultView.FULL
+    mode: SearchMode = SearchMode.KEYWORD
+    debug: bool = False
 
 
 class ParsedQuery(BaseModel):
@@ -28,7 +62,7 @@ class ParsedQuery(BaseModel):
     wants_high_calorie: bool = False
 
 
-class RecipeResult(BaseModel):
+class RecipeSummary(BaseModel):
     id: int
     name: str
     description: Optional[str] = None
@@ -45,12 +79,21 @@ class RecipeResult(BaseModel):
     fiber_g: Optional[float] = None
     sugar_g: Optional[float] = None
     sodium_mg: Optional[float] = None
+    reasons: List[str] = []
+
+
+class RecipeResult(RecipeSummary):
     ingredient_lines: List[str] = []
     ingredients: List[str] = []
     instructions: Optional[str] = None
-    reasons: List[str] = []
 
 
 class SearchResponse(BaseModel):
     applied: Dict[str, Any]
-    results: List[RecipeResult]
+    results: List[Union[RecipeResult, RecipeSummary]]
+    next_cursor: Optional[str] = None
+
+
+class SearchBatchResponse(BaseModel):
+    # One entry per request query, in order.
+    responses: List[SearchResponse]
@@ -0,0 +1,321 @@
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.features.catalog.snapshot import get_snapshot
+from app.models.catalog import CatalogVersion
+from app.models.recipe import RecipeCard
+
+
+logger = logging.getLogger(__name__)
+
+# Hashed feature space: words plus boundary-marked character trigrams, so
+# spelling variants ("dal" / "daal" / "dhal") still share most features.
+_N_FEATURES = 1 << 20
+_TOKEN_RE = re.compile(r"[a-z]{2,}")
+_STOPWORDS = {
+    "and", "the", "with", "for", "from", "into", "of", "in", "on", "or", "to", "a", "an",
+    "recipe", "recipes", "style", "easy", "quick", "best", "homemade", "some", "want",
+    "like", "me", "my", "please", "give", "show", "find", "any",
+}
+# Name and ingredient features weigh more than description text.
+_FIELD_WEIGHTS = (("name", 2.0), ("ingredients", 1.5), ("cuisine", 1.0), ("description", 1.0))
+# Query-side expansion for common dish/ingredient names with no shared spelling.
+_QUERY_SYNONYMS: Dict[str, List[str]] = {
+    "curry": ["masala", "korma"],
+    "masala": ["curry"],
+    "lentil": ["dal", "dhal"],
+    "dal": ["lentil"],
+    "dhal": ["lentil"],
+    "chickpea": ["chana", "garbanzo"],
+    "chana": ["chickpea"],
+    "garbanzo": ["chickpea"],
+    "paneer": ["cottage", "cheese"],
+    "eggplant": ["aubergine", "brinjal"],
+    "aubergine": ["eggplant"],
+    "brinjal": ["eggplant"],
+    "zucchini": ["courgette"],
+    "courgette": ["zucchini"],
+    "cilantro": ["coriander"],
+    "coriander": ["cilantro"],
+    "shrimp": ["prawn"],
+    "prawn": ["shrimp"],
+    "yogurt": ["curd", "yoghurt"],
+    "curd": ["yogurt"],
+    "noodle": ["pasta"],
+    "stew": ["casserole"],
+}
+_SYNONYM_WEIGHT = 0.5
+# Trigrams back up the whole word rather than outvote it.
+_TRIGRAM_SHARE = 0.5
+# Query features present in more than this share of recipes carry almost no
+# idf weight but dominate the postings scanned, so they are skipped.
+_MAX_POSTING_SHARE = 0.05
+
+
+def _singular(token: str) -> str:
+    if len(token) > 3 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def _tokens(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return [_singular(t) for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+_feature_memo: Dict[str, Tuple[int, ...]] = {}
+
+
+def _token_features(token: str) -> Tuple[int, ...]:
+    feats = _feature_memo.get(token)
+    if feats is None:
+        marked = f"<{token}>"
+        grams = [marked[i:i + 3] for i in range(len(marked) - 2)]
+        feats = tuple(
+            zlib.crc32(g.encode("utf-8")) % _N_FEATURES for g in [f"w:{token}", *grams]
+        )
+        if len(_feature_memo) < 500_000:
+            _feature_memo[token] = feats
+    return feats
+
+
+def _accumulate(counts: Dict[int, float], tokens: Iterable[str], weight: float) -> None:
+    for tok in tokens:
+        feats = _token_features(tok)
+        counts[feats[0]] = counts.get(feats[0], 0.0) + weight
+        gram_w = weight * _TRIGRAM_SHARE / max(len(feats) - 1, 1)
+        for f in feats[1:]:
+            counts[f] = counts.get(f, 0.0) + gram_w
+
+
+class RecipeVectorIndex:
+    """TF-IDF vectors for every recipe card, stored feature-major as CSR.
+
+    Row f of the matrix lists the recipes that contain hashed feature f, so a
+    query only touches the rows of its own features and scoring every recipe is
+    one sparse mat-vec plus a bincount.
+    """
+
+    def __init__(
+        self,
+        recipe_ids: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        data: np.ndarray,
+        idf: np.ndarray,
+        built_at: float,
+    ) -> None:
+        self.recipe_ids = recipe_ids
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.idf = idf
+        self.built_at = built_at
+
+    @property
+    def size(self) -> int:
+        return int(self.recipe_ids.shape[0])
+
+    @classmethod
+    def build(cls, db: Session, batch_size: int = 5000) -> "RecipeVectorIndex":
+        rows = (
+            db.query(
+                RecipeCard.recipe_id,
+                RecipeCard.name,
+                RecipeCard.description,
+                RecipeCard.cuisine_type,
+                RecipeCard.ingredients,
+            )
+            .order_by(RecipeCard.recipe_id)
+            .yield_per(batch_size)
+        )
+
+        ids: List[int] = []
+        doc_ptr: List[int] = [0]
+        feat_idx: List[int] = []
+        feat_tf: List[float] = []
+        for recipe_id, name, description, cuisine, ingredients in rows:
+            counts: Dict[int, float] = {}
+            fields = {
+                "name": _tokens(name),
+                "ingredients": [t for line in (ingredients or []) for t in _tokens(line)],
+                "cuisine": _tokens(cuisine.value if cuisine is not None else None),
+                "description": _tokens(description),
+            }
+            for field, weight in _FIELD_WEIGHTS:
+                _accumulate(counts, fields[field], weight)
+            ids.append(int(recipe_id))
+            feat_idx.extend(counts.keys())
+            feat_tf.extend(counts.values())
+            doc_ptr.append(len(feat_idx))
+
+        n_docs = len(ids)
+        features = np.asarray(feat_idx, dtype=np.int32)
+        tf = np.asarray(feat_tf, dtype=np.float32)
+        docs = np.repeat(np.arange(n_docs, dtype=np.int32), np.diff(np.asarray(doc_ptr, dtype=np.int64)))
+
+        # Sublinear tf, smoothed idf, then L2-normalize each recipe vector.
+        df = np.bincount(features, minlength=_N_FEATURES).astype(np.float32)
+        idf = (np.log((1.0 + n_docs) / (1.0 + df)) + 1.0).astype(np.float32)
+        weights = (1.0 + np.log(np.maximum(tf, 1e-6), dtype=np.float32)).clip(min=0.05) * idf[features]
+        norms = np.sqrt(np.bincount(docs, weights=weights * weights, minlength=n_docs))
+        norms[norms == 0] = 1.0
+        weights = (weights / norms[docs]).astype(np.float32)
+
+        # Transpose to feature-major CSR.
+        order = np.argsort(features, kind="stable")
+        indptr = np.zeros(_N_FEATURES + 1, dtype=np.int64)
+        np.cumsum(np.bincount(features, minlength=_N_FEATURES), out=indptr[1:])
+        return cls(
+            recipe_ids=np.asarray(ids, dtype=np.int64),
+            indptr=indptr,
+            indices=docs[order],
+            data=weights[order],
+            idf=idf,
+            built_at=time.time(),
+        )
+
+    def save(self, path: str) -> None:
+        tmp = f"{path}.tmp.npz"
+        np.savez(
+            tmp,
+            recipe_ids=self.recipe_ids,
+            indptr=self.indptr,
+            indices=self.indices,
+            data=self.data,
+            idf=self.idf,
+            built_at=np.asarray([self.built_at]),
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "RecipeVectorIndex":
+        with np.load(path) as z:
+            return cls(
+                recipe_ids=z["recipe_ids"],
+                indptr=z["indptr"],
+                indices=z["indices"],
+                data=z["data"],
+                idf=z["idf"],
+                built_at=float(z["built_at"][0]),
+            )
+
+    def _query_vector(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        counts: Dict[int, float] = {}
+        tokens = _tokens(query)
+        _accumulate(counts, tokens, 1.0)
+        for tok in tokens:
+            _accumulate(counts, _QUERY_SYNONYMS.get(tok, []), _SYNONYM_WEIGHT)
+        if not counts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        feats = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        weights = (1.0 + np.log(tf)).clip(min=0.05) * self.idf[feats]
+        norm = float(np.sqrt(np.dot(weights, weights))) or 1.0
+        return feats, weights / norm
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """Top-k (recipe_id, cosine) pairs for `query`, best first."""
+        feats, q = self._query_vector(query)
+        if feats.size == 0 or self.size == 0:
+            return []
+        starts = self.indptr[feats]
+        lengths = self.indptr[feats + 1] - starts
+        if not lengths.any():
+            return []
+        keep = lengths <= max(int(self.size * _MAX_POSTING_SHARE), 1000)
+        if not keep.any():
+            # Every feature is common; rank by the rarest one alone.
+            keep = lengths == lengths.min()
+        starts, lengths, q = starts[keep], lengths[keep], q[keep]
+        total = int(lengths.sum())
+        # Positions of every posting touched by the query, gathered in one go.
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+        scores = np.bincount(
+            self.indices[offsets],
+            weights=self.data[offsets] * np.repeat(q, lengths),
+            minlength=self.size,
+        )
+        k = min(k, int(np.count_nonzero(scores)))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        # Ties break on recipe id so pages are stable.
+        top = top[np.lexsort((self.recipe_ids[top], -scores[top]))]
+        return [(int(self.recipe_ids[i]), float(scores[i])) for i in top]
+
+
+_index: Optional[RecipeVectorIndex] = None
+_index_lock = threading.Lock()
+
+
+def _index_from_snapshot(db: Session, path: str) -> Optional[RecipeVectorIndex]:
+    """The index stored in the catalog snapshot at `path`, if it matches the current catalog."""
+    snapshot = get_snapshot(path)
+    arrays = snapshot.semantic_arrays() if snapshot is not None else None
+    if arrays is None:
+        return None
+    max_age = float(getattr(settings, "SEARCH_CATALOG_VERSION_MAX_AGE_SECONDS", 2.0) or 0.0)
+    if snapshot.catalog_version != CatalogVersion.current(db, max_age=max_age):
+        logger.info("semantic index: catalog snapshot %s is out of date", path)
+        return None
+    # Current for the catalog, so good for another TTL window.
+    return RecipeVectorIndex(**arrays, built_at=time.time())
+
+
+def invalidate_index() -> None:
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def get_index(db: Session) -> RecipeVectorIndex:
+    """Return the in-process index, loading or rebuilding it when stale.
+
+    A current CATALOG_SNAPSHOT_PATH snapshot (see
+    app.scripts.export_catalog_snapshot) is memory-mapped first. Otherwise, with
+    SEARCH_SEMANTIC_INDEX_PATH set the index is read from that file (see
+    app.scripts.build_search_index), or else it is built from recipe_cards.
+    """
+    global _index
+    ttl = float(getattr(settings, "SEARCH_SEMANTIC_INDEX_TTL_SECONDS", 600) or 600)
+    path = getattr(settings, "SEARCH_SEMANTIC_INDEX_PATH", "") or ""
+    snapshot_path = getattr(settings, "CATALOG_SNAPSHOT_PATH", "") or ""
+    index = _index
+    if index is not None and time.time() - index.built_at < ttl:
+        return index
+    with _index_lock:
+        index = _index
+        if index is not None and time.time() - index.built_at < ttl:
+            return index
+        if snapshot_path:
+            loaded = _index_from_snapshot(db, snapshot_path)
+            if loaded is not None:
+                _index = loaded
+                return loaded
+        if path and os.path.exists(path):
+            loaded = RecipeVectorIndex.load(path)
+            if index is None or loaded.built_at > index.built_at:
+                index = loaded
+        if index is None or time.time() - index.built_at >= ttl:
+            started = time.perf_counter()
+            index = RecipeVectorIndex.build(db)
+            logger.info(
+                "semantic index: built %d recipes in %.1fs", index.size, time.perf_counter() - started
+            )
+            if path:
+                index.save(path)
+        _index = index
+        return index
@@ -1,32 +1,62 @@
+import copy
 import json
 import logging
 import re
-from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
 
-from sqlalchemy import or_
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import Integer, and_, bindparam, case, exists, func, literal, null, or_, select, tuple_, union_all
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session, load_only
 
 from app.core.config import settings
-from app.models.allergy import Allergy, UserAllergy
+from app.core.keywords import KeywordMatcher
+from app.core.metrics import StageTimer, histogram, stage
+from app.models.allergy import Allergy, AllergyIngredientMap, AllergyRecipeExclusion, UserAllergy
+from app.models.catalog import CatalogVersion
 from app.models.ingredient import Ingredient, RecipeIngredient
 from app.models.profile import UserProfile
-from app.models.recipe import Recipe, RecipeNutritionalInfo
+from app.models.recipe import (
+    CALORIE_LOW_MAX,
+    CALORIE_MEDIUM_MAX,
+    HIGH_PROTEIN_MIN_G,
+    LOW_CARB_MAX_G,
+    CuisineType,
+    Recipe,
+    RecipeCard,
+    RecipeNutritionalInfo,
+)
 from app.models.user import User
 
-from .schemas import CalorieBucket, DietType, ParsedQuery, RecipeResult
+from .cache import InvalidCursorError, TTLCache, decode_cursor, encode_cursor
+from .schemas import (
+    MAX_BATCH_QUERIES,
+    CalorieBucket,
+    DietType,
+    ParsedQuery,
+    RecipeResult,
+    RecipeSummary,
+    ResultView,
+    SearchMode,
+)
+from .semantic import get_index
 
 
 logger = logging.getLogger(__name__)
 
 
-_LOW_MAX = 400.0
-_MEDIUM_MAX = 700.0
+_LOW_MAX = CALORIE_LOW_MAX
+_MEDIUM_MAX = CALORIE_MEDIUM_MAX
 _BMI_LOW_CAL_CUTOFF = 22.9
 
 # Nutrition heuristic thresholds (per serving) used when the user asks for
 # high-protein / low-carb type queries.
-_HIGH_PROTEIN_MIN_G = 20.0
-_LOW_CARB_MAX_G = 30.0
+_HIGH_PROTEIN_MIN_G = HIGH_PROTEIN_MIN_G
+_LOW_CARB_MAX_G = LOW_CARB_MAX_G
 
 _STOPWORDS: Set[str] = {
     "a",
@@ -74,6 +104,10 @@ _ALLERGY_QUERY_SYNONYMS: Dict[str, List[str]] = {
     ],
     "peanut": ["peanut", "peanuts", "peanut butter"],
 }
+# Finds every allergy synonym in a query in one pass: (allergy, synonym) hits.
+_ALLERGY_QUERY_MATCHER: KeywordMatcher[Tuple[str, str]] = KeywordMatcher(
+    words=[(syn, (allergy, syn)) for allergy, syns in _ALLERGY_QUERY_SYNONYMS.items() for syn in syns]
+)
 
 
 def _normalize_term(s: str) -> str:
@@ -113,9 +147,49 @@ def _extract_search_terms(query: str, parsed: ParsedQuery) -> List[str]:
     return out
 
 
-def list_recipes(db: Session, limit: int = 10) -> List[RecipeResult]:
-    q0 = _build_base_recipe_query(db).order_by(Recipe.id.asc())
-    return _fetch_results(q0, limit)
+def _recipes_page_query(db: Session, cursor: Optional[str], view: ResultView):
+    q0 = _build_card_query(db, view)
+    if cursor:
+        token = decode_cursor(cursor, kind="recipes")
+        try:
+            after_id = int(token["after"])
+        except (KeyError, TypeError, ValueError):
+            raise InvalidCursorError("Invalid cursor")
+        q0 = q0.filter(RecipeCard.recipe_id > after_id)
+    return q0.order_by(RecipeCard.recipe_id.asc())
+
+
+def list_recipes(
+    db: Session,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    view: ResultView = ResultView.FULL,
+) -> Tuple[List[RecipeSummary], Optional[str]]:
+    results = _fetch_results(_recipes_page_query(db, cursor, view), limit, view)
+
+    next_cursor: Optional[str] = None
+    if results and len(results) == limit:
+        next_cursor = encode_cursor({"k": "recipes", "after": results[-1].id})
+    return results, next_cursor
+
+
+def iter_recipes(
+    db: Session,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    view: ResultView = ResultView.FULL,
+    batch_size: int = 500,
+) -> Iterator[RecipeSummary]:
+    """Like list_recipes, but yields results as rows arrive from a server-side cursor.
+
+    The cursor argument is validated before anything is returned, so a bad one
+    raises InvalidCursorError rather than failing mid-stream.
+    """
+    q0 = _recipes_page_query(db, cursor, view).limit(limit).yield_per(batch_size)
+    return (
+        _build_recipe_result(card, instructions, _nutrition_reasons(card), view)
+        for card, instructions in q0
+    )
 
 
 def _fallback_parse(query: str) -> ParsedQuery:
@@ -276,79 +350,191 @@ def _sanitize_terms(value: Any, *, max_items: int = 12) -> List[str]:
     return out
 
 
+_GEMINI_PROMPT_TEMPLATE = (
+    "You are a parser for a recipe search API. Convert the user query into a compact JSON object. "
+    "Return ONLY JSON, no extra text.\n\n"
+    "Schema:\n"
+    "{{\n"
+    "  \"diet\": null | \"veg\" | \"non_veg\",\n"
+    "  \"calorie_bucket\": null | \"low\" | \"medium\" | \"high\",\n"
+    "  \"include_terms\": [string],\n"
+    "  \"exclude_terms\": [string],\n"
+    "  \"wants_high_calorie\": boolean\n"
+    "}}\n\n"
+    "User query: {query}\n"
+)
+
+# Gemini calls run on this pool so a slow response never blocks the request
+# thread past GEMINI_TIMEOUT_SECONDS. Timed-out calls finish in the background.
+# It holds a full batch, so a batch's calls start together instead of queueing
+# behind each other under one deadline.
+_llm_executor = ThreadPoolExecutor(max_workers=MAX_BATCH_QUERIES, thread_name_prefix="gemini-parse")
+
+_gemini_client_lock = threading.Lock()
+_gemini_client: Optional[Tuple[Tuple[str, str], str, Any]] = None
+
+
+class _CircuitBreaker:
+    """Skips the LLM for a cooldown period after repeated timeouts/failures."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._open_until = 0.0
+
+    def allow(self) -> bool:
+        with self._lock:
+            return time.monotonic() >= self._open_until
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._open_until = 0.0
+
+    def record_failure(self) -> None:
+        threshold = int(getattr(settings, "GEMINI_CIRCUIT_FAILURE_THRESHOLD", 3) or 3)
+        cooldown = float(getattr(settings, "GEMINI_CIRCUIT_COOLDOWN_SECONDS", 60.0) or 0.0)
+        with self._lock:
+            self._failures += 1
+            if self._failures >= threshold:
+                self._open_until = time.monotonic() + cooldown
+                self._failures = 0
+                logger.warning("parse_query: Gemini circuit opened for %.0fs", cooldown)
+
+
+_gemini_breaker = _CircuitBreaker()
+
+
+def _get_gemini_client(api_key: str, model_name: str) -> Optional[Tuple[str, Any]]:
+    """Return a cached (sdk_kind, client) pair, building it once per key/model."""
+    global _gemini_client
+
+    key = (api_key, model_name)
+    cached = _gemini_client
+    if cached is not None and cached[0] == key:
+        return cached[1], cached[2]
+
+    with _gemini_client_lock:
+        cached = _gemini_client
+        if cached is not None and cached[0] == key:
+            return cached[1], cached[2]
+
+        try:
+            from google import genai  # type: ignore
+
+            _gemini_client = (key, "new", genai.Client(api_key=api_key))
+            return "new", _gemini_client[2]
+        except Exception:
+            pass
+
+        try:
+            import google.generativeai as genai_old  # type: ignore
+
+            genai_old.configure(api_key=api_key)
+            _gemini_client = (key, "old", genai_old.GenerativeModel(model_name))
+            return "old", _gemini_client[2]
+        except Exception:
+            logger.debug("parse_query: Gemini SDK import failed", exc_info=True)
+            return None
+
+
+def _llm_parse(query: str, api_key: str, model_name: str) -> Optional[ParsedQuery]:
+    client = _get_gemini_client(api_key, model_name)
+    if client is None:
+        return None
+    kind, sdk = client
+
+    prompt = _GEMINI_PROMPT_TEMPLATE.format(query=query)
+    if kind == "new":
+        resp = sdk.models.generate_content(model=model_name, contents=prompt)
+    else:
+        resp = sdk.generate_content(prompt)
+    raw = getattr(resp, "text", "") or ""
+
+    data = _try_parse_json_from_text(raw)
+    if not isinstance(data, dict):
+        logger.debug("parse_query: Gemini did not return JSON, using fallback")
+        return None
+
+    parsed = ParsedQuery(
+        diet=_coerce_diet(data.get("diet")),
+        calorie_bucket=_coerce_calorie_bucket(data.get("calorie_bucket")),
+        include_terms=_sanitize_terms(data.get("include_terms")),
+        exclude_terms=_sanitize_terms(data.get("exclude_terms")),
+        wants_high_calorie=_coerce_bool(data.get("wants_high_calorie")),
+    )
+
+    if parsed.calorie_bucket is None and re.search(r"\b(high[-\s]?cal|high[-\s]?calorie|high[-\s]?calories|high\s+kcal)\b", _normalize_term(query)):
+        parsed.calorie_bucket = CalorieBucket.HIGH
+        parsed.wants_high_calorie = True
+
+    return parsed
+
+
 def parse_query(query: str) -> ParsedQuery:
+    return _parse_query_with_source(query)[0]
+
+
+def _parse_query_with_source(query: str) -> Tuple[ParsedQuery, str]:
+    """parse_query() plus where the result came from: "llm" or "fallback"."""
+    return _parse_queries([query])[0]
+
+
+def _parse_queries(queries: Sequence[str]) -> List[Tuple[ParsedQuery, str]]:
+    """Parse several queries with their Gemini calls in flight together.
+
+    At most MAX_BATCH_QUERIES calls run at once and all share one
+    GEMINI_TIMEOUT_SECONDS budget; any that miss it (or fail) fall back to the
+    rule-based parse individually. Calls still queued at the deadline are
+    cancelled, and a batch counts as at most one circuit breaker failure.
+    """
     api_key = getattr(settings, "GEMINI_API_KEY", "") or ""
     model_name = getattr(settings, "GEMINI_MODEL", "gemini-1.5-flash")
+    timeout = float(getattr(settings, "GEMINI_TIMEOUT_SECONDS", 2.5) or 0.0)
 
     if not api_key:
         logger.debug("parse_query: missing GEMINI_API_KEY, using fallback")
-        return _fallback_parse(query)
-
-    try:
+        return [(_fallback_parse(q), "fallback") for q in queries]
+
+    if not _gemini_breaker.allow():
+        logger.debug("parse_query: Gemini circuit open, using fallback")
+        return [(_fallback_parse(q), "fallback") for q in queries]
+
+    started = time.monotonic()
+    futures = [_llm_executor.submit(_llm_parse, q, api_key, model_name) for q in queries[:MAX_BATCH_QUERIES]]
+    # The rule-based parses are computed while Gemini is in flight.
+    fallbacks = [_fallback_parse(q) for q in queries]
+
+    out: List[Tuple[ParsedQuery, str]] = []
+    failed = succeeded = False
+    for idx, fallback in enumerate(fallbacks):
+        if idx >= len(futures):
+            out.append((fallback, "fallback"))
+            continue
+        future = futures[idx]
         try:
-            from google import genai  # type: ignore
-
-            client = genai.Client(api_key=api_key)
-            use_new_sdk = True
+            parsed = future.result(timeout=max(timeout - (time.monotonic() - started), 0.0))
+        except FutureTimeoutError:
+            # A call that never started says nothing about Gemini.
+            if not future.cancel():
+                failed = True
+            logger.debug("parse_query: Gemini exceeded %.2fs budget, using fallback", timeout)
+            out.append((fallback, "fallback"))
+            continue
         except Exception:
-            use_new_sdk = False
-
-        prompt = (
-            "You are a parser for a recipe search API. Convert the user query into a compact JSON object. "
-            "Return ONLY JSON, no extra text.\n\n"
-            "Schema:\n"
-            "{\n"
-            "  \"diet\": null | \"veg\" | \"non_veg\",\n"
-            "  \"calorie_bucket\": null | \"low\" | \"medium\" | \"high\",\n"
-            "  \"include_terms\": [string],\n"
-            "  \"exclude_terms\": [string],\n"
-            "  \"wants_high_calorie\": boolean\n"
-            "}\n\n"
-            f"User query: {query}\n"
-        )
-
-        if use_new_sdk:
-            resp = client.models.generate_content(model=model_name, contents=prompt)
-            raw = getattr(resp, "text", "") or ""
-        else:
-            try:
-                import google.generativeai as genai_old  # type: ignore
-
-                genai_old.configure(api_key=api_key)
-                model = genai_old.GenerativeModel(model_name)
-                resp = model.generate_content(prompt)
-                raw = getattr(resp, "text", "") or ""
-            except Exception:
-                logger.debug("parse_query: Gemini SDK import failed, using fallback")
-                return _fallback_parse(query)
-
-        data = _try_parse_json_from_text(raw)
-        if not isinstance(data, dict):
-            logger.debug("parse_query: Gemini did not return JSON, using fallback")
-            return _fallback_parse(query)
-
-        diet = _coerce_diet(data.get("diet"))
-        calorie_bucket = _coerce_calorie_bucket(data.get("calorie_bucket"))
-        include_terms = _sanitize_terms(data.get("include_terms"))
-        exclude_terms = _sanitize_terms(data.get("exclude_terms"))
-        wants_high_calorie = _coerce_bool(data.get("wants_high_calorie"))
-
-        parsed = ParsedQuery(
-            diet=diet,
-            calorie_bucket=calorie_bucket,
-            include_terms=include_terms,
-            exclude_terms=exclude_terms,
-            wants_high_calorie=wants_high_calorie,
-        )
+            failed = True
+            logger.debug("parse_query: Gemini parse failed, using fallback", exc_info=True)
+            out.append((fallback, "fallback"))
+            continue
 
-        if parsed.calorie_bucket is None and re.search(r"\b(high[-\s]?cal|high[-\s]?calorie|high[-\s]?calories|high\s+kcal)\b", _normalize_term(query)):
-            parsed.calorie_bucket = CalorieBucket.HIGH
-            parsed.wants_high_calorie = True
+        succeeded = True
+        out.append((parsed, "llm") if parsed is not None else (fallback, "fallback"))
 
-        return parsed
-    except Exception:
-        logger.debug("parse_query: Gemini parse failed, using fallback", exc_info=True)
-        return _fallback_parse(query)
+    if failed:
+        _gemini_breaker.record_failure()
+    elif succeeded:
+        _gemini_breaker.record_success()
+    return out
 
 
 def compute_bmi(profile: Optional[UserProfile]) -> Optional[float]:
@@ -374,6 +560,20 @@ def _calorie_bucket_for_recipe(calories: Optional[float]) -> Optional[CalorieBuc
     return CalorieBucket.HIGH
 
 
+def _get_user_context(
+    db: Session, user: User, timer: Optional[StageTimer] = None
+) -> Tuple[FrozenSet[str], Optional[float]]:
+    # Read on every request (two indexed lookups): a per-process cache would
+    # miss allergy and profile writes handled by other workers, and the result
+    # cache key is built from these values.
+    with stage(timer, "profile_bmi"):
+        profile = db.query(UserProfile).filter(UserProfile.user_id == user.id).first()
+        bmi = compute_bmi(profile)
+    with stage(timer, "user_allergy_terms"):
+        terms = frozenset(_get_user_allergy_terms(db, user))
+    return terms, bmi
+
+
 def _get_user_allergy_terms(db: Session, user: User) -> Set[str]:
     # Existing normalized allergy table is already present.
     rows: Sequence[Tuple[str]] = (
@@ -453,34 +653,28 @@ def _detect_nutrition_constraints(query: str, parsed: ParsedQuery) -> Dict[str,
     }
 
 
-def _get_mapped_ingredient_ids(db: Session, allergy_terms: Set[str], user: User) -> Set[int]:
-    # Map using both:
+class _ExclusionAllergy(NamedTuple):
+    name: str
+    # Bit in Recipe.allergen_mask, None when the allergy has none.
+    mask_bit: Optional[int]
+
+
+def _get_exclusion_allergies(db: Session, allergy_terms: Set[str], user: User) -> Dict[int, _ExclusionAllergy]:
+    # Allergies whose exclusions apply, from both:
     # - normalized user allergies via UserAllergy
     # - ad-hoc terms (e.g. "no peanuts") matched to Allergy.name
-    allergy_ids: Set[int] = set()
+    clauses = [
+        Allergy.id.in_(select(UserAllergy.allergy_id).where(UserAllergy.user_id == user.id))
+    ]
+    clauses.extend(Allergy.name.ilike(t) for t in sorted(allergy_terms) if t)
+    rows = db.query(Allergy.id, Allergy.name, Allergy.mask_bit).filter(or_(*clauses)).all()
+    return {int(r[0]): _ExclusionAllergy(r[1] or "", r[2]) for r in rows if r and r[0]}
 
-    rows = (
-        db.query(UserAllergy.allergy_id)
-        .filter(UserAllergy.user_id == user.id)
-        .all()
-    )
-    for r in rows:
-        if r and r[0]:
-            allergy_ids.add(int(r[0]))
-
-    if allergy_terms:
-        clauses = [Allergy.name.ilike(t) for t in sorted(allergy_terms) if t]
-        if clauses:
-            term_rows = db.query(Allergy.id).filter(or_(*clauses)).all()
-            for r in term_rows:
-                if r and r[0]:
-                    allergy_ids.add(int(r[0]))
 
+def _get_mapped_ingredient_ids(db: Session, allergy_ids: Set[int]) -> Set[int]:
     if not allergy_ids:
         return set()
 
-    from app.models.allergy import AllergyIngredientMap
-
     mapped = (
         db.query(AllergyIngredientMap.ingredient_id)
         .filter(AllergyIngredientMap.allergy_id.in_(sorted(allergy_ids)))
@@ -489,19 +683,72 @@ def _get_mapped_ingredient_ids(db: Session, allergy_terms: Set[str], user: User)
     return {int(r[0]) for r in mapped if r and r[0]}
 
 
+class _SharedExclusions:
+    """Exclusion lookups loaded once for several queries of one user (batch search)."""
+
+    def __init__(self, db: Session, allergy_terms: Set[str], user: User) -> None:
+        # Superset for every query's terms; each query keeps the allergies its
+        # own terms name, which is what _get_exclusion_allergies would return.
+        self.allergies = _get_exclusion_allergies(db, allergy_terms, user)
+        self.ingredients_by_allergy: Dict[int, Set[int]] = {}
+        if self.allergies:
+            rows = (
+                db.query(AllergyIngredientMap.allergy_id, AllergyIngredientMap.ingredient_id)
+                .filter(AllergyIngredientMap.allergy_id.in_(sorted(self.allergies)))
+                .all()
+            )
+            for allergy_id, ingredient_id in rows:
+                if ingredient_id:
+                    self.ingredients_by_allergy.setdefault(int(allergy_id), set()).add(int(ingredient_id))
+
+    def exclusion_allergies(self, allergy_terms: Set[str]) -> Dict[int, _ExclusionAllergy]:
+        return {
+            aid: allergy
+            for aid, allergy in self.allergies.items()
+            if _normalize_term(allergy.name) in allergy_terms
+        }
+
+    def mapped_ingredient_ids(self, allergy_ids: Set[int]) -> Set[int]:
+        out: Set[int] = set()
+        for aid in allergy_ids:
+            out |= self.ingredients_by_allergy.get(aid, set())
+        return out
+
+
 def _apply_allergy_exclusions(
     base_query,
     terms: Set[str],
-    mapped_ingredient_ids: Set[int],
+    exclusion_allergies: Dict[int, _ExclusionAllergy],
 ):
-    if mapped_ingredient_ids:
-        base_query = base_query.filter(
-            ~Recipe.ingredients.any(
-                RecipeIngredient.ingredient_id.in_(sorted(mapped_ingredient_ids))
+    # Mapped ingredients and ingredient names matching an allergy's own name are
+    # precomputed per recipe: one allergen_mask test covers every allergy with a
+    # mask bit, the rest anti-join allergy_recipe_exclusions.
+    covered: Set[str] = set()
+    if exclusion_allergies:
+        mask = 0
+        unmasked: List[int] = []
+        for aid, allergy in exclusion_allergies.items():
+            if allergy.mask_bit is None:
+                unmasked.append(aid)
+            else:
+                mask |= 1 << allergy.mask_bit
+        if mask:
+            base_query = base_query.filter(Recipe.allergen_mask.op("&")(mask) == 0)
+        if unmasked:
+            base_query = base_query.filter(
+                ~exists().where(
+                    AllergyRecipeExclusion.recipe_id == Recipe.id,
+                    AllergyRecipeExclusion.allergy_id.in_(sorted(unmasked)),
+                )
             )
-        )
-    # Exclude recipes that have an ingredient name matching any allergy term.
-    for t in sorted(terms):
+        for allergy in exclusion_allergies.values():
+            n = _normalize_term(allergy.name)
+            covered.add(n)
+            if n.endswith("s") and len(n) > 3:
+                covered.add(n[:-1])
+
+    # Exclude recipes that have an ingredient name matching any other term.
+    for t in sorted(terms - covered):
         if not t:
             continue
         like = f"%{t}%"
@@ -513,195 +760,528 @@ def _apply_allergy_exclusions(
     return base_query
 
 
-def _build_base_recipe_query(db: Session):
-    return (
-        db.query(Recipe, RecipeNutritionalInfo)
-        .outerjoin(RecipeNutritionalInfo, RecipeNutritionalInfo.recipe_id == Recipe.id)
-        .options(
-            selectinload(Recipe.ingredients).selectinload(RecipeIngredient.ingredient)
+# Card columns needed for a summary result; full results also load the
+# ingredient arrays and join recipes for the instructions text.
+_SUMMARY_CARD_COLUMNS = (
+    RecipeCard.name,
+    RecipeCard.description,
+    RecipeCard.image_url,
+    RecipeCard.prep_time,
+    RecipeCard.cook_time,
+    RecipeCard.total_time,
+    RecipeCard.servings,
+    RecipeCard.cuisine_type,
+    RecipeCard.calories,
+    RecipeCard.protein_g,
+    RecipeCard.carbs_g,
+    RecipeCard.fat_g,
+    RecipeCard.fiber_g,
+    RecipeCard.sugar_g,
+    RecipeCard.sodium_mg,
+)
+
+
+def _build_card_query(db: Session, view: ResultView = ResultView.FULL):
+    if view == ResultView.SUMMARY:
+        return (
+            db.query(RecipeCard, null().label("instructions"))
+            .options(load_only(*_SUMMARY_CARD_COLUMNS))
         )
+    return (
+        db.query(RecipeCard, Recipe.instructions)
+        .join(Recipe, Recipe.id == RecipeCard.recipe_id)
+    )
+
+
+def _nutrition_reasons(card: RecipeCard) -> List[str]:
+    reasons: List[str] = []
+    if card.protein_g is not None:
+        reasons.append(f"protein_g={float(card.protein_g):.1f}")
+    if card.carbs_g is not None:
+        reasons.append(f"carbs_g={float(card.carbs_g):.1f}")
+    return reasons
+
+
+def _build_recipe_result(
+    card: RecipeCard,
+    instructions: Optional[str],
+    reasons: List[str],
+    view: ResultView = ResultView.FULL,
+) -> RecipeSummary:
+    fields: Dict[str, Any] = dict(
+        id=card.recipe_id,
+        name=card.name,
+        description=card.description,
+        calories=(float(card.calories) if card.calories is not None else None),
+        image_url=card.image_url,
+        prep_time=card.prep_time,
+        cook_time=card.cook_time,
+        total_time=card.total_time,
+        servings=card.servings,
+        cuisine_type=(card.cuisine_type.value if card.cuisine_type is not None else None),
+        protein_g=(float(card.protein_g) if card.protein_g is not None else None),
+        carbs_g=(float(card.carbs_g) if card.carbs_g is not None else None),
+        fat_g=(float(card.fat_g) if card.fat_g is not None else None),
+        fiber_g=(float(card.fiber_g) if card.fiber_g is not None else None),
+        sugar_g=(float(card.sugar_g) if card.sugar_g is not None else None),
+        sodium_mg=(float(card.sodium_mg) if card.sodium_mg is not None else None),
+        reasons=reasons,
+    )
+    if view == ResultView.SUMMARY:
+        return RecipeSummary(**fields)
+    return RecipeResult(
+        **fields,
+        ingredient_lines=list(card.ingredient_lines or []),
+        ingredients=list(card.ingredients or []),
+        instructions=instructions,
     )
 
 
-def _fetch_results(db_query, limit: int) -> List[RecipeResult]:
+def _fetch_results(db_query, limit: int, view: ResultView = ResultView.FULL) -> List[RecipeSummary]:
     rows = db_query.limit(limit).all()
-    out: List[RecipeResult] = []
-    for recipe, nut in rows:
-        calories = None
-        if nut is not None and nut.calories is not None:
-            calories = float(nut.calories)
-        reasons: List[str] = []
-        if nut is not None:
-            if nut.protein_g is not None:
-                reasons.append(f"protein_g={float(nut.protein_g):.1f}")
-            if nut.carbs_g is not None:
-                reasons.append(f"carbs_g={float(nut.carbs_g):.1f}")
-
-        ingredients: List[str] = []
-        ingredient_lines: List[str] = []
-        try:
-            for ri in recipe.ingredients or []:
-                if ri.ingredient is not None and ri.ingredient.name:
-                    ingredients.append(ri.ingredient.name)
-                    qty = (ri.notes or "").strip() if getattr(ri, "notes", None) else ""
-                    ingredient_lines.append(f"{qty} {ri.ingredient.name}".strip())
-        except Exception:
-            ingredients = []
-            ingredient_lines = []
-
-        prep_time = recipe.prep_time
-        cook_time = recipe.cook_time
-        total_time = None
-        if isinstance(prep_time, int) and isinstance(cook_time, int):
-            total_time = prep_time + cook_time
-        elif isinstance(prep_time, int):
-            total_time = prep_time
-        elif isinstance(cook_time, int):
-            total_time = cook_time
-
-        out.append(
-            RecipeResult(
-                id=recipe.id,
-                name=recipe.name,
-                description=recipe.description,
-                calories=calories,
-                image_url=recipe.image_url,
-                prep_time=prep_time,
-                cook_time=cook_time,
-                total_time=total_time,
-                servings=recipe.servings,
-                cuisine_type=(recipe.cuisine_type.value if recipe.cuisine_type is not None else None),
-                protein_g=(float(nut.protein_g) if nut is not None and nut.protein_g is not None else None),
-                carbs_g=(float(nut.carbs_g) if nut is not None and nut.carbs_g is not None else None),
-                fat_g=(float(nut.fat_g) if nut is not None and nut.fat_g is not None else None),
-                fiber_g=(float(nut.fiber_g) if nut is not None and nut.fiber_g is not None else None),
-                sugar_g=(float(nut.sugar_g) if nut is not None and nut.sugar_g is not None else None),
-                sodium_mg=(float(nut.sodium_mg) if nut is not None and nut.sodium_mg is not None else None),
-                ingredient_lines=ingredient_lines,
-                ingredients=ingredients,
-                instructions=recipe.instructions,
-                reasons=reasons,
-            )
+    return [
+        _build_recipe_result(card, instructions, _nutrition_reasons(card), view)
+        for card, instructions in rows
+    ]
+
+
+class _SearchTier:
+    """One step of the relaxation cascade: calorie bucket + nutrition attempt."""
+
+    __slots__ = ("bucket", "high_protein", "low_carb", "require_all_text_terms", "label")
+
+    def __init__(
+        self,
+        bucket: Optional[CalorieBucket],
+        high_protein: bool,
+        low_carb: bool,
+        require_all_text_terms: bool,
+        label: str,
+    ) -> None:
+        self.bucket = bucket
+        self.high_protein = high_protein
+        self.low_carb = low_carb
+        self.require_all_text_terms = require_all_text_terms
+        self.label = label
+
+
+class _SearchState:
+    """Everything derived from a query before SQL runs; cached under cursors."""
+
+    def __init__(
+        self,
+        *,
+        user_id: int,
+        query: str,
+        parsed: ParsedQuery,
+        applied: Dict[str, Any],
+        search_terms: List[str],
+        allergy_terms: Set[str],
+        exclusion_allergies: Dict[int, _ExclusionAllergy],
+        tiers: List[_SearchTier],
+        bmi_prioritized_low: bool,
+        wants_both_constraints: bool,
+        window: int,
+        semantic_hits: Optional[List[Tuple[int, int]]] = None,
+    ) -> None:
+        self.user_id = user_id
+        self.query = query
+        self.parsed = parsed
+        self.applied = applied
+        self.search_terms = search_terms
+        self.allergy_terms = allergy_terms
+        self.exclusion_allergies = exclusion_allergies
+        self.tiers = tiers
+        self.bmi_prioritized_low = bmi_prioritized_low
+        self.wants_both_constraints = wants_both_constraints
+        self.window = window
+        # (recipe_id, similarity * _SEMANTIC_SCALE) when ranking by vectors.
+        self.semantic_hits = semantic_hits
+        # Facet counts, computed on first request and reused by later pages.
+        self.facets: Optional[Dict[str, Any]] = None
+
+
+# Search pages after the first reuse the parsed query and exclusions from here.
+_search_states: TTLCache[_SearchState] = TTLCache(
+    maxsize=int(getattr(settings, "SEARCH_CURSOR_CACHE_SIZE", 2048) or 2048),
+    ttl=float(getattr(settings, "SEARCH_CURSOR_TTL_SECONDS", 900) or 900),
+)
+
+# (tier, score, name_hits, desc_hits, recipe_id): the result order, used as keyset.
+_SortKey = Tuple[int, int, int, int, int]
+
+# Cosine similarities are kept as integers so they fit the keyset above.
+_SEMANTIC_SCALE = 1_000_000
+_SEMANTIC_MAX_CANDIDATES = 2000
+
+
+def _tier_conditions(tier: _SearchTier) -> List[Any]:
+    conds: List[Any] = []
+
+    # Nutrition constraints. Thresholds are inlined rather than bound so the
+    # planner can match the partial indexes even for generic plans.
+    if tier.high_protein:
+        conds.append(RecipeNutritionalInfo.protein_g >= bindparam("high_protein_min_g", _HIGH_PROTEIN_MIN_G, unique=True, literal_execute=True))
+    if tier.low_carb:
+        conds.append(RecipeNutritionalInfo.carbs_g <= bindparam("low_carb_max_g", _LOW_CARB_MAX_G, unique=True, literal_execute=True))
+
+    # Calorie bucket filter (generated column, same ranges as _LOW_MAX/_MEDIUM_MAX)
+    if tier.bucket is not None:
+        conds.append(RecipeNutritionalInfo.calorie_bucket == tier.bucket.value)
+
+    return conds
+
+
+def _apply_tier_filters(base_query, tier: _SearchTier, state: _SearchState):
+    q0 = base_query
+
+    # Diet filter
+    if state.parsed.diet == DietType.VEG:
+        q0 = q0.filter(Recipe.is_vegetarian.is_(True))
+    elif state.parsed.diet == DietType.NON_VEG:
+        q0 = q0.filter(
+            (Recipe.is_vegetarian.is_(False)) | (Recipe.is_vegetarian.is_(None))
         )
-    return out
 
+    # Text search: only apply if we extracted meaningful terms. Semantic search
+    # restricts to the vector candidates instead.
+    if state.semantic_hits is None:
+        q0 = _apply_text_search_terms(q0, state.search_terms, require_all=tier.require_all_text_terms)
+
+    # Allergy / exclusions
+    q0 = _apply_allergy_exclusions(q0, state.allergy_terms, state.exclusion_allergies)
+
+    for cond in _tier_conditions(tier):
+        q0 = q0.filter(cond)
+    return q0
 
-def _score_recipe_text(recipe: Recipe, terms: List[str]) -> Tuple[int, int, int, int]:
-    if not terms:
-        return 0, 0, 0, 0
 
-    name_text = (recipe.name or "").lower()
-    desc_text = (recipe.description or "").lower() if recipe.description else ""
-    instr_text = (recipe.instructions or "").lower()
+def _text_hit_columns(terms: List[str]):
+    # Mirrors plain substring matching on lowercased text: each term counts once,
+    # against the first of name / description / instructions that contains it.
+    name_text = func.lower(Recipe.name)
+    desc_text = func.lower(func.coalesce(Recipe.description, ""))
+    instr_text = func.lower(Recipe.instructions)
 
-    name_hits = 0
-    desc_hits = 0
-    instr_hits = 0
+    name_hits = []
+    desc_hits = []
+    instr_hits = []
     for t in terms:
         tt = (t or "").strip().lower()
         if not tt:
             continue
-        if tt in name_text:
-            name_hits += 1
-        elif tt in desc_text:
-            desc_hits += 1
-        elif tt in instr_text:
-            instr_hits += 1
+        in_name = func.strpos(name_text, tt) > 0
+        in_desc = func.strpos(desc_text, tt) > 0
+        in_instr = func.strpos(instr_text, tt) > 0
+        name_hits.append(case((in_name, 1), else_=0))
+        desc_hits.append(case((~in_name & in_desc, 1), else_=0))
+        instr_hits.append(case((~in_name & ~in_desc & in_instr, 1), else_=0))
+
+    def _sum(parts):
+        if not parts:
+            return literal(0)
+        total = parts[0]
+        for p in parts[1:]:
+            total = total + p
+        return total
+
+    return _sum(name_hits), _sum(desc_hits), _sum(instr_hits)
+
+
+def _tier_branch(idx: int, tier: _SearchTier, state: _SearchState):
+    branch = select(Recipe.id.label("recipe_id"), literal(idx).label("tier")).outerjoin(
+        RecipeNutritionalInfo, RecipeNutritionalInfo.recipe_id == Recipe.id
+    )
+    return _apply_tier_filters(branch, tier, state)
+
+
+def _ranked_window_candidates(state: _SearchState):
+    # Text-ranked search: each tier ranks only its first `window` matches by id,
+    # and a recipe is kept in the first tier where it appears. The window is
+    # fixed for the whole cursor session so later pages see the same ranking.
+    branches = []
+    for idx, tier in enumerate(state.tiers):
+        branch = _tier_branch(idx, tier, state)
+        branch = branch.order_by(Recipe.id.asc()).limit(state.window).subquery()
+        branches.append(select(branch.c.recipe_id, branch.c.tier))
+    candidates = union_all(*branches).subquery("candidates")
+
+    name_hits, desc_hits, instr_hits = _text_hit_columns(state.search_terms)
+    scored = (
+        select(
+            candidates.c.recipe_id,
+            candidates.c.tier,
+            name_hits.label("name_hits"),
+            desc_hits.label("desc_hits"),
+            instr_hits.label("instr_hits"),
+            ((name_hits * 5) + (desc_hits * 2) + instr_hits).label("score"),
+        )
+        .join(Recipe, Recipe.id == candidates.c.recipe_id)
+        .subquery("scored")
+    )
+    deduped = select(
+        scored,
+        func.row_number()
+        .over(partition_by=scored.c.recipe_id, order_by=scored.c.tier.asc())
+        .label("occurrence"),
+    ).subquery("deduped")
+    return (
+        select(
+            deduped.c.recipe_id,
+            deduped.c.tier,
+            deduped.c.score,
+            deduped.c.name_hits,
+            deduped.c.desc_hits,
+            deduped.c.instr_hits,
+        )
+        .where(deduped.c.occurrence == 1)
+        .subquery("ranked")
+    )
 
-    score = (name_hits * 5) + (desc_hits * 2) + instr_hits
-    return score, name_hits, desc_hits, instr_hits
 
+def _semantic_hits_table(state: _SearchState):
+    return func.unnest(
+        literal([rid for rid, _ in state.semantic_hits], ARRAY(Integer)),
+        literal([score for _, score in state.semantic_hits], ARRAY(Integer)),
+    ).table_valued("recipe_id", "score").render_derived("hits")
 
-def _fetch_ranked_results(db_query, limit: int, terms: List[str]) -> List[RecipeResult]:
-    if not terms:
-        return _fetch_results(db_query, limit)
-
-    fetch_limit = max(limit * 10, 50)
-    fetch_limit = min(fetch_limit, 250)
-
-    rows = db_query.limit(fetch_limit).all()
-    scored: List[Tuple[int, int, int, int, Recipe, Optional[RecipeNutritionalInfo]]] = []
-    for recipe, nut in rows:
-        score, name_hits, desc_hits, instr_hits = _score_recipe_text(recipe, terms)
-        scored.append((score, name_hits, desc_hits, instr_hits, recipe, nut))
-
-    scored.sort(key=lambda x: (-x[0], -x[1], -x[2], x[4].id))
-
-    out: List[RecipeResult] = []
-    for score, name_hits, desc_hits, instr_hits, recipe, nut in scored[:limit]:
-        calories = None
-        if nut is not None and nut.calories is not None:
-            calories = float(nut.calories)
-        reasons: List[str] = [f"score={score}"]
-        if name_hits:
-            reasons.append(f"name_matches={name_hits}")
-        if desc_hits:
-            reasons.append(f"desc_matches={desc_hits}")
-        if instr_hits:
-            reasons.append(f"instr_matches={instr_hits}")
-        if nut is not None:
-            if nut.protein_g is not None:
-                reasons.append(f"protein_g={float(nut.protein_g):.1f}")
-            if nut.carbs_g is not None:
-                reasons.append(f"carbs_g={float(nut.carbs_g):.1f}")
-
-        ingredients: List[str] = []
-        ingredient_lines: List[str] = []
-        try:
-            for ri in recipe.ingredients or []:
-                if ri.ingredient is not None and ri.ingredient.name:
-                    ingredients.append(ri.ingredient.name)
-                    qty = (ri.notes or "").strip() if getattr(ri, "notes", None) else ""
-                    ingredient_lines.append(f"{qty} {ri.ingredient.name}".strip())
-        except Exception:
-            ingredients = []
-            ingredient_lines = []
-
-        prep_time = recipe.prep_time
-        cook_time = recipe.cook_time
-        total_time = None
-        if isinstance(prep_time, int) and isinstance(cook_time, int):
-            total_time = prep_time + cook_time
-        elif isinstance(prep_time, int):
-            total_time = prep_time
-        elif isinstance(cook_time, int):
-            total_time = cook_time
-
-        out.append(
-            RecipeResult(
-                id=recipe.id,
-                name=recipe.name,
-                description=recipe.description,
-                calories=calories,
-                image_url=recipe.image_url,
-                prep_time=prep_time,
-                cook_time=cook_time,
-                total_time=total_time,
-                servings=recipe.servings,
-                cuisine_type=(recipe.cuisine_type.value if recipe.cuisine_type is not None else None),
-                protein_g=(float(nut.protein_g) if nut is not None and nut.protein_g is not None else None),
-                carbs_g=(float(nut.carbs_g) if nut is not None and nut.carbs_g is not None else None),
-                fat_g=(float(nut.fat_g) if nut is not None and nut.fat_g is not None else None),
-                fiber_g=(float(nut.fiber_g) if nut is not None and nut.fiber_g is not None else None),
-                sugar_g=(float(nut.sugar_g) if nut is not None and nut.sugar_g is not None else None),
-                sodium_mg=(float(nut.sodium_mg) if nut is not None and nut.sodium_mg is not None else None),
-                ingredient_lines=ingredient_lines,
-                ingredients=ingredients,
-                instructions=recipe.instructions,
-                reasons=reasons,
-            )
+
+def _semantic_candidates(state: _SearchState):
+    # Vector-ranked search: the index already picked the most similar recipes,
+    # so every tier filters that fixed pool and a recipe keeps its first tier.
+    hits = _semantic_hits_table(state)
+    branches = []
+    for idx, tier in enumerate(state.tiers):
+        branch = (
+            _tier_branch(idx, tier, state)
+            .join(hits, hits.c.recipe_id == Recipe.id)
+            .add_columns(hits.c.score.label("score"))
+        )
+        branches.append(branch)
+    candidates = union_all(*branches).subquery("candidates")
+    deduped = select(
+        candidates,
+        func.row_number()
+        .over(partition_by=candidates.c.recipe_id, order_by=candidates.c.tier.asc())
+        .label("occurrence"),
+    ).subquery("deduped")
+    return (
+        select(
+            deduped.c.recipe_id,
+            deduped.c.tier,
+            deduped.c.score,
+            literal(0).label("name_hits"),
+            literal(0).label("desc_hits"),
+            literal(0).label("instr_hits"),
         )
+        .where(deduped.c.occurrence == 1)
+        .subquery("ranked")
+    )
+
 
+def _disjoint_tier_candidates(state: _SearchState, limit: int, after: Optional[_SortKey]):
+    # Without text terms every tier is ordered by id, so each tier excludes
+    # recipes an earlier tier already matches and seeks past the cursor directly.
+    start_tier = after[0] if after is not None else 0
+    branches = []
+    for idx, tier in enumerate(state.tiers):
+        earlier = [_tier_conditions(t) for t in state.tiers[:idx]]
+        if any(not conds for conds in earlier):
+            # An earlier tier has no tier-specific filter and already matches everything.
+            break
+        if idx < start_tier:
+            continue
+        branch = _tier_branch(idx, tier, state)
+        for conds in earlier:
+            branch = branch.filter(~func.coalesce(and_(*conds), False))
+        if after is not None and idx == start_tier:
+            branch = branch.filter(Recipe.id > after[4])
+        branch = branch.order_by(Recipe.id.asc()).limit(limit).subquery()
+        branches.append(select(branch.c.recipe_id, branch.c.tier))
+
+    if not branches:
+        return None
+    candidates = union_all(*branches).subquery("candidates")
+    return select(
+        candidates.c.recipe_id,
+        candidates.c.tier,
+        literal(0).label("score"),
+        literal(0).label("name_hits"),
+        literal(0).label("desc_hits"),
+        literal(0).label("instr_hits"),
+    ).subquery("ranked")
+
+
+def _facet_counts(db: Session, state: _SearchState, timer: Optional[StageTimer] = None) -> Dict[str, Any]:
+    """Match counts per calorie bucket, cuisine and macro flag for the query.
+
+    Counted over every recipe the query matches before calorie/nutrition tiers
+    (diet, text or semantic pool, allergy exclusions), so each count is what
+    adding that filter would leave. One FILTER aggregate, memoized on the state.
+    """
+    if state.facets is not None:
+        return state.facets
+
+    bucket = RecipeNutritionalInfo.calorie_bucket
+    columns: List[Tuple[str, Optional[str], Any]] = [("total", None, func.count())]
+    columns += [("calorie_bucket", b.value, func.count().filter(bucket == b.value)) for b in CalorieBucket]
+    columns += [("cuisine_type", c.value, func.count().filter(Recipe.cuisine_type == c)) for c in CuisineType]
+    columns += [
+        ("is_vegetarian", None, func.count().filter(Recipe.is_vegetarian.is_(True))),
+        ("high_protein", None, func.count().filter(RecipeNutritionalInfo.protein_g >= _HIGH_PROTEIN_MIN_G)),
+        ("low_carb", None, func.count().filter(RecipeNutritionalInfo.carbs_g <= _LOW_CARB_MAX_G)),
+    ]
+
+    q0 = select(*(expr for _, _, expr in columns)).select_from(Recipe).outerjoin(
+        RecipeNutritionalInfo, RecipeNutritionalInfo.recipe_id == Recipe.id
+    )
+    q0 = _apply_tier_filters(q0, _SearchTier(None, False, False, False, "facets"), state)
+    if state.semantic_hits is not None:
+        hits = _semantic_hits_table(state)
+        q0 = q0.join(hits, hits.c.recipe_id == Recipe.id)
+    with stage(timer, "facets"):
+        row = db.execute(q0).one()
+
+    facets: Dict[str, Any] = {"calorie_bucket": {}, "cuisine_type": {}}
+    for (name, value, _), count in zip(columns, row):
+        if value is None:
+            facets[name] = int(count)
+        elif count:
+            facets[name][value] = int(count)
+    state.facets = facets
+    return facets
+
+
+def _ranked_page(state: _SearchState, limit: int, after: Optional[_SortKey] = None):
+    """One page of the cascade as (recipe_id, tier, score, name/desc/instr hits).
+
+    Pages are ordered by (tier, score desc, name hits desc, desc hits desc, id)
+    and `after` seeks past a previous page's last key. None when nothing can match.
+    """
+    if state.semantic_hits is not None:
+        ranked = _semantic_candidates(state)
+    elif state.search_terms:
+        ranked = _ranked_window_candidates(state)
+    else:
+        ranked = _disjoint_tier_candidates(state, limit, after)
+    if ranked is None:
+        return None
+
+    page = select(
+        ranked.c.recipe_id,
+        ranked.c.tier,
+        ranked.c.score,
+        ranked.c.name_hits,
+        ranked.c.desc_hits,
+        ranked.c.instr_hits,
+    ).join(RecipeCard, RecipeCard.recipe_id == ranked.c.recipe_id)
+    if after is not None:
+        tier, score, n_hits, d_hits, recipe_id = after
+        page = page.where(
+            tuple_(ranked.c.tier, -ranked.c.score, -ranked.c.name_hits, -ranked.c.desc_hits, ranked.c.recipe_id)
+            > tuple_(literal(tier), literal(-score), literal(-n_hits), literal(-d_hits), literal(recipe_id))
+        )
+    return page.order_by(
+        ranked.c.tier.asc(),
+        ranked.c.score.desc(),
+        ranked.c.name_hits.desc(),
+        ranked.c.desc_hits.desc(),
+        ranked.c.recipe_id.asc(),
+    ).limit(limit)
+
+
+def _pages_query(db: Session, pages: Sequence[Tuple[_SearchState, Any]], view: ResultView):
+    # Cards for several ranked pages in one statement, tagged with the page index.
+    branches = []
+    for idx, (_, page) in enumerate(pages):
+        if page is None:
+            continue
+        sub = page.subquery()
+        branches.append(select(literal(idx).label("page"), *sub.c))
+    if not branches:
+        return None
+    combined = (branches[0] if len(branches) == 1 else union_all(*branches)).subquery("pages")
+
+    return (
+        _build_card_query(db, view)
+        .add_columns(
+            combined.c.page,
+            combined.c.tier,
+            combined.c.score,
+            combined.c.name_hits,
+            combined.c.desc_hits,
+            combined.c.instr_hits,
+        )
+        .join(combined, combined.c.recipe_id == RecipeCard.recipe_id)
+        .order_by(
+            combined.c.page.asc(),
+            combined.c.tier.asc(),
+            combined.c.score.desc(),
+            combined.c.name_hits.desc(),
+            combined.c.desc_hits.desc(),
+            combined.c.recipe_id.asc(),
+        )
+    )
+
+
+def _page_row_result(
+    pages: Sequence[Tuple[_SearchState, Any]], row: Any, view: ResultView
+) -> Tuple[int, _SortKey, RecipeSummary]:
+    card, instructions, page_idx, tier_idx, score, n_hits, d_hits, i_hits = row
+    state = pages[page_idx][0]
+    reasons: List[str] = []
+    if state.semantic_hits is not None:
+        reasons.append(f"similarity={score / _SEMANTIC_SCALE:.3f}")
+    elif state.search_terms:
+        reasons.append(f"score={score}")
+        if n_hits:
+            reasons.append(f"name_matches={n_hits}")
+        if d_hits:
+            reasons.append(f"desc_matches={d_hits}")
+        if i_hits:
+            reasons.append(f"instr_matches={i_hits}")
+    reasons.extend(_nutrition_reasons(card))
+    key = (int(tier_idx), int(score), int(n_hits), int(d_hits), int(card.recipe_id))
+    return int(page_idx), key, _build_recipe_result(card, instructions, reasons, view)
+
+
+def _fetch_pages(
+    db: Session,
+    pages: Sequence[Tuple[_SearchState, Any]],
+    view: ResultView = ResultView.FULL,
+    timer: Optional[StageTimer] = None,
+) -> List[List[Tuple[_SortKey, RecipeSummary]]]:
+    """Load the cards for several ranked pages in a single statement.
+
+    Returns one list of (sort key, result) pairs per entry of `pages`, in order.
+    """
+    out: List[List[Tuple[_SortKey, RecipeSummary]]] = [[] for _ in pages]
+    q0 = _pages_query(db, pages, view)
+    if q0 is None:
+        return out
+    with stage(timer, "sql"):
+        rows = q0.all()
+    with stage(timer, "build_results"):
+        for row in rows:
+            page_idx, key, result = _page_row_result(pages, row, view)
+            out[page_idx].append((key, result))
     return out
 
 
-def search_nl(db: Session, user: User, query: str, limit: int) -> Tuple[ParsedQuery, Dict[str, Any], List[RecipeResult]]:
-    parsed = parse_query(query)
+def _fetch_tiered_results(
+    db: Session,
+    state: _SearchState,
+    limit: int,
+    after: Optional[_SortKey] = None,
+    view: ResultView = ResultView.FULL,
+    timer: Optional[StageTimer] = None,
+) -> List[Tuple[_SortKey, RecipeSummary]]:
+    """Run every tier of the cascade in a single statement; see _ranked_page."""
+    return _fetch_pages(db, [(state, _ranked_page(state, limit, after))], view, timer)[0]
 
-    profile = db.query(UserProfile).filter(UserProfile.user_id == user.id).first()
-    bmi = compute_bmi(profile)
 
-    allergy_terms = _get_user_allergy_terms(db, user)
+def _query_allergy_terms(user_allergy_terms: FrozenSet[str], parsed: ParsedQuery) -> Set[str]:
+    allergy_terms = set(user_allergy_terms)
     # Merge explicit "exclude" terms from query into allergy terms.
     allergy_terms |= {_normalize_term(t) for t in parsed.exclude_terms if t}
     # Expand simple plural variants so "peanuts" can match ingredient "peanut".
@@ -709,12 +1289,45 @@ def search_nl(db: Session, user: User, query: str, limit: int) -> Tuple[ParsedQu
     for t in list(allergy_terms):
         if t.endswith("s") and len(t) > 3:
             expanded_allergy_terms.add(t[:-1])
-    allergy_terms = expanded_allergy_terms
-
-    mapped_ingredient_ids = _get_mapped_ingredient_ids(db, allergy_terms, user)
+    return expanded_allergy_terms
+
+
+def _prepare_search(
+    db: Session,
+    user: User,
+    query: str,
+    window: int,
+    mode: SearchMode = SearchMode.KEYWORD,
+    timer: Optional[StageTimer] = None,
+    *,
+    parsed: Optional[ParsedQuery] = None,
+    shared: Optional[_SharedExclusions] = None,
+    user_context: Optional[Tuple[FrozenSet[str], Optional[float]]] = None,
+) -> _SearchState:
+    # Batch search passes an already-parsed query and shared exclusion lookups;
+    # callers that already read the user context pass it along.
+    if parsed is None:
+        started = time.perf_counter()
+        parsed, source = _parse_query_with_source(query)
+        if timer is not None:
+            timer.record(f"parse_{source}", time.perf_counter() - started)
+
+    if user_context is None:
+        user_context = _get_user_context(db, user, timer)
+    user_allergy_terms, bmi = user_context
+    allergy_terms = _query_allergy_terms(user_allergy_terms, parsed)
+
+    if shared is not None:
+        exclusion_allergies = shared.exclusion_allergies(allergy_terms)
+        mapped_ingredient_ids = shared.mapped_ingredient_ids(set(exclusion_allergies))
+    else:
+        with stage(timer, "exclusion_allergies"):
+            exclusion_allergies = _get_exclusion_allergies(db, allergy_terms, user)
+        with stage(timer, "mapped_ingredient_ids"):
+            mapped_ingredient_ids = _get_mapped_ingredient_ids(db, set(exclusion_allergies))
 
     q_norm = _normalize_term(query)
-    q_tokens = set(re.findall(r"[a-zA-Z]{3,}", q_norm))
+    synonym_hits = _ALLERGY_QUERY_MATCHER.values(q_norm) if allergy_terms else set()
     warnings: List[str] = []
     for a in sorted(allergy_terms):
         syns = _ALLERGY_QUERY_SYNONYMS.get(a, [])
@@ -722,7 +1335,7 @@ def search_nl(db: Session, user: User, query: str, limit: int) -> Tuple[ParsedQu
             st = _normalize_term(s)
             if not st:
                 continue
-            if st in q_tokens or f" {st} " in f" {q_norm} ":
+            if (a, s) in synonym_hits:
                 warnings.append(f"Query seems to include '{st}' but you have selected allergy '{a}', so relevant recipes may be excluded.")
                 break
 
@@ -758,63 +1371,27 @@ def search_nl(db: Session, user: User, query: str, limit: int) -> Tuple[ParsedQu
 
     applied["search_terms"] = search_terms
 
+    # Semantic mode ranks by TF-IDF similarity over the content terms; with no
+    # content terms there is nothing to rank by, so it behaves like keyword mode.
+    semantic_hits: Optional[List[Tuple[int, int]]] = None
+    if mode == SearchMode.SEMANTIC and search_terms:
+        with stage(timer, "semantic_index"):
+            hits = get_index(db).search(" ".join(search_terms), k=min(window * 8, _SEMANTIC_MAX_CANDIDATES))
+        semantic_hits = [(rid, int(round(sim * _SEMANTIC_SCALE))) for rid, sim in hits]
+        applied["mode"] = SearchMode.SEMANTIC.value
+        applied["semantic_candidates"] = len(semantic_hits)
+
     # Soft enforcement: if BMI is high and user did NOT explicitly ask for high calorie,
     # prioritize low then medium.
+    bmi_prioritized_low = bmi is not None and bmi > _BMI_LOW_CAL_CUTOFF and not parsed.wants_high_calorie
     preferred_buckets: List[CalorieBucket] = []
-    if bmi is not None and bmi > _BMI_LOW_CAL_CUTOFF and not parsed.wants_high_calorie:
+    if bmi_prioritized_low:
         preferred_buckets = [CalorieBucket.LOW, CalorieBucket.MEDIUM]
     elif parsed.calorie_bucket is not None:
         preferred_buckets = [parsed.calorie_bucket]
     else:
         preferred_buckets = []
 
-    results: List[RecipeResult] = []
-    seen: Set[int] = set()
-
-    def run_once(
-        bucket: Optional[CalorieBucket],
-        *,
-        high_protein: bool = False,
-        low_carb: bool = False,
-        require_all_text_terms: bool = False,
-    ) -> List[RecipeResult]:
-        q0 = _build_base_recipe_query(db)
-
-        # Diet filter
-        if parsed.diet == DietType.VEG:
-            q0 = q0.filter(Recipe.is_vegetarian.is_(True))
-        elif parsed.diet == DietType.NON_VEG:
-            q0 = q0.filter(
-                (Recipe.is_vegetarian.is_(False)) | (Recipe.is_vegetarian.is_(None))
-            )
-
-        # Text search: only apply if we extracted meaningful terms.
-        q0 = _apply_text_search_terms(q0, search_terms, require_all=require_all_text_terms)
-
-        # Allergy / exclusions
-        q0 = _apply_allergy_exclusions(q0, allergy_terms, mapped_ingredient_ids)
-
-        # Nutrition constraints
-        if high_protein:
-            q0 = q0.filter(RecipeNutritionalInfo.protein_g >= _HIGH_PROTEIN_MIN_G)
-        if low_carb:
-            q0 = q0.filter(RecipeNutritionalInfo.carbs_g <= _LOW_CARB_MAX_G)
-
-        # Calorie bucket filter
-        if bucket is not None:
-            if bucket == CalorieBucket.LOW:
-                q0 = q0.filter(RecipeNutritionalInfo.calories < _LOW_MAX)
-            elif bucket == CalorieBucket.MEDIUM:
-                q0 = q0.filter(
-                    (RecipeNutritionalInfo.calories >= _LOW_MAX)
-                    & (RecipeNutritionalInfo.calories <= _MEDIUM_MAX)
-                )
-            elif bucket == CalorieBucket.HIGH:
-                q0 = q0.filter(RecipeNutritionalInfo.calories > _MEDIUM_MAX)
-
-        q0 = q0.order_by(Recipe.id.asc())
-        return _fetch_ranked_results(q0, limit, search_terms)
-
     # When user asks for multiple constraints like "high protein low carb", prefer
     # matching BOTH first, then gracefully relax.
     attempts: List[Tuple[bool, bool, bool, str]] = []
@@ -832,54 +1409,369 @@ def search_nl(db: Session, user: User, query: str, limit: int) -> Tuple[ParsedQu
     else:
         attempts.append((False, False, False, "no_nutrition"))
 
-    used_attempt: Optional[str] = None
-
+    # Each attempt tries the preferred calorie buckets first, then no bucket.
+    tiers: List[_SearchTier] = []
     for hp, lc, req_all, label in attempts:
-        if len(results) >= limit:
-            break
+        for b in preferred_buckets:
+            tiers.append(_SearchTier(b, hp, lc, req_all, label))
+        tiers.append(_SearchTier(None, hp, lc, req_all, label))
+
+    return _SearchState(
+        user_id=user.id,
+        query=query,
+        parsed=parsed,
+        applied=applied,
+        search_terms=search_terms,
+        allergy_terms=allergy_terms,
+        exclusion_allergies=exclusion_allergies,
+        tiers=tiers,
+        bmi_prioritized_low=bmi_prioritized_low,
+        wants_both_constraints=wants_hp and wants_lc,
+        window=window,
+        semantic_hits=semantic_hits,
+    )
+
+
+_MAX_RANKING_WINDOW = 250
+
+
+def _ranking_window(limit: int) -> int:
+    return min(max(limit * 10, 50), _MAX_RANKING_WINDOW)
+
+
+# First pages of search_nl for identical inputs. The catalog version in the key
+# drops every entry once recipes or allergy mappings change.
+_result_cache: TTLCache[Tuple[ParsedQuery, Dict[str, Any], List[RecipeSummary], Optional[str]]] = TTLCache(
+    maxsize=int(getattr(settings, "SEARCH_RESULT_CACHE_SIZE", 1024) or 1024),
+    ttl=float(getattr(settings, "SEARCH_RESULT_CACHE_TTL_SECONDS", 300) or 300),
+)
+
+
+_stage_seconds = histogram(
+    "search_nl_stage_seconds",
+    "Time spent in each stage of search_nl.",
+    "stage",
+)
+
 
-        before_count = len(results)
-        if preferred_buckets:
-            for b in preferred_buckets:
-                for r in run_once(b, high_protein=hp, low_carb=lc, require_all_text_terms=req_all):
-                    if r.id in seen:
-                        continue
-                    r.reasons.append(f"calorie_bucket={_calorie_bucket_for_recipe(r.calories)}")
-                    if hp:
-                        r.reasons.append("constraint=high_protein")
-                    if lc:
-                        r.reasons.append("constraint=low_carb")
-                    if bmi is not None and bmi > _BMI_LOW_CAL_CUTOFF and not parsed.wants_high_calorie:
-                        r.reasons.append("bmi_high_prioritized_low")
-                    results.append(r)
-                    seen.add(r.id)
-                    if len(results) >= limit:
-                        break
-                if len(results) >= limit:
-                    break
-
-        # If still not enough results, run without calorie bucket restriction.
-        if len(results) < limit:
-            for r in run_once(None, high_protein=hp, low_carb=lc, require_all_text_terms=req_all):
-                if r.id in seen:
-                    continue
-                if hp:
-                    r.reasons.append("constraint=high_protein")
-                if lc:
-                    r.reasons.append("constraint=low_carb")
-                if label != "no_nutrition":
-                    r.reasons.append(f"fallback_attempt={label}")
-                results.append(r)
-                seen.add(r.id)
-                if len(results) >= limit:
-                    break
-
-        if len(results) > before_count and used_attempt is None:
-            used_attempt = label
-
-    if used_attempt and used_attempt != "both" and wants_hp and wants_lc:
-        warnings.append(
+def _bmi_bucket(bmi: Optional[float]) -> Optional[str]:
+    # Search only depends on which side of the cutoff the BMI falls.
+    if bmi is None:
+        return None
+    return "high" if bmi > _BMI_LOW_CAL_CUTOFF else "normal"
+
+
+def _catalog_version(db: Session) -> int:
+    max_age = float(getattr(settings, "SEARCH_CATALOG_VERSION_MAX_AGE_SECONDS", 2.0) or 0.0)
+    return CatalogVersion.current(db, max_age=max_age)
+
+
+def _result_cache_key(
+    version: int,
+    query: str,
+    allergy_terms: FrozenSet[str],
+    bmi: Optional[float],
+    limit: int,
+    view: ResultView,
+    mode: SearchMode,
+    facets: bool = False,
+) -> Tuple[Any, ...]:
+    return (
+        version,
+        _normalize_term(query),
+        tuple(sorted(allergy_terms)),
+        _bmi_bucket(bmi),
+        limit,
+        view.value,
+        mode.value,
+        facets,
+    )
+
+
+def _add_tier_reasons(state: _SearchState, key: _SortKey, r: RecipeSummary) -> None:
+    tier = state.tiers[key[0]]
+    if tier.bucket is not None:
+        r.reasons.append(f"calorie_bucket={_calorie_bucket_for_recipe(r.calories)}")
+    if tier.high_protein:
+        r.reasons.append("constraint=high_protein")
+    if tier.low_carb:
+        r.reasons.append("constraint=low_carb")
+    if tier.bucket is not None:
+        if state.bmi_prioritized_low:
+            r.reasons.append("bmi_high_prioritized_low")
+    elif tier.label != "no_nutrition":
+        r.reasons.append(f"fallback_attempt={tier.label}")
+
+
+def _note_first_page(state: _SearchState, first_key: Optional[_SortKey]) -> None:
+    used_attempt: Optional[str] = state.tiers[first_key[0]].label if first_key else None
+    if used_attempt and used_attempt != "both" and state.wants_both_constraints:
+        state.applied["warnings"].append(
             "No recipes matched all requested constraints (high protein + low carb). Showing best available matches."
         )
 
-    return parsed, applied, results
+
+def _next_cursor(state: _SearchState, state_id: Optional[str], last_key: _SortKey, mode: SearchMode) -> str:
+    if state_id is None:
+        state_id = uuid.uuid4().hex
+        _search_states.put(state_id, state)
+    payload: Dict[str, Any] = {
+        "k": "nl", "sid": state_id, "q": state.query, "w": state.window, "after": list(last_key)
+    }
+    if mode != SearchMode.KEYWORD:
+        payload["m"] = mode.value
+    return encode_cursor(payload)
+
+
+def _finish_page(
+    state: _SearchState,
+    tiered: List[Tuple[_SortKey, RecipeSummary]],
+    limit: int,
+    after: Optional[_SortKey],
+    state_id: Optional[str],
+    mode: SearchMode,
+) -> Tuple[List[RecipeSummary], Optional[str]]:
+    """Add tier reasons and first-page warnings, and mint the next cursor."""
+    results: List[RecipeSummary] = []
+    for key, r in tiered:
+        _add_tier_reasons(state, key, r)
+        results.append(r)
+
+    if after is None:
+        _note_first_page(state, tiered[0][0] if tiered else None)
+
+    next_cursor: Optional[str] = None
+    if len(tiered) == limit:
+        next_cursor = _next_cursor(state, state_id, tiered[-1][0], mode)
+    return results, next_cursor
+
+
+def _search_state_from_cursor(
+    db: Session, user: User, cursor: str, timer: Optional[StageTimer] = None
+) -> Tuple[_SearchState, str, _SortKey, SearchMode]:
+    token = decode_cursor(cursor, kind="nl")
+    try:
+        after = tuple(int(x) for x in token["after"])
+        state_id = str(token["sid"])
+        query = str(token["q"])
+        window = int(token["w"])
+        mode = SearchMode(token.get("m", SearchMode.KEYWORD.value))
+    except (KeyError, TypeError, ValueError):
+        raise InvalidCursorError("Invalid cursor")
+    # Cursors are not signed; the window drives the candidate LIMIT and the
+    # semantic k, so only values _ranking_window can produce are accepted.
+    if len(after) != 5 or not 0 < window <= _MAX_RANKING_WINDOW:
+        raise InvalidCursorError("Invalid cursor")
+    state = _search_states.get(state_id)
+    if state is not None and state.user_id != user.id:
+        state = None
+    if state is None:
+        state = _prepare_search(db, user, query, window, mode, timer)
+        _search_states.put(state_id, state)
+    return state, state_id, after, mode  # type: ignore[return-value]
+
+
+def search_nl(
+    db: Session,
+    user: User,
+    query: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    view: ResultView = ResultView.FULL,
+    mode: SearchMode = SearchMode.KEYWORD,
+    debug: bool = False,
+    facets: bool = False,
+) -> Tuple[ParsedQuery, Dict[str, Any], List[RecipeSummary], Optional[str]]:
+    """Natural-language search. Pass the returned cursor to fetch the next page.
+
+    First pages are served from a result cache when the same query was run for
+    the same allergies and BMI bucket since the catalog last changed.
+
+    mode=semantic ranks by local TF-IDF similarity instead of keyword hits; the
+    diet, allergy and calorie/nutrition tiers apply the same way.
+
+    Stage durations always feed the search_nl_stage_seconds histogram; with
+    debug=True they are also returned in milliseconds as applied["timings"].
+    facets=True adds applied["facets"] (see _facet_counts).
+
+    Cursor pages reuse the cached parse/exclusions when available; otherwise the
+    state is rebuilt from the query stored in the cursor.
+    """
+    after: Optional[_SortKey] = None
+    state: Optional[_SearchState] = None
+    state_id: Optional[str] = None
+    cache_key: Optional[Tuple[Any, ...]] = None
+    timer = StageTimer(_stage_seconds)
+    started = time.perf_counter()
+    if cursor:
+        state, state_id, after, mode = _search_state_from_cursor(db, user, cursor, timer)
+    else:
+        allergy_terms, bmi = _get_user_context(db, user, timer)
+        with stage(timer, "catalog_version"):
+            version = _catalog_version(db)
+        cache_key = _result_cache_key(version, query, allergy_terms, bmi, limit, view, mode, facets)
+        cached = _result_cache.get(cache_key)
+        if cached is not None:
+            parsed, applied, results, next_cursor = cached
+            applied = copy.deepcopy(applied)
+            applied["bmi"] = bmi
+            timer.record("total_cached", time.perf_counter() - started)
+            if debug:
+                applied["timings"] = timer.timings
+            return parsed, applied, list(results), next_cursor
+        state = _prepare_search(
+            db, user, query, _ranking_window(limit), mode, timer, user_context=(allergy_terms, bmi)
+        )
+
+    tiered = _fetch_tiered_results(db, state, limit, after, view, timer)
+    results, next_cursor = _finish_page(state, tiered, limit, after, state_id, mode)
+    applied = state.applied
+    if facets:
+        applied = dict(applied, facets=_facet_counts(db, state, timer))
+
+    if cache_key is not None:
+        _result_cache.put(cache_key, (state.parsed, copy.deepcopy(applied), results, next_cursor))
+    timer.record("total", time.perf_counter() - started)
+    if debug:
+        applied = dict(applied, timings=timer.timings)
+    return state.parsed, applied, results, next_cursor
+
+
+def iter_search_nl(
+    db: Session,
+    user: User,
+    query: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    view: ResultView = ResultView.FULL,
+    mode: SearchMode = SearchMode.KEYWORD,
+    facets: bool = False,
+    batch_size: int = 100,
+) -> Iterator[Union[RecipeSummary, Dict[str, Any]]]:
+    """Streaming search_nl: yields each result as it is built, then a trailer.
+
+    Rows come from a server-side cursor; the last item is
+    {"applied": ..., "next_cursor": ...}. Parsing, exclusion lookups and cursor
+    validation happen before this returns, so errors surface before streaming.
+    The result cache is not used.
+    """
+    timer = StageTimer(_stage_seconds)
+    after: Optional[_SortKey] = None
+    state_id: Optional[str] = None
+    if cursor:
+        state, state_id, after, mode = _search_state_from_cursor(db, user, cursor, timer)
+    else:
+        state = _prepare_search(db, user, query, _ranking_window(limit), mode, timer)
+    facet_counts = _facet_counts(db, state, timer) if facets else None
+    pages = [(state, _ranked_page(state, limit, after))]
+    return _stream_page(
+        _pages_query(db, pages, view), pages, state_id, after, limit, view, mode, facet_counts, batch_size
+    )
+
+
+def _stream_page(
+    q0: Any,
+    pages: Sequence[Tuple[_SearchState, Any]],
+    state_id: Optional[str],
+    after: Optional[_SortKey],
+    limit: int,
+    view: ResultView,
+    mode: SearchMode,
+    facet_counts: Optional[Dict[str, Any]],
+    batch_size: int,
+) -> Iterator[Union[RecipeSummary, Dict[str, Any]]]:
+    state = pages[0][0]
+    last_key: Optional[_SortKey] = None
+    count = 0
+    for row in (q0.yield_per(batch_size) if q0 is not None else []):
+        _, key, r = _page_row_result(pages, row, view)
+        _add_tier_reasons(state, key, r)
+        if last_key is None and after is None:
+            _note_first_page(state, key)
+        last_key = key
+        count += 1
+        yield r
+
+    next_cursor: Optional[str] = None
+    if last_key is not None and count == limit:
+        next_cursor = _next_cursor(state, state_id, last_key, mode)
+    applied = state.applied
+    if facet_counts is not None:
+        applied = dict(applied, facets=facet_counts)
+    yield {"applied": applied, "next_cursor": next_cursor}
+
+
+SearchOutput = Tuple[ParsedQuery, Dict[str, Any], List[RecipeSummary], Optional[str]]
+
+
+def search_nl_batch(
+    db: Session,
+    user: User,
+    queries: Sequence[str],
+    limit: int,
+    view: ResultView = ResultView.FULL,
+    mode: SearchMode = SearchMode.KEYWORD,
+    debug: bool = False,
+) -> List[SearchOutput]:
+    """search_nl for several first-page queries of one user, in query order.
+
+    The profile/allergy context and catalog version are read once, Gemini parses
+    run concurrently, exclusion lookups are loaded once for the union of every
+    query's allergy terms, and all uncached pages are fetched in one statement.
+    Each output's next_cursor works with search_nl.
+    """
+    timer = StageTimer(_stage_seconds)
+    started = time.perf_counter()
+
+    user_allergy_terms, bmi = _get_user_context(db, user, timer)
+    with stage(timer, "catalog_version"):
+        version = _catalog_version(db)
+
+    outputs: List[Optional[SearchOutput]] = [None] * len(queries)
+    keys = [_result_cache_key(version, q, user_allergy_terms, bmi, limit, view, mode) for q in queries]
+    misses: List[int] = []
+    for idx, key in enumerate(keys):
+        cached = _result_cache.get(key)
+        if cached is None:
+            misses.append(idx)
+            continue
+        parsed, applied, results, next_cursor = cached
+        applied = copy.deepcopy(applied)
+        applied["bmi"] = bmi
+        outputs[idx] = (parsed, applied, list(results), next_cursor)
+
+    if misses:
+        with stage(timer, "parse_batch"):
+            parsed_list = [p for p, _ in _parse_queries([queries[i] for i in misses])]
+        all_terms: Set[str] = set()
+        for parsed in parsed_list:
+            all_terms |= _query_allergy_terms(user_allergy_terms, parsed)
+        with stage(timer, "exclusion_lookups"):
+            shared = _SharedExclusions(db, all_terms, user)
+
+        window = _ranking_window(limit)
+        states = [
+            _prepare_search(
+                db,
+                user,
+                queries[i],
+                window,
+                mode,
+                timer,
+                parsed=parsed,
+                shared=shared,
+                user_context=(user_allergy_terms, bmi),
+            )
+            for i, parsed in zip(misses, parsed_list)
+        ]
+        pages = _fetch_pages(db, [(state, _ranked_page(state, limit)) for state in states], view, timer)
+        for idx, state, tiered in zip(misses, states, pages):
+            results, next_cursor = _finish_page(state, tiered, limit, None, None, mode)
+            _result_cache.put(keys[idx], (state.parsed, copy.deepcopy(state.applied), results, next_cursor))
+            outputs[idx] = (state.parsed, state.applied, results, next_cursor)
+
+    timer.record("batch_total", time.perf_counter() - started)
+    final: List[SearchOutput] = [out for out in outputs if out is not None]
+    if debug:
+        final = [(p, dict(a, timings=timer.timings), r, c) for p, a, r, c in final]
+    return final
@@ -1,157 +1,36 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import inspect, text
-from sqlalchemy.orm import Session
+from fastapi.responses import PlainTextResponse
 
 from .core.config import settings
-from .core.security import get_password_hash
+from .core.metrics import render_all as render_metrics
 from . import models
-from .db.session import engine, SessionLocal, Base
+from .features.catalog.remap import RemapWorker
 from .api.v1.api import api_router
-from .models.allergy import Allergy
-from .models.ingredient import Ingredient
-from .models.user import User
 
-# Create database tables
+# Every model is registered before the first request configures mappers.
+# Tables, schema upgrades and seed data come from app.scripts.bootstrap, so
+# importing this module does no database work.
 _ = models
-Base.metadata.create_all(bind=engine)
-
-def _ensure_user_is_superuser_column() -> None:
-    insp = inspect(engine)
-    try:
-        cols = {c.get("name") for c in insp.get_columns("users")}
-    except Exception:
-        return
-    if "is_superuser" in cols:
-        return
-    with engine.begin() as conn:
-        conn.execute(text("ALTER TABLE users ADD COLUMN is_superuser BOOLEAN DEFAULT FALSE"))
-        conn.execute(text("UPDATE users SET is_superuser = FALSE WHERE is_superuser IS NULL"))
-
-def _ensure_first_superuser() -> None:
-    email = getattr(settings, "FIRST_SUPERUSER_EMAIL", "") or ""
-    password = getattr(settings, "FIRST_SUPERUSER_PASSWORD", "") or ""
-    email = email.strip()
-    if not email or not password:
-        return
-
-    db = SessionLocal()
-    try:
-        user = db.query(User).filter(User.email == email).first()
-        if user is None:
-            user = User(
-                email=email,
-                hashed_password=get_password_hash(password),
-                full_name="Admin",
-                is_active=True,
-                is_superuser=True,
-            )
-            db.add(user)
-            db.commit()
-            return
-
-        if not getattr(user, "is_superuser", False):
-            user.is_superuser = True
-            db.commit()
-    finally:
-        db.close()
-
-def _ensure_default_allergies() -> None:
-    if not getattr(settings, "SEED_DEFAULT_ALLERGIES", True):
-        return
-
-    default_allergies: list[tuple[str, str | None]] = [
-        ("milk", "Dairy / milk proteins"),
-        ("egg", "Eggs and egg products"),
-        ("peanut", "Peanuts and peanut products"),
-        ("tree nut", "Almonds, cashews, walnuts, etc."),
-        ("soy", "Soybeans and soy products"),
-        ("wheat", "Wheat and wheat products"),
-        ("gluten", "Gluten-containing grains"),
-        ("fish", "Fish and fish products"),
-        ("shellfish", "Shrimp, crab, lobster, etc."),
-        ("sesame", "Sesame and sesame products"),
-    ]
-
-    aliases: dict[str, list[str]] = {
-        "milk": ["milk", "dairy", "cheese", "butter", "cream", "yogurt"],
-        "egg": ["egg", "eggs"],
-        "peanut": ["peanut", "peanuts", "peanut butter"],
-        "tree nut": [
-            "tree nut",
-            "almond",
-            "cashew",
-            "walnut",
-            "pistachio",
-            "pecan",
-            "hazelnut",
-        ],
-        "soy": ["soy", "soya", "tofu", "edamame"],
-        "wheat": ["wheat", "flour"],
-        "gluten": ["gluten"],
-        "fish": ["fish", "salmon", "tuna"],
-        "shellfish": ["shellfish", "shrimp", "prawn", "crab", "lobster"],
-        "sesame": ["sesame", "tahini"],
-    }
-
-    limit = int(getattr(settings, "SEED_DEFAULT_ALLERGIES_AUTOMAP_LIMIT", 25) or 25)
-    if limit < 1:
-        limit = 1
 
-    db = SessionLocal()
-    try:
-        created_or_existing: list[Allergy] = []
-        for name, desc in default_allergies:
-            existing = db.query(Allergy).filter(Allergy.name.ilike(name)).first()
-            if existing is not None:
-                created_or_existing.append(existing)
-                continue
-            obj = Allergy(name=name, description=desc)
-            db.add(obj)
-            created_or_existing.append(obj)
-
-        db.commit()
-
-        for allergy in created_or_existing:
-            db.refresh(allergy)
-
-        for allergy in created_or_existing:
-            if allergy.id is None:
-                continue
-            if allergy.ingredient_mappings and len(allergy.ingredient_mappings) > 0:
-                continue
-
-            mapped_ids: set[int] = set()
-            terms = aliases.get((allergy.name or "").strip().lower(), [])
-            for term in sorted(set(t.strip() for t in terms if t and t.strip()), key=len, reverse=True):
-                like = f"%{term}%"
-                rows = (
-                    db.query(Ingredient)
-                    .filter(Ingredient.name.ilike(like))
-                    .order_by(Ingredient.id.asc())
-                    .limit(limit)
-                    .all()
-                )
-                for ing in rows:
-                    mapped_ids.add(ing.id)
-                    if len(mapped_ids) >= limit:
-                        break
-                if len(mapped_ids) >= limit:
-                    break
-
-            for ing_id in sorted(mapped_ids):
-                allergy.add_ingredient_mapping(db=db, ingredient_id=ing_id)
-
-        db.commit()
-    finally:
-        db.close()
+_remap_worker = RemapWorker(
+    interval=settings.ALLERGY_REMAP_INTERVAL_SECONDS,
+    batch_size=settings.ALLERGY_REMAP_BATCH_SIZE,
+)
 
-_ensure_user_is_superuser_column()
-_ensure_first_superuser()
-_ensure_default_allergies()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Maps ingredients new ingest runs create; see IngredientRemapQueue.
+    if settings.ALLERGY_REMAP_WORKER:
+        _remap_worker.start()
+    yield
+    _remap_worker.stop(timeout=5.0)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url="/docs",  # Enable Swagger UI at /docs
     redoc_url="/redoc",  # Enable ReDoc at /redoc
@@ -165,11 +44,17 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor"],
     )
 
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    # Prometheus text format; search_nl per-stage latency histograms.
+    return render_metrics()
+
 @app.get("/")
 def root():
     return {
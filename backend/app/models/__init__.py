@@ -3,18 +3,20 @@ from app.db.session import Base, engine, get_db
 from .user import User
 from .profile import UserProfile
 from .chronic_disease import ChronicDisease, UserChronicDisease
-from .allergy import Allergy, AllergyIngredientMap, UserAllergy
+from .allergy import Allergy, AllergyIngredientMap, AllergyRecipeExclusion, IngredientRemapQueue, UserAllergy
 from .ingredient import Ingredient, RecipeIngredient
-from .recipe import Recipe, RecipeNutritionalInfo, MealType, CuisineType
+from .recipe import Recipe, RecipeCard, RecipeNutritionalInfo, RecipeSourceHash, MealType, CuisineType
 from .meal import MealPlan, Meal, MealRecipe
+from .catalog import CatalogVersion
 
 # This will be used to import all models in main.py
 __all__ = [
     'Base', 'engine', 'get_db',
     'User', 'UserProfile',
     'ChronicDisease', 'UserChronicDisease',
-    'Allergy', 'AllergyIngredientMap', 'UserAllergy',
+    'Allergy', 'AllergyIngredientMap', 'AllergyRecipeExclusion', 'IngredientRemapQueue', 'UserAllergy',
     'Ingredient', 'RecipeIngredient',
-    'Recipe', 'RecipeNutritionalInfo', 'MealType', 'CuisineType',
-    'MealPlan', 'Meal', 'MealRecipe'
+    'Recipe', 'RecipeCard', 'RecipeNutritionalInfo', 'RecipeSourceHash', 'MealType', 'CuisineType',
+    'MealPlan', 'Meal', 'MealRecipe',
+    'CatalogVersion'
 ]
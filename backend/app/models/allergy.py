@@ -1,6 +1,65 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint
+from typing import Iterable, Mapping, Optional, Sequence
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, SmallInteger, String, ForeignKey, Index, UniqueConstraint, any_, bindparam, case, column, delete, func, literal, select, union, update, values
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.orm import Session, relationship
 from app.db.session import Base
+from .catalog import CatalogVersion
+from .ingredient import Ingredient, RecipeIngredient
+from .recipe import Recipe
+
+# Recipe.allergen_mask is a signed BIGINT; bits 0..62 keep it non-negative.
+MAX_MASK_BITS = 63
+
+# Allergies seeded at startup.
+DEFAULT_ALLERGIES: list[tuple[str, str | None]] = [
+    ("milk", "Dairy / milk proteins"),
+    ("egg", "Eggs and egg products"),
+    ("peanut", "Peanuts and peanut products"),
+    ("tree nut", "Almonds, cashews, walnuts, etc."),
+    ("soy", "Soybeans and soy products"),
+    ("wheat", "Wheat and wheat products"),
+    ("gluten", "Gluten-containing grains"),
+    ("fish", "Fish and fish products"),
+    ("shellfish", "Shrimp, crab, lobster, etc."),
+    ("sesame", "Sesame and sesame products"),
+]
+
+# Ingredient name terms per allergy name, used for automatic mapping.
+ALLERGY_ALIASES: dict[str, list[str]] = {
+    "milk": ["milk", "dairy", "cheese", "butter", "cream", "yogurt"],
+    "egg": ["egg", "eggs"],
+    "peanut": ["peanut", "peanuts", "peanut butter"],
+    "tree nut": [
+        "tree nut",
+        "almond",
+        "cashew",
+        "walnut",
+        "pistachio",
+        "pecan",
+        "hazelnut",
+    ],
+    "soy": ["soy", "soya", "tofu", "edamame"],
+    "wheat": ["wheat", "flour"],
+    "gluten": ["gluten"],
+    "fish": ["fish", "salmon", "tuna"],
+    "shellfish": ["shellfish", "shrimp", "prawn", "crab", "lobster"],
+    "sesame": ["sesame", "tahini"],
+}
+
+
+def allergy_terms(name: str) -> list[str]:
+    """Ingredient name terms for an allergy: its aliases, else the name and its singular."""
+    key = " ".join(name.lower().split())
+    if not key:
+        return []
+    if key in ALLERGY_ALIASES:
+        return list(ALLERGY_ALIASES[key])
+    terms = [key]
+    if key.endswith("s") and len(key) > 3:
+        terms.append(key[:-1])
+    return terms
+
 
 class Allergy(Base):
     __tablename__ = "allergies"
@@ -8,6 +67,9 @@ class Allergy(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True, nullable=False)
     description = Column(String, nullable=True)
+    # Bit of this allergy in Recipe.allergen_mask, assigned by
+    # AllergyRecipeExclusion.refresh; allergies past MAX_MASK_BITS get none.
+    mask_bit = Column(SmallInteger, unique=True, nullable=True)
     
     # Relationship
     user_profiles = relationship("UserAllergy", back_populates="allergy")
@@ -18,17 +80,97 @@ class Allergy(Base):
     )
 
     def add_ingredient_mapping(self, db: Session, ingredient_id: int) -> None:
-        existing = (
-            db.query(AllergyIngredientMap)
-            .filter(
-                AllergyIngredientMap.allergy_id == self.id,
-                AllergyIngredientMap.ingredient_id == ingredient_id,
+        Allergy.map_ingredients(db, [(self.id, ingredient_id)])
+
+    @staticmethod
+    def map_ingredients(db: Session, pairs: Iterable[tuple[int, int]]) -> int:
+        """Insert (allergy_id, ingredient_id) mappings in one statement; returns how many were new."""
+        rows = [{"allergy_id": a, "ingredient_id": i} for a, i in sorted(set(pairs))]
+        if not rows:
+            return 0
+        stmt = insert(AllergyIngredientMap).values(rows).on_conflict_do_nothing(
+            index_elements=[AllergyIngredientMap.allergy_id, AllergyIngredientMap.ingredient_id]
+        )
+        return db.execute(stmt.execution_options(preserve_rowcount=True)).rowcount
+
+    @staticmethod
+    def map_ingredients_by_terms(
+        db: Session,
+        terms: Mapping[int, Sequence[str]],
+        limit: Optional[int] = None,
+        *,
+        ingredient_ids: Optional[Iterable[int]] = None,
+    ) -> dict[int, list[int]]:
+        """Map every allergy to the ingredients whose name contains one of its terms.
+
+        One INSERT ... SELECT for all allergies, skipping existing mappings.
+        With `limit`, each allergy gets at most `limit` ingredients: terms are
+        tried longest first, each contributing its first `limit` matches by
+        ingredient id. `ingredient_ids` restricts matching to those
+        ingredients. Returns allergy_id -> matched ingredient ids (new and
+        already mapped), sorted.
+        """
+        rows = [
+            (allergy_id, term, rank)
+            for allergy_id, allergy_terms in terms.items()
+            for rank, term in enumerate(
+                sorted({t.strip() for t in allergy_terms if t and t.strip()}, key=lambda t: (-len(t), t))
             )
-            .first()
+        ]
+        if not rows:
+            return {}
+
+        term_rows = values(
+            column("allergy_id", Integer), column("term", String), column("term_rank", Integer), name="terms"
+        ).data(rows)
+        hits = (
+            select(
+                term_rows.c.allergy_id,
+                term_rows.c.term_rank,
+                Ingredient.id.label("ingredient_id"),
+                func.row_number()
+                .over(partition_by=(term_rows.c.allergy_id, term_rows.c.term_rank), order_by=Ingredient.id)
+                .label("rn"),
+            )
+            .select_from(term_rows)
+            .join(Ingredient, Ingredient.name.ilike(literal("%") + term_rows.c.term + literal("%")))
         )
-        if existing is not None:
-            return
-        db.add(AllergyIngredientMap(allergy_id=self.id, ingredient_id=ingredient_id))
+        if ingredient_ids is not None:
+            hits = hits.where(Ingredient.id.in_(sorted(set(ingredient_ids))))
+        hits = hits.subquery("hits")
+        # An ingredient counts at its first (term, id) position across the allergy's terms.
+        ranked = select(
+            hits.c.allergy_id,
+            hits.c.ingredient_id,
+            func.row_number()
+            .over(partition_by=hits.c.allergy_id, order_by=(func.min(hits.c.term_rank), hits.c.ingredient_id))
+            .label("pick"),
+        ).group_by(hits.c.allergy_id, hits.c.ingredient_id)
+        if limit is not None:
+            ranked = ranked.where(hits.c.rn <= limit)
+        ranked = ranked.subquery("ranked")
+        picked = select(ranked.c.allergy_id, ranked.c.ingredient_id)
+        if limit is not None:
+            picked = picked.where(ranked.c.pick <= limit)
+        picked = picked.cte("picked")
+
+        inserted = (
+            insert(AllergyIngredientMap)
+            .from_select(["allergy_id", "ingredient_id"], select(picked.c.allergy_id, picked.c.ingredient_id))
+            .on_conflict_do_nothing(
+                index_elements=[AllergyIngredientMap.allergy_id, AllergyIngredientMap.ingredient_id]
+            )
+            .cte("inserted")
+        )
+        result: dict[int, list[int]] = {allergy_id: [] for allergy_id in terms}
+        stmt = (
+            select(picked.c.allergy_id, picked.c.ingredient_id)
+            .add_cte(inserted)
+            .order_by(picked.c.allergy_id, picked.c.ingredient_id)
+        )
+        for allergy_id, ingredient_id in db.execute(stmt):
+            result[allergy_id].append(ingredient_id)
+        return result
 
     def remove_ingredient_mapping(self, db: Session, ingredient_id: int) -> bool:
         existing = (
@@ -68,3 +210,257 @@ class AllergyIngredientMap(Base):
 
     allergy = relationship("Allergy", back_populates="ingredient_mappings")
     ingredient = relationship("Ingredient", back_populates="allergy_mappings")
+
+
+class IngredientRemapQueue(Base):
+    """Ingredients created by ingest that allergies have not been matched against yet.
+
+    Ingest enqueues new ingredient ids in its own transaction; drain() maps
+    them in the background (app.features.catalog.remap).
+    """
+
+    __tablename__ = "ingredient_remap_queue"
+
+    ingredient_id = Column(Integer, ForeignKey("ingredients.id", ondelete="CASCADE"), primary_key=True)
+    queued_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    @classmethod
+    def enqueue(cls, db: Session, ingredient_ids: Iterable[int]) -> None:
+        rows = [{"ingredient_id": i} for i in sorted({int(i) for i in ingredient_ids})]
+        if rows:
+            db.execute(insert(cls).values(rows).on_conflict_do_nothing(index_elements=[cls.ingredient_id]))
+
+    @classmethod
+    def drain(cls, db: Session, batch_size: int = 1000) -> tuple[int, int]:
+        """Match one batch of queued ingredients against every allergy's terms.
+
+        Claims up to `batch_size` ids (SKIP LOCKED, so concurrent drains split
+        the queue), maps matches in bulk (at most `batch_size` per allergy, i.e.
+        every claimed match) and refreshes exclusions of only the recipes using
+        those ingredients. The caller commits. Returns (ingredients processed,
+        matches).
+        """
+        claimed = (
+            select(cls.ingredient_id)
+            .order_by(cls.ingredient_id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        ids = list(db.execute(delete(cls).where(cls.ingredient_id.in_(claimed)).returning(cls.ingredient_id)).scalars())
+        if not ids:
+            return 0, 0
+
+        terms = {
+            allergy_id: allergy_terms(name or "")
+            for allergy_id, name in db.execute(select(Allergy.id, Allergy.name))
+        }
+        matched = Allergy.map_ingredients_by_terms(db, terms, batch_size, ingredient_ids=ids)
+        pairs = [(allergy_id, i) for allergy_id, hits in matched.items() for i in hits]
+        if pairs:
+            AllergyRecipeExclusion.add_mapped(db, pairs)
+            CatalogVersion.bump(db)
+        return len(ids), len(pairs)
+
+
+class AllergyRecipeExclusion(Base):
+    """Materialized set of recipes excluded for an allergy.
+
+    A recipe is excluded when one of its ingredients is mapped to the allergy or
+    its ingredient name contains the allergy name (or its singular form). Search
+    anti-joins this table instead of rebuilding EXISTS subqueries per request.
+    """
+
+    __tablename__ = "allergy_recipe_exclusions"
+
+    allergy_id = Column(Integer, ForeignKey("allergies.id", ondelete="CASCADE"), primary_key=True)
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True)
+
+    __table_args__ = (
+        Index("ix_allergy_recipe_exclusions_recipe_allergy", "recipe_id", "allergy_id"),
+    )
+
+    @classmethod
+    def refresh(
+        cls,
+        db: Session,
+        allergy_ids: Optional[Iterable[int]] = None,
+        *,
+        recipe_ids: Optional[Iterable[int]] = None,
+    ) -> None:
+        """Recompute exclusions and recipe allergen masks.
+
+        Covers the given allergies (all allergies when None) and, with
+        `recipe_ids`, only those recipes (e.g. the ones an ingest wrote).
+        """
+        ids = sorted({int(i) for i in allergy_ids}) if allergy_ids is not None else None
+        if ids is not None and not ids:
+            return
+        recipes = sorted({int(i) for i in recipe_ids}) if recipe_ids is not None else None
+        if recipes is not None and not recipes:
+            return
+        # One array parameter rather than an IN list: whole-ingest id sets stay cheap.
+        any_recipe = any_(bindparam("recipe_ids", recipes, type_=ARRAY(Integer))) if recipes is not None else None
+
+        stmt = delete(cls)
+        if ids is not None:
+            stmt = stmt.where(cls.allergy_id.in_(ids))
+        if recipes is not None:
+            stmt = stmt.where(cls.recipe_id == any_recipe)
+        db.execute(stmt)
+
+        # Same normalization as search: trimmed, lowercased, single-spaced, and
+        # plural names reduced to their singular stem (which also matches the plural).
+        name = func.lower(func.regexp_replace(func.trim(Allergy.name), r"\s+", " ", "g"))
+        stem = case(
+            ((name.like("%s") & (func.length(name) > 3)), func.left(name, -1)),
+            else_=name,
+        )
+
+        mapped = select(AllergyIngredientMap.allergy_id, AllergyIngredientMap.ingredient_id)
+        named = (
+            select(Allergy.id.label("allergy_id"), Ingredient.id.label("ingredient_id"))
+            .join(Ingredient, Ingredient.name.ilike(literal("%") + stem + literal("%")))
+            .where(func.length(stem) > 0)
+        )
+        if ids is not None:
+            mapped = mapped.where(AllergyIngredientMap.allergy_id.in_(ids))
+            named = named.where(Allergy.id.in_(ids))
+        in_recipes = None
+        if recipes is not None:
+            # Only the given recipes' ingredients are matched, so a batch costs
+            # its own ingredients rather than the whole ingredient table.
+            in_recipes = RecipeIngredient.recipe_id == any_recipe
+            batch_ingredients = select(RecipeIngredient.ingredient_id).where(in_recipes)
+            mapped = mapped.where(AllergyIngredientMap.ingredient_id.in_(batch_ingredients))
+            named = named.where(Ingredient.id.in_(batch_ingredients))
+        # Excluded (allergy, ingredient) pairs first, materialized: joined to
+        # recipe_ingredients in one hash join instead of per link row.
+        pairs = union(mapped, named).cte("excluded_ingredients").prefix_with("MATERIALIZED")
+        rows = (
+            select(pairs.c.allergy_id, RecipeIngredient.recipe_id)
+            .join(RecipeIngredient, RecipeIngredient.ingredient_id == pairs.c.ingredient_id)
+            .distinct()
+        )
+        if in_recipes is not None:
+            rows = rows.where(in_recipes)
+        db.execute(insert(cls).from_select(["allergy_id", "recipe_id"], rows))
+
+        if recipes is None:
+            _assign_mask_bits(db, ids)
+        _refresh_allergen_masks(db, ids, recipes)
+
+    @classmethod
+    def add_mapped(cls, db: Session, pairs: Iterable[tuple[int, int]]) -> None:
+        """Add the exclusions and mask bits that (allergy_id, ingredient_id) mappings imply.
+
+        Mappings only ever add exclusions, so unlike refresh() this touches
+        just the recipes using those ingredients.
+        """
+        rows = sorted(set(pairs))
+        if not rows:
+            return
+        pair_rows = values(column("allergy_id", Integer), column("ingredient_id", Integer), name="pairs").data(rows)
+        excluded = (
+            select(pair_rows.c.allergy_id, RecipeIngredient.recipe_id)
+            .join(RecipeIngredient, RecipeIngredient.ingredient_id == pair_rows.c.ingredient_id)
+            .distinct()
+        )
+        db.execute(
+            insert(cls)
+            .from_select(["allergy_id", "recipe_id"], excluded)
+            .on_conflict_do_nothing(index_elements=[cls.allergy_id, cls.recipe_id])
+        )
+
+        one = literal(1, BigInteger)
+        bits = (
+            select(
+                RecipeIngredient.recipe_id,
+                func.bit_or(one.op("<<")(Allergy.mask_bit)).label("bits"),
+            )
+            .select_from(pair_rows)
+            .join(RecipeIngredient, RecipeIngredient.ingredient_id == pair_rows.c.ingredient_id)
+            .join(Allergy, Allergy.id == pair_rows.c.allergy_id)
+            .where(Allergy.mask_bit.is_not(None))
+            .group_by(RecipeIngredient.recipe_id)
+            .subquery("bits")
+        )
+        db.execute(
+            update(Recipe)
+            .where(Recipe.id == bits.c.recipe_id, Recipe.allergen_mask.op("&")(bits.c.bits) != bits.c.bits)
+            .values(allergen_mask=Recipe.allergen_mask.op("|")(bits.c.bits))
+        )
+
+
+def _assign_mask_bits(db: Session, allergy_ids: Optional[Sequence[int]]) -> None:
+    """Give allergies without a mask bit the lowest free ones, in id order."""
+    free = (
+        select(func.generate_series(0, MAX_MASK_BITS - 1).label("bit"))
+        .subquery("bits")
+    )
+    free = (
+        select(free.c.bit, func.row_number().over(order_by=free.c.bit).label("rn"))
+        .where(free.c.bit.not_in(select(Allergy.mask_bit).where(Allergy.mask_bit.is_not(None))))
+        .subquery("free")
+    )
+    need = select(Allergy.id, func.row_number().over(order_by=Allergy.id).label("rn")).where(
+        Allergy.mask_bit.is_(None)
+    )
+    if allergy_ids is not None:
+        need = need.where(Allergy.id.in_(allergy_ids))
+    need = need.subquery("need")
+    pick = select(need.c.id, free.c.bit).join(free, free.c.rn == need.c.rn).subquery("pick")
+    db.execute(update(Allergy).where(Allergy.id == pick.c.id).values(mask_bit=pick.c.bit))
+
+
+def _refresh_allergen_masks(
+    db: Session, allergy_ids: Optional[Sequence[int]], recipe_ids: Optional[Sequence[int]]
+) -> None:
+    """Rewrite Recipe.allergen_mask bits of the given allergies from allergy_recipe_exclusions.
+
+    Bits of other allergies are kept; only rows whose mask changes are updated.
+    """
+    if allergy_ids is None:
+        clear = (1 << MAX_MASK_BITS) - 1
+    else:
+        bits = db.execute(
+            select(Allergy.mask_bit).where(Allergy.id.in_(allergy_ids), Allergy.mask_bit.is_not(None))
+        ).scalars()
+        clear = 0
+        for bit in bits:
+            clear |= 1 << bit
+        if not clear:
+            return
+
+    one = literal(1, BigInteger)
+    excluded = (
+        select(
+            AllergyRecipeExclusion.recipe_id,
+            func.bit_or(one.op("<<")(Allergy.mask_bit)).label("bits"),
+        )
+        .join(Allergy, Allergy.id == AllergyRecipeExclusion.allergy_id)
+        .where(Allergy.mask_bit.is_not(None))
+        .group_by(AllergyRecipeExclusion.recipe_id)
+    )
+    any_recipe = any_(bindparam("recipe_ids", list(recipe_ids), type_=ARRAY(Integer))) if recipe_ids is not None else None
+    if allergy_ids is not None:
+        excluded = excluded.where(AllergyRecipeExclusion.allergy_id.in_(allergy_ids))
+    if recipe_ids is not None:
+        excluded = excluded.where(AllergyRecipeExclusion.recipe_id == any_recipe)
+    excluded = excluded.subquery("excluded")
+
+    kept = Recipe.allergen_mask.op("&")(literal(~clear & ((1 << 63) - 1), BigInteger))
+    new_mask = kept.op("|")(func.coalesce(excluded.c.bits, 0))
+    masks = (
+        select(Recipe.id, new_mask.label("mask"))
+        .outerjoin(excluded, excluded.c.recipe_id == Recipe.id)
+        .where((Recipe.allergen_mask.op("&")(literal(clear, BigInteger)) != 0) | excluded.c.recipe_id.is_not(None))
+    )
+    if recipe_ids is not None:
+        masks = masks.where(Recipe.id == any_recipe)
+    masks = masks.subquery("masks")
+    db.execute(
+        update(Recipe)
+        .where(Recipe.id == masks.c.id, Recipe.allergen_mask != masks.c.mask)
+        .values(allergen_mask=masks.c.mask)
+    )
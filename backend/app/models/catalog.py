@@ -0,0 +1,74 @@
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, event, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db.session import Base
+
+
+_BUMPED_KEY = "catalog_version_bumped"
+
+
+class CatalogVersion(Base):
+    """Single-row counter bumped whenever search-visible catalog data changes.
+
+    Recipe ingest and allergy mapping changes call bump() in the same
+    transaction; caches of search output are keyed by current().
+    """
+
+    __tablename__ = "catalog_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    _cached_version = None
+    _cached_at = 0.0
+    _lock = threading.Lock()
+
+    @classmethod
+    def bump(cls, db: Session) -> None:
+        stmt = insert(cls).values(id=1, version=1, updated_at=datetime.utcnow())
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[cls.id],
+                set_={"version": cls.version + 1, "updated_at": stmt.excluded.updated_at},
+            )
+        )
+        db.info[_BUMPED_KEY] = True
+
+    @classmethod
+    def current(cls, db: Session, max_age: float = 0.0) -> int:
+        """Catalog version, re-read from the database at most every `max_age` seconds.
+
+        Bumps committed by this process are seen immediately; bumps from other
+        processes (seed runs, other workers) within `max_age`.
+        """
+        now = time.monotonic()
+        with cls._lock:
+            if cls._cached_version is not None and now - cls._cached_at < max_age:
+                return cls._cached_version
+        version = db.execute(select(cls.version).where(cls.id == 1)).scalar()
+        with cls._lock:
+            cls._cached_version = int(version or 0)
+            cls._cached_at = now
+            return cls._cached_version
+
+    @classmethod
+    def forget_cached(cls) -> None:
+        with cls._lock:
+            cls._cached_version = None
+
+
+@event.listens_for(Session, "after_commit")
+def _forget_cached_version(session: Session) -> None:
+    if session.info.pop(_BUMPED_KEY, False):
+        CatalogVersion.forget_cached()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_bump(session: Session) -> None:
+    session.info.pop(_BUMPED_KEY, None)
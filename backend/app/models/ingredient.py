@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Index, Integer, String, Float, ForeignKey, func
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
@@ -13,6 +13,9 @@ class Ingredient(Base):
     protein_per_unit = Column(Float, nullable=False)
     carbs_per_unit = Column(Float, nullable=False)
     fat_per_unit = Column(Float, nullable=False)
+
+    # Names are matched case-insensitively; ingest upserts on this.
+    __table_args__ = (Index("uq_ingredients_lower_name", func.lower(name), unique=True),)
     
     # Relationships
     recipe_ingredients = relationship("RecipeIngredient", back_populates="ingredient")
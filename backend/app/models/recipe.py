@@ -1,6 +1,10 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text, Enum, Boolean
-from sqlalchemy.orm import relationship
+from typing import Iterable, Optional
+
+from sqlalchemy import BigInteger, Column, Computed, Index, Integer, String, Float, ForeignKey, Text, Enum, Boolean, any_, bindparam, case, delete, exists, func, insert, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
+from sqlalchemy.orm import Session, relationship
 from app.db.session import Base
+from .ingredient import Ingredient, RecipeIngredient
 import enum
 
 class MealType(enum.Enum):
@@ -21,6 +25,23 @@ class CuisineType(enum.Enum):
     AMERICAN = "american"
     OTHER = "other"
 
+
+# Search calorie buckets and macro thresholds (per serving). The generated
+# calorie_bucket column and the partial indexes below are built from these, so
+# search filters written against them can use the indexes.
+CALORIE_LOW_MAX = 400.0
+CALORIE_MEDIUM_MAX = 700.0
+HIGH_PROTEIN_MIN_G = 20.0
+LOW_CARB_MAX_G = 30.0
+
+_CALORIE_BUCKET_SQL = (
+    f"CASE WHEN calories < {CALORIE_LOW_MAX:g} THEN 'low' "
+    f"WHEN calories <= {CALORIE_MEDIUM_MAX:g} THEN 'medium' "
+    f"WHEN calories > {CALORIE_MEDIUM_MAX:g} THEN 'high' END"
+)
+_HIGH_PROTEIN_SQL = f"protein_g >= {HIGH_PROTEIN_MIN_G:g}"
+_LOW_CARB_SQL = f"carbs_g <= {LOW_CARB_MAX_G:g}"
+
 class Recipe(Base):
     __tablename__ = "recipes"
     
@@ -37,6 +58,9 @@ class Recipe(Base):
     is_gluten_free = Column(Boolean, default=False)
     is_dairy_free = Column(Boolean, default=False)
     image_url = Column(String, nullable=True)
+    # Bit Allergy.mask_bit is set when the recipe is excluded for that allergy;
+    # maintained by AllergyRecipeExclusion.refresh.
+    allergen_mask = Column(BigInteger, nullable=False, default=0, server_default="0")
     
     # Relationships
     ingredients = relationship("RecipeIngredient", back_populates="recipe", cascade="all, delete-orphan")
@@ -58,9 +82,185 @@ class RecipeNutritionalInfo(Base):
     fiber_g = Column(Float, nullable=True)
     sugar_g = Column(Float, nullable=True)
     sodium_mg = Column(Float, nullable=True)
+    calorie_bucket = Column(String, Computed(_CALORIE_BUCKET_SQL, persisted=True), nullable=True)
+
+    # Bucket lookups, plus recipe_id-ordered partial indexes for the macro
+    # constraints so "order by recipe id, limit N" tiers stop early.
+    __table_args__ = (
+        Index(
+            "ix_recipe_nutrition_bucket_recipe",
+            "calorie_bucket",
+            "recipe_id",
+            postgresql_include=["protein_g", "carbs_g"],
+        ),
+        Index(
+            "ix_recipe_nutrition_high_protein",
+            "recipe_id",
+            "calorie_bucket",
+            postgresql_where=text(_HIGH_PROTEIN_SQL),
+        ),
+        Index(
+            "ix_recipe_nutrition_low_carb",
+            "recipe_id",
+            "calorie_bucket",
+            postgresql_where=text(_LOW_CARB_SQL),
+        ),
+        Index(
+            "ix_recipe_nutrition_high_protein_low_carb",
+            "recipe_id",
+            "calorie_bucket",
+            postgresql_where=text(f"{_HIGH_PROTEIN_SQL} AND {_LOW_CARB_SQL}"),
+        ),
+    )
     
     # Relationship
     recipe = relationship("Recipe", back_populates="nutritional_info")
     
     def __repr__(self):
         return f"<NutritionalInfo for Recipe {self.recipe_id}: {self.calories} calories>"
+
+
+class RecipeSourceHash(Base):
+    """Hash of the source row each recipe was last ingested from.
+
+    seed_recipes --incremental skips rows whose hash is unchanged.
+    """
+
+    __tablename__ = "recipe_source_hashes"
+
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True)
+    content_hash = Column(String(32), nullable=False)
+
+
+class RecipeCard(Base):
+    """Denormalized, read-only projection of a recipe for search/list results.
+
+    Holds the nutrients, total time and ready-made ingredient lists so result
+    pages are one indexed lookup instead of loading the ingredient graph.
+    Rebuilt with RecipeCard.refresh() after ingest.
+    """
+
+    __tablename__ = "recipe_cards"
+
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True)
+    name = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+    image_url = Column(String, nullable=True)
+    prep_time = Column(Integer, nullable=True)
+    cook_time = Column(Integer, nullable=True)
+    total_time = Column(Integer, nullable=True)
+    servings = Column(Integer, nullable=True)
+    cuisine_type = Column(Enum(CuisineType), nullable=True)
+    is_vegetarian = Column(Boolean, nullable=True)
+    calories = Column(Float, nullable=True)
+    protein_g = Column(Float, nullable=True)
+    carbs_g = Column(Float, nullable=True)
+    fat_g = Column(Float, nullable=True)
+    fiber_g = Column(Float, nullable=True)
+    sugar_g = Column(Float, nullable=True)
+    sodium_mg = Column(Float, nullable=True)
+    ingredients = Column(ARRAY(String), nullable=True)
+    ingredient_lines = Column(ARRAY(String), nullable=True)
+
+    def __repr__(self):
+        return f"<RecipeCard {self.name} ({self.recipe_id})>"
+
+    @classmethod
+    def refresh(
+        cls,
+        db: Session,
+        recipe_ids: Optional[Iterable[int]] = None,
+        *,
+        only_missing: bool = False,
+    ) -> int:
+        """Rebuild cards for the given recipes (all recipes when None).
+
+        With only_missing=True existing cards are kept and only recipes without
+        a card are inserted. Returns the number of cards written.
+        """
+        ids = sorted({int(i) for i in recipe_ids}) if recipe_ids is not None else None
+        if ids is not None and not ids:
+            return 0
+
+        # One array parameter rather than an IN list: whole-ingest id sets stay cheap.
+        any_recipe = any_(bindparam("recipe_ids", ids, type_=ARRAY(Integer))) if ids is not None else None
+        if not only_missing:
+            stmt = delete(cls)
+            if ids is not None:
+                stmt = stmt.where(cls.recipe_id == any_recipe)
+            db.execute(stmt)
+
+        qty = func.coalesce(func.btrim(RecipeIngredient.notes), "")
+        lists = (
+            select(
+                RecipeIngredient.recipe_id.label("recipe_id"),
+                func.array_agg(aggregate_order_by(Ingredient.name, RecipeIngredient.id)).label("ingredients"),
+                func.array_agg(
+                    aggregate_order_by(func.btrim(qty + " " + Ingredient.name), RecipeIngredient.id)
+                ).label("ingredient_lines"),
+            )
+            .join(Ingredient, Ingredient.id == RecipeIngredient.ingredient_id)
+            .where(Ingredient.name != "")
+            .group_by(RecipeIngredient.recipe_id)
+        )
+        if ids is not None:
+            lists = lists.where(RecipeIngredient.recipe_id == any_recipe)
+        lists = lists.subquery("lists")
+
+        total_time = case(
+            (Recipe.prep_time.is_(None) & Recipe.cook_time.is_(None), None),
+            else_=func.coalesce(Recipe.prep_time, 0) + func.coalesce(Recipe.cook_time, 0),
+        )
+        source = (
+            select(
+                Recipe.id,
+                Recipe.name,
+                Recipe.description,
+                Recipe.image_url,
+                Recipe.prep_time,
+                Recipe.cook_time,
+                total_time,
+                Recipe.servings,
+                Recipe.cuisine_type,
+                Recipe.is_vegetarian,
+                RecipeNutritionalInfo.calories,
+                RecipeNutritionalInfo.protein_g,
+                RecipeNutritionalInfo.carbs_g,
+                RecipeNutritionalInfo.fat_g,
+                RecipeNutritionalInfo.fiber_g,
+                RecipeNutritionalInfo.sugar_g,
+                RecipeNutritionalInfo.sodium_mg,
+                lists.c.ingredients,
+                lists.c.ingredient_lines,
+            )
+            .outerjoin(RecipeNutritionalInfo, RecipeNutritionalInfo.recipe_id == Recipe.id)
+            .outerjoin(lists, lists.c.recipe_id == Recipe.id)
+        )
+        if ids is not None:
+            source = source.where(Recipe.id == any_recipe)
+        if only_missing:
+            source = source.where(~exists().where(cls.recipe_id == Recipe.id))
+
+        columns = [
+            "recipe_id",
+            "name",
+            "description",
+            "image_url",
+            "prep_time",
+            "cook_time",
+            "total_time",
+            "servings",
+            "cuisine_type",
+            "is_vegetarian",
+            "calories",
+            "protein_g",
+            "carbs_g",
+            "fat_g",
+            "fiber_g",
+            "sugar_g",
+            "sodium_mg",
+            "ingredients",
+            "ingredient_lines",
+        ]
+        stmt = insert(cls).from_select(columns, source).execution_options(preserve_rowcount=True)
+        return db.execute(stmt).rowcount
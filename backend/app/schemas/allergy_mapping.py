@@ -20,6 +20,9 @@ class AllergyOut(BaseModel):
 class AllergyIngredientMapCreate(BaseModel):
     ingredient_id: Optional[int] = None
     ingredient_name: Optional[str] = None
+    # Batch form; combined with the single fields above.
+    ingredient_ids: list[int] = Field(default_factory=list)
+    ingredient_names: list[str] = Field(default_factory=list)
 
 
 class MappedIngredientOut(BaseModel):
@@ -33,5 +36,21 @@ class AutoMapResponse(BaseModel):
     ingredient_ids: list[int]
 
 
+class AllergyBulkMapItem(BaseModel):
+    allergy_id: int
+    # Mapped as given.
+    ingredient_ids: list[int] = Field(default_factory=list)
+    # Every ingredient whose name contains one of these (case-insensitive).
+    terms: list[str] = Field(default_factory=list)
+    # Also match on the allergy's terms (aliases, else name and singular), like auto-map.
+    auto: bool = False
+
+
+class AllergyBulkMapRequest(BaseModel):
+    items: list[AllergyBulkMapItem] = Field(..., min_length=1)
+    # Per allergy cap on term matches, as in auto-map; None maps every match.
+    limit: Optional[int] = Field(default=None, ge=1)
+
+
 class UserAllergySet(BaseModel):
     allergy_ids: list[int] = Field(default_factory=list)
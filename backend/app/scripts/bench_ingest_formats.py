@@ -0,0 +1,119 @@
+"""Compare recipe ingest parse throughput across input formats.
+
+Converts a recipes CSV to .csv.gz, .csv.zst and .parquet (the last two when
+zstandard / pyarrow are installed), then times the seed_recipes parse over
+each file (no database needed) and checks every format parses to the same
+recipes.
+
+    python -m app.scripts.bench_ingest_formats --csv data/raw/recipes.csv --limit 0 --workers 4
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from app.scripts.seed_recipes import _iter_parsed
+
+
+def _write_gzip(src: Path, dest: Path) -> None:
+    with src.open("rb") as fin, gzip.open(dest, "wb", compresslevel=6) as fout:
+        shutil.copyfileobj(fin, fout, 1 << 20)
+
+
+def _write_zstd(src: Path, dest: Path) -> bool:
+    try:
+        import zstandard  # type: ignore
+    except ImportError:
+        return False
+    with src.open("rb") as fin, dest.open("wb") as fout:
+        zstandard.ZstdCompressor(level=3).copy_stream(fin, fout)
+    return True
+
+
+def _write_parquet(src: Path, dest: Path) -> bool:
+    try:
+        import pyarrow as pa  # type: ignore
+        import pyarrow.csv as pacsv  # type: ignore
+        import pyarrow.parquet as pq  # type: ignore
+    except ImportError:
+        return False
+    with src.open("r", encoding="utf-8", newline="") as f:
+        header = next(csv.reader(f), [])
+    # Keep every column a string, as in the CSV, so parsed rows match exactly.
+    table = pacsv.read_csv(
+        src,
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(
+            column_types={name: pa.string() for name in header},
+            strings_can_be_null=False,
+        ),
+    )
+    pq.write_table(table, dest, compression="zstd", row_group_size=50_000)
+    return True
+
+
+def _parse(path: Path, limit: int, workers: int) -> tuple[float, int, str]:
+    digest = hashlib.blake2b(digest_size=8)
+    rows = 0
+    start = time.perf_counter()
+    for parsed, _ in _iter_parsed(path, limit, workers):
+        rows += 1
+        digest.update((parsed.content_hash if parsed is not None else "-").encode("ascii"))
+    return time.perf_counter() - start, rows, digest.hexdigest()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", dest="csv_path", required=True)
+    parser.add_argument("--limit", type=int, default=0, help="rows to parse per format (0: all)")
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--out-dir", help="keep the converted files here instead of a temp dir")
+    args = parser.parse_args()
+
+    src = Path(args.csv_path)
+    tmp: Optional[tempfile.TemporaryDirectory] = None
+    if args.out_dir:
+        out_dir = Path(args.out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        out_dir = Path(tmp.name)
+
+    try:
+        files: List[tuple[str, Path]] = [("csv", src)]
+        writers = (
+            ("csv.gz", _write_gzip),
+            ("csv.zst", _write_zstd),
+            ("parquet", _write_parquet),
+        )
+        for label, write in writers:
+            dest = out_dir / f"{src.stem}.{label}"
+            started = time.perf_counter()
+            if write(src, dest) is False:
+                print(f"{label}: skipped (optional dependency not installed)")
+                continue
+            print(f"{label}: converted in {time.perf_counter() - started:.1f}s")
+            files.append((label, dest))
+
+        print(f"{'format':<10}{'size MB':>10}{'rows':>10}{'seconds':>10}{'rows/s':>12}  same")
+        baseline = None
+        for label, path in files:
+            elapsed, rows, digest = _parse(path, args.limit, args.workers)
+            baseline = baseline or digest
+            print(
+                f"{label:<10}{path.stat().st_size / 1e6:>10.1f}{rows:>10}{elapsed:>10.2f}"
+                f"{rows / max(elapsed, 1e-9):>12,.0f}  {digest == baseline}"
+            )
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
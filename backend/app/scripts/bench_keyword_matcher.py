@@ -0,0 +1,89 @@
+"""Compare the keyword matcher against the previous regex classification.
+
+Parses a recipes file (any format seed_recipes reads), then times the diet
+and cuisine classification of every row both ways and checks they agree.
+
+    python -m app.scripts.bench_keyword_matcher --csv data/raw/recipes.csv --limit 0
+"""
+
+import argparse
+import re
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from app.models.recipe import CuisineType
+from app.scripts.seed_recipes import (
+    _CUISINE_HINTS,
+    _NON_VEG_KEYWORDS,
+    _classify,
+    _iter_rows,
+    _parse_c_list,
+)
+
+
+_NON_VEG_REGEXES = [
+    re.compile(r"\b(?:" + "|".join(sorted(map(re.escape, _NON_VEG_KEYWORDS))) + r")\b", re.IGNORECASE),
+    re.compile(r"\b(?:chicken|beef|fish)\s+(?:stock|broth)\b", re.IGNORECASE),
+    re.compile(r"\b(?:chicken|beef|fish)\s+(?:bouillon)\b", re.IGNORECASE),
+    re.compile(r"\bgelatin\b", re.IGNORECASE),
+]
+
+
+def _regex_classify(
+    *, name: str, category: str, keywords: str, ingredient_parts: List[str]
+) -> tuple[Optional[CuisineType], bool]:
+    # The classification seed_recipes used before the matcher.
+    cuisine = None
+    hay = " ".join([category, keywords]).lower()
+    for token, hint in _CUISINE_HINTS:
+        if token in hay:
+            cuisine = hint
+            break
+    hay = " ".join([name, category, keywords, " ".join(ingredient_parts)]).lower()
+    return cuisine, not any(rx.search(hay) for rx in _NON_VEG_REGEXES)
+
+
+def _time(fn: Callable[..., tuple], inputs: List[dict], rounds: int) -> tuple[float, list]:
+    results = [fn(**kw) for kw in inputs]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for kw in inputs:
+            fn(**kw)
+    return (time.perf_counter() - start) / rounds, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", dest="csv_path", required=True)
+    parser.add_argument("--limit", type=int, default=0, help="rows to classify (0: all)")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    inputs: List[dict] = []
+    for row in _iter_rows(Path(args.csv_path)):
+        name = (row.get("Name") or "").strip()
+        if not name:
+            continue
+        inputs.append(
+            dict(
+                name=name,
+                category=row.get("RecipeCategory") or "",
+                keywords=" ".join(_parse_c_list(row.get("Keywords"))),
+                ingredient_parts=_parse_c_list(row.get("RecipeIngredientParts")),
+            )
+        )
+        if args.limit and len(inputs) >= args.limit:
+            break
+
+    regex_s, expected = _time(_regex_classify, inputs, args.rounds)
+    matcher_s, actual = _time(_classify, inputs, args.rounds)
+    mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+    print(f"{'path':<10}{'rows':>10}{'seconds':>10}{'rows/s':>12}")
+    for label, seconds in (("regex", regex_s), ("matcher", matcher_s)):
+        print(f"{label:<10}{len(inputs):>10}{seconds:>10.3f}{len(inputs) / max(seconds, 1e-9):>12,.0f}")
+    print(f"mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Compare payload size and serialization time of search result pages.
+
+Builds synthetic result pages (no database needed) and times the previous
+response path (jsonable_encoder + JSONResponse, full view) against
+FastJSONResponse for the full and summary views.
+
+    python -m app.scripts.bench_search_payload --limit 50 --rounds 200
+"""
+
+import argparse
+import time
+from typing import Callable, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.api.responses import FastJSONResponse
+from app.features.search.schemas import RecipeResult, RecipeSummary
+
+
+def _make_results(limit: int, summary: bool) -> List[RecipeSummary]:
+    out: List[RecipeSummary] = []
+    for i in range(limit):
+        fields = dict(
+            id=i + 1,
+            name=f"Roasted vegetable and chickpea bowl {i}",
+            description="A hearty bowl with roasted vegetables, chickpeas and a lemon tahini dressing.",
+            calories=540.0,
+            image_url=f"https://example.com/images/recipe-{i}.jpg",
+            prep_time=15,
+            cook_time=30,
+            total_time=45,
+            servings=4,
+            cuisine_type="mediterranean",
+            protein_g=21.5,
+            carbs_g=62.0,
+            fat_g=18.2,
+            fiber_g=11.0,
+            sugar_g=9.4,
+            sodium_mg=480.0,
+            reasons=["calorie_bucket=medium", "protein_g=21.5", "carbs_g=62.0"],
+        )
+        if summary:
+            out.append(RecipeSummary(**fields))
+            continue
+        lines = [f"{n + 1} cup ingredient number {n}, chopped" for n in range(14)]
+        out.append(
+            RecipeResult(
+                **fields,
+                ingredient_lines=lines,
+                ingredients=[f"ingredient number {n}" for n in range(14)],
+                instructions=" ".join(
+                    f"Step {n + 1}: prepare and combine the ingredients, then cook until done."
+                    for n in range(12)
+                ),
+            )
+        )
+    return out
+
+
+def _time(fn: Callable[[], bytes], rounds: int) -> tuple[float, int]:
+    body = fn()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    elapsed = (time.perf_counter() - start) / rounds
+    return elapsed * 1000.0, len(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    full = _make_results(args.limit, summary=False)
+    summary = _make_results(args.limit, summary=True)
+    applied = {"calorie_bucket": "medium", "warnings": []}
+
+    cases = [
+        (
+            "jsonable_encoder+JSONResponse full",
+            lambda: JSONResponse(jsonable_encoder({"applied": applied, "results": full})).body,
+        ),
+        (
+            "FastJSONResponse full",
+            lambda: FastJSONResponse({"applied": applied, "results": full}).body,
+        ),
+        (
+            "FastJSONResponse summary",
+            lambda: FastJSONResponse({"applied": applied, "results": summary}).body,
+        ),
+    ]
+    print(f"{args.limit} results/page, {args.rounds} rounds")
+    for label, fn in cases:
+        ms, size = _time(fn, args.rounds)
+        print(f"{label:<36} {size:>8} bytes {ms:>8.3f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""Create and upgrade tables and seed startup data before API workers start.
+
+Creates missing tables and columns, the first superuser and the default
+allergies, and cards for recipes without one. Allergy exclusions are only
+rebuilt when the schema or default allergies changed, or the table is empty.
+Safe to run from several containers at once; only one does the work:
+
+    python -m app.scripts.bootstrap
+"""
+
+import logging
+import time
+
+from app.db.bootstrap import bootstrap
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    started = time.perf_counter()
+    if bootstrap():
+        print(f"Bootstrap complete in {time.perf_counter() - started:.1f}s")
+    else:
+        print(f"Bootstrap already run by another process (waited {time.perf_counter() - started:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Build the semantic search index and write it to SEARCH_SEMANTIC_INDEX_PATH.
+
+API workers load the file instead of each rebuilding the index from
+recipe_cards. Run after ingest:
+
+    python -m app.scripts.build_search_index [--path index.npz] [--query "dal"]
+"""
+
+import argparse
+import time
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.features.search.semantic import RecipeVectorIndex
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", default=getattr(settings, "SEARCH_SEMANTIC_INDEX_PATH", ""))
+    parser.add_argument("--query", action="append", default=[], help="time a sample query after building")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        index = RecipeVectorIndex.build(db)
+        print(f"Indexed {index.size} recipes ({index.data.shape[0]} postings) in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+    if args.path:
+        index.save(args.path)
+        print(f"Wrote {args.path}")
+
+    for q in args.query:
+        started = time.perf_counter()
+        hits = index.search(q, k=10)
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        print(f"{q!r}: {elapsed_ms:.2f} ms, top ids {[rid for rid, _ in hits]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""EXPLAIN every nutrient/calorie filter combination search_nl can produce.
+
+Prints the plan shape per tier and exits non-zero if any tier with a
+nutrition filter scans recipe_nutritional_info without one of its indexes.
+Sequential scans are disabled for the check so small development databases,
+where a seq scan is legitimately cheaper, still show whether an index is usable.
+
+    python -m app.scripts.check_search_indexes [--verbose]
+"""
+
+import argparse
+import itertools
+import json
+import sys
+from typing import Any, Dict, Iterator, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.features.search.schemas import CalorieBucket, DietType, ParsedQuery
+from app.features.search.service import _SearchState, _SearchTier, _tier_branch, _tier_conditions
+from app.models.recipe import Recipe
+
+
+_TABLE = "recipe_nutritional_info"
+
+
+def _walk(node: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def nutrition_scans(plan: Dict[str, Any]) -> List[str]:
+    scans = []
+    for node in _walk(plan):
+        if node.get("Relation Name") == _TABLE:
+            scans.append(f"{node['Node Type']}({node.get('Index Name', '-')})")
+        elif node.get("Node Type") == "Bitmap Index Scan" and str(node.get("Index Name", "")).startswith("ix_recipe_nutrition"):
+            scans.append(f"Bitmap Index Scan({node['Index Name']})")
+    return scans
+
+
+def tier_plans(db: Session) -> Iterator[Tuple[str, _SearchTier, Dict[str, Any]]]:
+    """(label, tier, EXPLAIN plan) for every bucket x macro x diet tier, with seq scans off."""
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    buckets = [None, CalorieBucket.LOW, CalorieBucket.MEDIUM, CalorieBucket.HIGH]
+    diets = [None, DietType.VEG, DietType.NON_VEG]
+    macros = [(False, False), (True, False), (False, True), (True, True)]
+    for bucket, (hp, lc), diet in itertools.product(buckets, macros, diets):
+        tier = _SearchTier(bucket, hp, lc, False, "check")
+        state = _SearchState(
+            user_id=0,
+            query="",
+            parsed=ParsedQuery(diet=diet),
+            applied={},
+            search_terms=[],
+            allergy_terms=set(),
+            exclusion_allergies={},
+            tiers=[tier],
+            bmi_prioritized_low=False,
+            wants_both_constraints=False,
+            window=50,
+        )
+        stmt = _tier_branch(0, tier, state).order_by(Recipe.id.asc()).limit(50)
+        sql = stmt.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+        plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        label = f"bucket={bucket.value if bucket else '-'} high_protein={hp} low_carb={lc} diet={diet.value if diet else '-'}"
+        yield label, tier, plan[0]["Plan"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    failures = 0
+    db = SessionLocal()
+    try:
+        for label, tier, plan in tier_plans(db):
+            scans = nutrition_scans(plan)
+            ok = not _tier_conditions(tier) or (scans and not any(s.startswith("Seq Scan") for s in scans))
+            failures += 0 if ok else 1
+            print(f"{'ok  ' if ok else 'FAIL'} {label}: {', '.join(scans) or 'no nutrition scan'}")
+            if args.verbose:
+                print(json.dumps(plan, indent=2))
+    finally:
+        db.rollback()
+        db.close()
+
+    if failures:
+        print(f"{failures} filter combination(s) without a usable nutrition index")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Export the recipe catalog to a memory-mappable snapshot file.
+
+Writes nutrient arrays, flags, the recipe -> ingredient matrix, allergen
+bitmaps, a string table and the semantic search index to one file. API
+workers with CATALOG_SNAPSHOT_PATH set map it instead of building the index
+from Postgres; other processes open it with CatalogSnapshot.open. Re-run after
+ingest or allergy mapping changes (the file records the catalog version):
+
+    python -m app.scripts.export_catalog_snapshot [--path catalog.snap] [--no-semantic]
+"""
+
+import argparse
+import os
+import time
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.features.catalog.snapshot import SEMANTIC_ARRAYS, CatalogSnapshot, export_snapshot
+from app.features.search.semantic import RecipeVectorIndex
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", default=getattr(settings, "CATALOG_SNAPSHOT_PATH", "") or "catalog.snap")
+    parser.add_argument("--no-semantic", action="store_true", help="leave the semantic index out")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        semantic_arrays = None
+        semantic_built_at = None
+        if not args.no_semantic:
+            index = RecipeVectorIndex.build(db)
+            semantic_arrays = {name: getattr(index, name) for name in SEMANTIC_ARRAYS}
+            semantic_built_at = index.built_at
+            print(f"Indexed {index.size} recipes in {time.perf_counter() - started:.1f}s")
+            # The export reads in its own REPEATABLE READ transaction.
+            db.rollback()
+        header = export_snapshot(
+            db, args.path, semantic_arrays=semantic_arrays, semantic_built_at=semantic_built_at
+        )
+        counts = header["counts"]
+        print(
+            f"Wrote {args.path}: {counts['recipes']} recipes, {counts['ingredients']} ingredients, "
+            f"{counts['allergies']} allergies, catalog version {header['catalog_version']}, "
+            f"{os.path.getsize(args.path) / 1e6:.1f} MB in {time.perf_counter() - started:.1f}s"
+        )
+    finally:
+        db.close()
+
+    started = time.perf_counter()
+    snapshot = CatalogSnapshot.open(args.path)
+    opened_ms = (time.perf_counter() - started) * 1000.0
+    print(f"Opened in {opened_ms:.2f} ms ({len(snapshot.header['arrays'])} arrays)")
+    snapshot.close()
+
+
+if __name__ == "__main__":
+    main()
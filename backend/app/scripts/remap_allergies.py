@@ -0,0 +1,32 @@
+"""Map ingredients queued by ingest to existing allergies, then exit.
+
+API workers do this in the background (ALLERGY_REMAP_WORKER); run this where
+no API is running, e.g. right after seed_recipes:
+
+    python -m app.scripts.remap_allergies [--batch-size 1000]
+"""
+
+import argparse
+import time
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.features.catalog.remap import drain_remap_queue
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=settings.ALLERGY_REMAP_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        ingredients, matches = drain_remap_queue(db, max(args.batch_size, 1))
+        print(f"Re-mapped {ingredients} ingredients ({matches} matches) in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
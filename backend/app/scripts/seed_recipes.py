@@ -1,14 +1,29 @@
 import argparse
+import contextlib
 import csv
+import gzip
+import hashlib
+import io
+import json
+import os
 import re
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Any, BinaryIO, Iterable, Iterator, NamedTuple, Optional, Sequence
 
+from sqlalchemy import String, column, exists, func, literal, null, select, text
+from sqlalchemy import values as sa_values
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
+from app.core.keywords import KeywordMatcher
 from app.db.session import Base, SessionLocal, engine
+from app.models.allergy import AllergyRecipeExclusion, IngredientRemapQueue
+from app.models.catalog import CatalogVersion
 from app.models.ingredient import Ingredient, RecipeIngredient
-from app.models.recipe import CuisineType, Recipe, RecipeNutritionalInfo
+from app.models.recipe import CuisineType, Recipe, RecipeCard, RecipeNutritionalInfo
 
 
 _NON_VEG_KEYWORDS = {
@@ -41,16 +56,6 @@ _NON_VEG_KEYWORDS = {
     "venison",
 }
 
-_NON_VEG_REGEXES = [
-    # Use word boundaries so "ham" doesn't match "sham".
-    re.compile(r"\b(?:" + "|".join(sorted(map(re.escape, _NON_VEG_KEYWORDS))) + r")\b", re.IGNORECASE),
-    # Stock/broth signals (avoid flagging "vegetable stock").
-    re.compile(r"\b(?:chicken|beef|fish)\s+(?:stock|broth)\b", re.IGNORECASE),
-    re.compile(r"\b(?:chicken|beef|fish)\s+(?:bouillon)\b", re.IGNORECASE),
-    # Common gelatin signal.
-    re.compile(r"\bgelatin\b", re.IGNORECASE),
-]
-
 _CUISINE_HINTS: list[tuple[str, CuisineType]] = [
     ("indian", CuisineType.INDIAN),
     ("italian", CuisineType.ITALIAN),
@@ -114,70 +119,456 @@ def _first_image_url(images_field: Optional[str]) -> Optional[str]:
     return items[0] if items else None
 
 
-def _guess_cuisine(*text_fields: str) -> Optional[CuisineType]:
-    hay = " ".join(text_fields).lower()
-    for token, cuisine in _CUISINE_HINTS:
-        if token in hay:
-            return cuisine
-    return None
-
+_NON_VEG = "non_veg"
+# One pass over the text finds both diet and cuisine signals. Non-veg keywords
+# match whole words only, so "ham" doesn't match "sham"; "gelatin" is a common
+# non-veg signal too. Stock/broth phrases ("chicken stock") need no separate
+# pattern since "chicken"/"beef"/"fish" already match, and "vegetable stock"
+# never does. Cuisine hints match anywhere.
+_CLASSIFIER: KeywordMatcher[Any] = KeywordMatcher(
+    words=[(kw, _NON_VEG) for kw in sorted(_NON_VEG_KEYWORDS | {"gelatin"})],
+    substrings=_CUISINE_HINTS,
+)
+_CUISINE_RANK = {cuisine: rank for rank, (_, cuisine) in enumerate(_CUISINE_HINTS)}
 
-def _is_non_veg_text(hay: str) -> bool:
-    for rx in _NON_VEG_REGEXES:
-        if rx.search(hay):
-            return True
-    return False
 
-
-def _classify_is_vegetarian(
+def _classify(
     *,
     name: str,
     category: str,
     keywords: str,
     ingredient_parts: list[str],
-) -> bool:
-    # Deterministic ruleset:
-    # - If any strong non-veg indicator appears in name/category/keywords/ingredients => non-veg.
-    # - Otherwise treat as vegetarian.
-    hay = " ".join([name, category, keywords, " ".join(ingredient_parts)]).lower()
-    return not _is_non_veg_text(hay)
+) -> tuple[Optional[CuisineType], bool]:
+    """(cuisine guess, is vegetarian) for one recipe.
+
+    Deterministic ruleset:
+    - Any strong non-veg indicator in name/category/keywords/ingredients => non-veg;
+      otherwise vegetarian.
+    - Cuisine is the first _CUISINE_HINTS entry found in category/keywords.
+    """
+    name_l = name.lower()
+    # Cuisine hits must fall inside the "category keywords" span of the text.
+    span_start = len(name_l) + 1
+    span_end = span_start + len(category.lower()) + 1 + len(keywords.lower())
+    hay = " ".join([name_l, category, keywords, " ".join(ingredient_parts)])
+
+    non_veg = False
+    cuisine: Optional[CuisineType] = None
+    for start, end, value in _CLASSIFIER.finditer(hay):
+        if value == _NON_VEG:
+            non_veg = True
+        elif start >= span_start and end <= span_end and (
+            cuisine is None or _CUISINE_RANK[value] < _CUISINE_RANK[cuisine]
+        ):
+            cuisine = value
+    return cuisine, not non_veg
+
+
+class _ParsedRecipe(NamedTuple):
+    recipe_id: int
+    name: str
+    description: Optional[str]
+    instructions: str
+    prep_time: Optional[int]
+    cook_time: Optional[int]
+    servings: int
+    cuisine_type: Optional[CuisineType]
+    is_vegetarian: bool
+    image_url: Optional[str]
+    # (calories, protein, carbs, fat, fiber, sugar, sodium) when the four
+    # non-null columns are all present.
+    nutrition: Optional[tuple[float, float, float, float, Optional[float], Optional[float], Optional[float]]]
+    # (ingredient part, quantity note) in source order.
+    ingredients: list[tuple[str, Optional[str]]]
+    # Hash of the _SOURCE_COLUMNS values this row was parsed from.
+    content_hash: str
+
+
+# Every CSV column the parse reads; the content hash covers exactly these.
+_SOURCE_COLUMNS = (
+    "RecipeId", "Name", "Description", "RecipeInstructions", "PrepTime", "CookTime", "RecipeServings",
+    "Images", "RecipeCategory", "Keywords", "RecipeIngredientParts", "RecipeIngredientQuantities",
+    "Calories", "ProteinContent", "CarbohydrateContent", "FatContent", "FiberContent", "SugarContent",
+    "SodiumContent",
+)
+
+
+def _content_hash(row: dict[str, str]) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for col in _SOURCE_COLUMNS:
+        h.update((row.get(col) or "").encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+def _recipe_id(row: dict[str, str]) -> Optional[int]:
+    rid = row.get("RecipeId")
+    if not rid:
+        return None
+    try:
+        return int(float(rid))
+    except ValueError:
+        return None
+
+
+def _parse_row(row: dict[str, str], recipe_id: int) -> Optional[_ParsedRecipe]:
+    name = (row.get("Name") or "").strip()
+    if not name:
+        return None
+
+    description = (row.get("Description") or "").strip() or None
+    instructions_steps = _parse_c_list(row.get("RecipeInstructions"))
+    instructions = "\n".join(instructions_steps).strip() if instructions_steps else (row.get("RecipeInstructions") or "").strip()
+    if not instructions:
+        instructions = name
+
+    servings_f = _safe_float(row.get("RecipeServings"))
+    servings = int(servings_f) if servings_f and servings_f > 0 else 1
+
+    category = row.get("RecipeCategory") or ""
+    keywords = " ".join(_parse_c_list(row.get("Keywords")))
+    ingredient_parts = _parse_c_list(row.get("RecipeIngredientParts"))
+    ingredient_quantities = _parse_c_list(row.get("RecipeIngredientQuantities"))
+
+    ingredients: list[tuple[str, Optional[str]]] = []
+    for idx, part in enumerate(ingredient_parts):
+        qty_note = None
+        if idx < len(ingredient_quantities):
+            qv = (ingredient_quantities[idx] or "").strip()
+            if qv and qv.upper() != "NA":
+                qty_note = qv
+        ingredients.append((part, qty_note))
+
+    cuisine_type, is_vegetarian = _classify(
+        name=name,
+        category=category,
+        keywords=keywords,
+        ingredient_parts=ingredient_parts,
+    )
+
+    calories = _safe_float(row.get("Calories"))
+    protein = _safe_float(row.get("ProteinContent"))
+    carbs = _safe_float(row.get("CarbohydrateContent"))
+    fat = _safe_float(row.get("FatContent"))
+    nutrition = None
+    # NutritionalInfo columns are non-null for calories/protein/carbs/fat.
+    if calories is not None and protein is not None and carbs is not None and fat is not None:
+        nutrition = (
+            calories,
+            protein,
+            carbs,
+            fat,
+            _safe_float(row.get("FiberContent")),
+            _safe_float(row.get("SugarContent")),
+            _safe_float(row.get("SodiumContent")),
+        )
+
+    return _ParsedRecipe(
+        recipe_id=recipe_id,
+        name=name,
+        description=description,
+        instructions=instructions,
+        prep_time=_duration_to_minutes(row.get("PrepTime")),
+        cook_time=_duration_to_minutes(row.get("CookTime")),
+        servings=servings,
+        cuisine_type=cuisine_type,
+        is_vegetarian=is_vegetarian,
+        image_url=_first_image_url(row.get("Images")),
+        nutrition=nutrition,
+        ingredients=ingredients,
+        content_hash=_content_hash(row),
+    )
+
+
+# Parquet columns may be typed (numbers, string lists); values are turned back
+# into the strings the CSV parse expects.
+def _source_text(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple)):
+        return "c(" + ", ".join('"' + str(v).replace('"', '\\"') + '"' for v in value if v is not None) + ")"
+    return str(value)
+
+
+def _text_column(values: list[Any]) -> list[Any]:
+    if all(v is None or type(v) is str for v in values):
+        return values
+    return [_source_text(v) for v in values]
+
+
+def _is_parquet(path: Path) -> bool:
+    return path.suffix.lower() in (".parquet", ".pq")
+
+
+def _open_source(path: Path) -> BinaryIO:
+    """Binary stream of a .csv, .csv.gz or .csv.zst file, decompressed on the fly."""
+    suffix = path.suffix.lower()
+    if suffix == ".gz":
+        return gzip.open(path, "rb")  # type: ignore[return-value]
+    if suffix in (".zst", ".zstd"):
+        try:
+            import zstandard  # type: ignore
+        except ImportError as exc:
+            raise RuntimeError("Reading .zst input needs the zstandard package (pip install zstandard)") from exc
+        return io.BufferedReader(zstandard.open(path, "rb"))
+    return path.open("rb")
+
+
+def _iter_parquet_columns(
+    path: Path,
+    batch_rows: int,
+    start_row: int = 0,
+    limit: int = 0,
+    columns: Sequence[str] = _SOURCE_COLUMNS,
+) -> Iterator[dict[str, list[Any]]]:
+    """Record batches of a Parquet file as column -> values, reading only `columns`."""
+    try:
+        import pyarrow.parquet as pq  # type: ignore
+    except ImportError as exc:
+        raise RuntimeError("Reading .parquet input needs pyarrow (pip install pyarrow)") from exc
+    pf = pq.ParquetFile(path)
+    columns = [c for c in columns if c in pf.schema_arrow.names]
+    skip, left = start_row, limit
+    for batch in pf.iter_batches(batch_size=batch_rows, columns=columns):
+        if skip >= batch.num_rows:
+            skip -= batch.num_rows
+            continue
+        if skip:
+            batch, skip = batch.slice(skip), 0
+        if limit:
+            if left <= 0:
+                return
+            batch = batch.slice(0, left)
+            left -= batch.num_rows
+        yield batch.to_pydict()
 
 
-def _iter_rows(csv_path: Path) -> Iterable[dict[str, str]]:
+def _iter_rows(csv_path: Path) -> Iterable[dict[str, Optional[str]]]:
+    if _is_parquet(csv_path):
+        for columns in _iter_parquet_columns(csv_path, 1000):
+            names = list(columns)
+            for values in zip(*(_text_column(v) for v in columns.values())):
+                yield dict(zip(names, values))
+        return
     csv.field_size_limit(2**31 - 1)
-    with csv_path.open("r", encoding="utf-8", newline="") as f:
+    with io.TextIOWrapper(_open_source(csv_path), encoding="utf-8", newline="") as f:
         reader = csv.DictReader(f)
         for row in reader:
             yield row
 
 
-def _get_or_create_ingredient(db: Session, cache: dict[str, int], name: str) -> int:
-    key = name.strip().lower()
-    if not key:
-        raise ValueError("ingredient name empty")
-
-    existing_id = cache.get(key)
-    if existing_id is not None:
-        return existing_id
-
-    existing = db.query(Ingredient).filter(Ingredient.name.ilike(name)).first()
-    if existing is not None:
-        cache[key] = existing.id
-        return existing.id
-
-    ing = Ingredient(
-        name=name.strip(),
-        category=None,
-        unit="unit",
-        calories_per_unit=0.0,
-        protein_per_unit=0.0,
-        carbs_per_unit=0.0,
-        fat_per_unit=0.0,
-    )
-    db.add(ing)
-    db.flush()
-    cache[key] = ing.id
-    return ing.id
+def _iter_record_chunks(f: BinaryIO, rows_per_chunk: int, limit: int) -> Iterator[tuple[bytes, list[int]]]:
+    """Raw CSV bytes of whole records, `rows_per_chunk` records at a time.
+
+    Each chunk comes with the file offset just past each of its records. A
+    record ends at the first newline after an even number of quote chars
+    (quotes inside fields are doubled), so records are split without parsing.
+    Blank lines between records are dropped, as csv.DictReader does.
+    """
+    buf: list[bytes] = []
+    ends: list[int] = []
+    offset = f.tell()
+    total = 0
+    quotes = 0
+    for line in f:
+        offset += len(line)
+        if not quotes and line in (b"\n", b"\r\n"):
+            continue
+        buf.append(line)
+        quotes += line.count(b'"')
+        if quotes % 2:
+            continue
+        quotes = 0
+        ends.append(offset)
+        total += 1
+        if len(ends) >= rows_per_chunk or (limit and total >= limit):
+            yield b"".join(buf), ends
+            buf, ends = [], []
+            if limit and total >= limit:
+                return
+    if quotes:
+        # Unterminated quote at end of file; let the csv module make of it what it can.
+        ends.append(offset)
+    if buf:
+        yield b"".join(buf), ends
+
+
+def _parse_chunk(header: list[str], chunk: bytes) -> list[Optional[_ParsedRecipe]]:
+    # Runs in a worker process: one entry per record, None where a row is skipped.
+    csv.field_size_limit(2**31 - 1)
+    # Only the columns the parse reads go into each row dict.
+    wanted = [(name, i) for i, name in enumerate(header) if name in _SOURCE_COLUMNS]
+    out: list[Optional[_ParsedRecipe]] = []
+    for values in csv.reader(io.StringIO(chunk.decode("utf-8"), newline="")):
+        n = len(values)
+        row = {name: values[i] for name, i in wanted if i < n}
+        recipe_id = _recipe_id(row)
+        out.append(_parse_row(row, recipe_id) if recipe_id is not None else None)
+    return out
+
+
+def _parse_columns(columns: dict[str, list[Any]]) -> list[Optional[_ParsedRecipe]]:
+    # Parquet counterpart of _parse_chunk.
+    names = list(columns)
+    cols = [_text_column(values) for values in columns.values()]
+    out: list[Optional[_ParsedRecipe]] = []
+    for values in zip(*cols):
+        row = dict(zip(names, values))
+        recipe_id = _recipe_id(row)
+        out.append(_parse_row(row, recipe_id) if recipe_id is not None else None)
+    return out
+
+
+def _skip_to(f: BinaryIO, offset: int) -> None:
+    if f.seekable():
+        f.seek(offset)
+        return
+    # Compressed streams only read forward.
+    while f.tell() < offset:
+        if not f.read(min(offset - f.tell(), 1 << 20)):
+            break
+
+
+def _with_offsets(parsed: list[Optional[_ParsedRecipe]], ends: list[int]) -> Iterator[tuple[Optional[_ParsedRecipe], int]]:
+    if len(parsed) != len(ends):
+        raise ValueError("CSV records could not be split on line boundaries (bare CR line endings?)")
+    return zip(parsed, ends)
+
+
+def _iter_parsed(
+    csv_path: Path,
+    limit: int,
+    workers: int,
+    *,
+    start_offset: int = 0,
+    chunk_rows: int = 1000,
+) -> Iterator[tuple[Optional[_ParsedRecipe], int]]:
+    """Every source row from `start_offset` on, in order, as (parsed, end offset).
+
+    parsed is None where the row is skipped; the end offset is the position just
+    past the row, so ingest can resume there: the (uncompressed) byte offset for
+    CSV input, the row number for Parquet. With workers > 1 this is a pipeline:
+    this process streams raw chunks to a process pool and yields results in
+    order, keeping at most two chunks per worker in flight so memory stays flat
+    however large the file is.
+    """
+    with contextlib.ExitStack() as stack:
+        jobs: Iterator[tuple[Any, tuple[Any, ...], list[int]]]
+        if _is_parquet(csv_path):
+            def parquet_jobs() -> Iterator[tuple[Any, tuple[Any, ...], list[int]]]:
+                row = start_offset
+                for columns in _iter_parquet_columns(csv_path, chunk_rows, start_offset, limit):
+                    n = len(next(iter(columns.values()), []))
+                    yield _parse_columns, (columns,), list(range(row + 1, row + n + 1))
+                    row += n
+
+            jobs = parquet_jobs()
+        else:
+            f = stack.enter_context(_open_source(csv_path))
+            header = next(csv.reader([f.readline().decode("utf-8")]), [])
+            if start_offset:
+                _skip_to(f, start_offset)
+            jobs = (
+                (_parse_chunk, (header, chunk), ends)
+                for chunk, ends in _iter_record_chunks(f, chunk_rows, limit)
+            )
+
+        if workers <= 1:
+            for fn, args, ends in jobs:
+                yield from _with_offsets(fn(*args), ends)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight: deque[tuple[Future, list[int]]] = deque()
+            for fn, args, ends in jobs:
+                in_flight.append((pool.submit(fn, *args), ends))
+                if len(in_flight) >= workers * 2:
+                    future, done_ends = in_flight.popleft()
+                    yield from _with_offsets(future.result(), done_ends)
+            while in_flight:
+                future, done_ends = in_flight.popleft()
+                yield from _with_offsets(future.result(), done_ends)
+
+
+def _recipe_ids_before(csv_path: Path, offset: int) -> set[int]:
+    """RecipeIds of the parsed rows that end at or before `offset` (see _iter_parsed)."""
+    ids: set[int] = set()
+
+    def add(row: dict[str, Optional[str]]) -> None:
+        # Same rows as _parse_row keeps.
+        recipe_id = _recipe_id(row)
+        if recipe_id is not None and (row.get("Name") or "").strip():
+            ids.add(recipe_id)
+
+    if _is_parquet(csv_path):
+        for columns in _iter_parquet_columns(csv_path, 10_000, limit=offset, columns=["RecipeId", "Name"]):
+            names = list(columns)
+            for values in zip(*(_text_column(v) for v in columns.values())):
+                add(dict(zip(names, values)))
+        return ids
+
+    csv.field_size_limit(2**31 - 1)
+    with _open_source(csv_path) as f:
+        header = next(csv.reader([f.readline().decode("utf-8")]), [])
+        wanted = [(name, i) for i, name in enumerate(header) if name in ("RecipeId", "Name")]
+        for chunk, ends in _iter_record_chunks(f, 1000, 0):
+            records = csv.reader(io.StringIO(chunk.decode("utf-8"), newline=""))
+            for values, end in zip(records, ends):
+                if end > offset:
+                    return ids
+                add({name: values[i] for name, i in wanted if i < len(values)})
+    return ids
+
+
+def _load_ingredient_ids(db: Session) -> dict[str, int]:
+    """lower(name) -> id for every ingredient, in one query."""
+    key = func.lower(Ingredient.name)
+    return {name: ing_id for name, ing_id in db.execute(select(key, func.min(Ingredient.id)).group_by(key))}
+
+
+def _ingredient_ids(db: Session, cache: dict[str, int], names: Sequence[str]) -> list[Optional[int]]:
+    """Ingredient id per name (case-insensitive); missing ones are created in one INSERT."""
+    missing: dict[str, str] = {}
+    for name in names:
+        key = name.strip().lower()
+        if key and key not in cache and key not in missing:
+            missing[key] = name.strip()
+
+    if missing:
+        # NOT EXISTS, like the bulk path, so databases without the unique
+        # lower(name) index (see _ensure_ingredient_name_index) work too; the
+        # bare ON CONFLICT skips concurrent inserts where the index exists.
+        name_rows = sa_values(column("name", String), name="names").data([(n,) for n in missing.values()])
+        key_col = func.lower(Ingredient.name)
+        stmt = (
+            insert(Ingredient)
+            .from_select(
+                ["name", "category", "unit", "calories_per_unit", "protein_per_unit", "carbs_per_unit", "fat_per_unit"],
+                select(
+                    name_rows.c.name,
+                    null(),
+                    literal("unit"),
+                    literal(0.0),
+                    literal(0.0),
+                    literal(0.0),
+                    literal(0.0),
+                ).where(~exists().where(key_col == func.lower(name_rows.c.name))),
+            )
+            .on_conflict_do_nothing()
+            .returning(Ingredient.id, Ingredient.name)
+        )
+        created = []
+        for ing_id, name in db.execute(stmt):
+            cache[name.lower()] = ing_id
+            created.append(ing_id)
+        IngredientRemapQueue.enqueue(db, created)
+        # Created by another writer since the cache was loaded.
+        conflicted = [key for key in missing if key not in cache]
+        if conflicted:
+            for ing_id, key in db.execute(select(Ingredient.id, key_col).where(key_col.in_(conflicted))):
+                cache.setdefault(key, ing_id)
+
+    return [cache.get(name.strip().lower()) for name in names]
 
 
 def seed_recipes(
@@ -193,7 +584,8 @@ def seed_recipes(
     Base.metadata.create_all(bind=engine)
     db = SessionLocal()
     try:
-        ing_cache: dict[str, int] = {}
+        # Every known ingredient up front, so only new names cost a round trip.
+        ing_cache: dict[str, int] = _load_ingredient_ids(db) if create_ingredients else {}
 
         inserted = 0
         nutrition_upserts = 0
@@ -201,92 +593,61 @@ def seed_recipes(
         diet_updates = 0
         ops = 0
         seen = 0
+        # Recipes added since the last flush; db.get() does not see them.
+        unflushed_ids: set[int] = set()
+        # Recipes this run inserted or changed; only these are refreshed.
+        written_ids: set[int] = set()
 
         for row in _iter_rows(csv_path):
             if limit and seen >= limit:
                 break
 
             seen += 1
-            rid = row.get("RecipeId")
-            if not rid:
-                continue
-
-            try:
-                recipe_id = int(float(rid))
-            except ValueError:
+            recipe_id = _recipe_id(row)
+            if recipe_id is None:
                 continue
 
+            if recipe_id in unflushed_ids:
+                db.flush()
+                unflushed_ids.clear()
             existing = db.get(Recipe, recipe_id)
             if existing is not None and not (backfill_nutrition or backfill_ingredients or backfill_diet):
                 continue
 
-            name = (row.get("Name") or "").strip()
-            if not name:
+            parsed = _parse_row(row, recipe_id)
+            if parsed is None:
                 continue
 
-            description = (row.get("Description") or "").strip() or None
-            instructions_steps = _parse_c_list(row.get("RecipeInstructions"))
-            instructions = "\n".join(instructions_steps).strip() if instructions_steps else (row.get("RecipeInstructions") or "").strip()
-            if not instructions:
-                instructions = name
-
-            prep_time = _duration_to_minutes(row.get("PrepTime"))
-            cook_time = _duration_to_minutes(row.get("CookTime"))
-
-            servings_f = _safe_float(row.get("RecipeServings"))
-            servings = int(servings_f) if servings_f and servings_f > 0 else 1
-
-            image_url = _first_image_url(row.get("Images"))
-
-            category = row.get("RecipeCategory") or ""
-            keywords = " ".join(_parse_c_list(row.get("Keywords")))
-            ingredient_parts = _parse_c_list(row.get("RecipeIngredientParts"))
-            ingredient_quantities = _parse_c_list(row.get("RecipeIngredientQuantities"))
-
-            cuisine_type = _guess_cuisine(category, keywords)
-            is_vegetarian = _classify_is_vegetarian(
-                name=name,
-                category=category,
-                keywords=keywords,
-                ingredient_parts=ingredient_parts,
-            )
-
+            row_ops = ops
             recipe = existing
             if recipe is None:
                 recipe = Recipe(
                     id=recipe_id,
-                    name=name,
-                    description=description,
-                    instructions=instructions,
-                    prep_time=prep_time,
-                    cook_time=cook_time,
-                    servings=servings,
-                    cuisine_type=cuisine_type,
-                    is_vegetarian=is_vegetarian,
+                    name=parsed.name,
+                    description=parsed.description,
+                    instructions=parsed.instructions,
+                    prep_time=parsed.prep_time,
+                    cook_time=parsed.cook_time,
+                    servings=parsed.servings,
+                    cuisine_type=parsed.cuisine_type,
+                    is_vegetarian=parsed.is_vegetarian,
                     is_vegan=False,
                     is_gluten_free=False,
                     is_dairy_free=False,
-                    image_url=image_url,
+                    image_url=parsed.image_url,
                 )
                 db.add(recipe)
+                unflushed_ids.add(recipe_id)
                 inserted += 1
                 ops += 1
             elif backfill_diet:
-                if recipe.is_vegetarian != is_vegetarian:
-                    recipe.is_vegetarian = is_vegetarian
+                if recipe.is_vegetarian != parsed.is_vegetarian:
+                    recipe.is_vegetarian = parsed.is_vegetarian
                     diet_updates += 1
                     ops += 1
 
-            calories = _safe_float(row.get("Calories"))
-            protein = _safe_float(row.get("ProteinContent"))
-            carbs = _safe_float(row.get("CarbohydrateContent"))
-            fat = _safe_float(row.get("FatContent"))
-            fiber = _safe_float(row.get("FiberContent"))
-            sugar = _safe_float(row.get("SugarContent"))
-            sodium = _safe_float(row.get("SodiumContent"))
-
-            # NutritionalInfo columns are non-null for calories/protein/carbs/fat.
-            if calories is not None and protein is not None and carbs is not None and fat is not None:
+            if parsed.nutrition is not None:
+                calories, protein, carbs, fat, fiber, sugar, sodium = parsed.nutrition
                 existing_nut = db.query(RecipeNutritionalInfo).filter(RecipeNutritionalInfo.recipe_id == recipe_id).first()
                 if existing_nut is None:
                     nut = RecipeNutritionalInfo(
@@ -313,7 +674,7 @@ def seed_recipes(
                     nutrition_upserts += 1
                     ops += 1
 
-            if create_ingredients and ingredient_parts and (recipe is not None) and (existing is None or backfill_ingredients):
+            if create_ingredients and parsed.ingredients and (recipe is not None) and (existing is None or backfill_ingredients):
                 existing_links = set()
                 if existing is not None:
                     existing_links = {
@@ -322,20 +683,11 @@ def seed_recipes(
                         .filter(RecipeIngredient.recipe_id == recipe_id)
                         .all()
                     }
-                for idx, part in enumerate(ingredient_parts):
-                    try:
-                        ing_id = _get_or_create_ingredient(db, ing_cache, part)
-                    except ValueError:
-                        continue
-
-                    if ing_id in existing_links:
+                ing_ids = _ingredient_ids(db, ing_cache, [part for part, _ in parsed.ingredients])
+                for (part, qty_note), ing_id in zip(parsed.ingredients, ing_ids):
+                    if ing_id is None or ing_id in existing_links:
                         continue
 
-                    qty_note = None
-                    if idx < len(ingredient_quantities):
-                        qv = (ingredient_quantities[idx] or "").strip()
-                        if qv and qv.upper() != "NA":
-                            qty_note = qv
                     db.add(
                         RecipeIngredient(
                             recipe_id=recipe_id,
@@ -346,9 +698,19 @@ def seed_recipes(
                     )
                     ingredient_links += 1
                     ops += 1
+            if ops != row_ops:
+                written_ids.add(recipe_id)
             if commit_every and ops and ops % commit_every == 0:
                 db.commit()
+                unflushed_ids.clear()
 
+        db.flush()
+        if written_ids:
+            # New recipes/ingredients change which recipes each allergy excludes,
+            # and the denormalized result cards.
+            AllergyRecipeExclusion.refresh(db, recipe_ids=written_ids)
+            RecipeCard.refresh(db, written_ids)
+            CatalogVersion.bump(db)
         db.commit()
         print(
             f"Seed complete. Seen rows: {seen}, inserted recipes: {inserted}, "
@@ -360,12 +722,399 @@ def seed_recipes(
         db.close()
 
 
+# Bulk mode: parsed rows are COPYed into session-local staging tables (temp
+# tables, so unlogged and private to this run) and merged with set-based
+# statements, one transaction per batch.
+# Temp tables live as long as the pooled connection, so a second run in the
+# same process replaces them.
+_STAGING_DDL = (
+    "DROP TABLE IF EXISTS pg_temp.stage_recipes, pg_temp.stage_nutrition, pg_temp.stage_recipe_ingredients",
+    "CREATE TEMP TABLE stage_recipes AS SELECT r.*, true AS is_new, NULL::text AS content_hash "
+    "FROM recipes r WITH NO DATA",
+    "CREATE TEMP TABLE stage_nutrition AS SELECT recipe_id, calories, protein_g, carbs_g, fat_g, "
+    "fiber_g, sugar_g, sodium_mg FROM recipe_nutritional_info WITH NO DATA",
+    "CREATE TEMP TABLE stage_recipe_ingredients (recipe_id integer, seq integer, ord integer, name text, notes text)",
+)
+
+_RECIPE_COLUMNS = (
+    "id", "name", "description", "instructions", "prep_time", "cook_time", "servings", "cuisine_type",
+    "is_vegetarian", "is_vegan", "is_gluten_free", "is_dairy_free", "image_url",
+)
+_NUTRITION_COLUMNS = ("recipe_id", "calories", "protein_g", "carbs_g", "fat_g", "fiber_g", "sugar_g", "sodium_mg")
+_LINK_COLUMNS = ("recipe_id", "seq", "ord", "name", "notes")
+
+_STAGE_RECIPE_COLUMNS = _RECIPE_COLUMNS + ("content_hash",)
+# Recipe columns taken from the source row (the is_vegan/gluten/dairy flags are not).
+_SOURCE_RECIPE_COLUMNS = (
+    "name", "description", "instructions", "prep_time", "cook_time", "servings", "cuisine_type",
+    "is_vegetarian", "image_url",
+)
+
+_SKIP_UNCHANGED_SQL = """
+DELETE FROM stage_recipes s USING recipe_source_hashes h
+WHERE h.recipe_id = s.id AND h.content_hash = s.content_hash
+"""
+
+_MARK_NEW_SQL = "UPDATE stage_recipes s SET is_new = NOT EXISTS (SELECT 1 FROM recipes r WHERE r.id = s.id)"
+
+_INSERT_RECIPES_SQL = f"""
+INSERT INTO recipes ({", ".join(_RECIPE_COLUMNS)})
+SELECT {", ".join(_RECIPE_COLUMNS)} FROM stage_recipes WHERE is_new
+ON CONFLICT (id) DO NOTHING
+"""
+
+_BACKFILL_DIET_SQL = """
+UPDATE recipes r SET is_vegetarian = s.is_vegetarian
+FROM stage_recipes s
+WHERE r.id = s.id AND NOT s.is_new AND r.is_vegetarian IS DISTINCT FROM s.is_vegetarian
+"""
+
+# Incremental ingest rewrites changed recipes from their source row.
+_UPDATE_RECIPES_SQL = f"""
+UPDATE recipes r SET {", ".join(f"{c} = s.{c}" for c in _SOURCE_RECIPE_COLUMNS)}
+FROM stage_recipes s
+WHERE r.id = s.id AND NOT s.is_new
+"""
+
+# Changed recipes are rewritten in full: nutrition (and links, when ingredients
+# are ingested) are deleted here and re-inserted from the new row, so removed
+# ingredients, changed notes and dropped nutrition do not linger.
+_DELETE_CHANGED_NUTRITION_SQL = """
+DELETE FROM recipe_nutritional_info n USING stage_recipes s
+WHERE n.recipe_id = s.id AND NOT s.is_new
+"""
+_DELETE_CHANGED_LINKS_SQL = """
+DELETE FROM recipe_ingredients ri USING stage_recipes s
+WHERE ri.recipe_id = s.id AND NOT s.is_new
+"""
+
+# Hashes are recorded for rows applied in full: new recipes, and changed ones
+# when incremental.
+_UPSERT_HASHES_SQL = """
+INSERT INTO recipe_source_hashes (recipe_id, content_hash)
+SELECT id, content_hash FROM stage_recipes WHERE is_new OR :incremental
+ON CONFLICT (recipe_id) DO UPDATE SET content_hash = EXCLUDED.content_hash
+"""
+
+_UPSERT_NUTRITION_SQL = f"""
+INSERT INTO recipe_nutritional_info ({", ".join(_NUTRITION_COLUMNS)})
+SELECT {", ".join("n." + c for c in _NUTRITION_COLUMNS)}
+FROM stage_nutrition n JOIN stage_recipes s ON s.id = n.recipe_id
+ON CONFLICT (recipe_id) DO {{action}}
+"""
+_NUTRITION_UPDATE = "UPDATE SET " + ", ".join(f"{c} = EXCLUDED.{c}" for c in _NUTRITION_COLUMNS[1:])
+
+# New ingredient names keep the spelling of their first occurrence; existing
+# ones match case-insensitively, like _get_or_create_ingredient. New ids are
+# queued for allergy re-mapping.
+_INSERT_INGREDIENTS_SQL = """
+WITH created AS (
+    INSERT INTO ingredients (name, category, unit, calories_per_unit, protein_per_unit, carbs_per_unit, fat_per_unit)
+    SELECT DISTINCT ON (lower(l.name)) l.name, NULL, 'unit', 0.0, 0.0, 0.0, 0.0
+    FROM stage_recipe_ingredients l JOIN stage_recipes s ON s.id = l.recipe_id
+    WHERE (s.is_new OR :backfill)
+      AND NOT EXISTS (SELECT 1 FROM ingredients i WHERE lower(i.name) = lower(l.name))
+    ORDER BY lower(l.name), l.seq, l.ord
+    RETURNING id
+)
+INSERT INTO ingredient_remap_queue (ingredient_id) SELECT id FROM created
+"""
+
+_INSERT_LINKS_SQL = """
+INSERT INTO recipe_ingredients (recipe_id, ingredient_id, quantity, notes)
+SELECT l.recipe_id, i.id, 1.0, l.notes
+FROM stage_recipe_ingredients l
+JOIN stage_recipes s ON s.id = l.recipe_id
+JOIN (
+    SELECT lower(name) AS key, min(id) AS id FROM ingredients
+    WHERE lower(name) IN (SELECT lower(name) FROM stage_recipe_ingredients)
+    GROUP BY lower(name)
+) i ON i.key = lower(l.name)
+WHERE (s.is_new OR :backfill){existing_filter}
+ORDER BY l.seq, l.ord
+"""
+# Only backfilled recipes can already have links.
+_EXISTING_LINK_FILTER = """
+  AND NOT EXISTS (SELECT 1 FROM recipe_ingredients ri WHERE ri.recipe_id = l.recipe_id AND ri.ingredient_id = i.id)"""
+
+
+def _copy_value(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, str):
+        return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    return str(value)
+
+
+def _copy_rows(db: Session, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> None:
+    """COPY rows (text format) into `table` on the session's connection."""
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join(_copy_value(v) for v in row))
+        buf.write("\n")
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    cursor = db.connection().connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            buf.seek(0)
+            cursor.copy_expert(sql, buf)
+        else:  # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(buf.getvalue())
+    finally:
+        cursor.close()
+
+
+def _merge_batch(
+    db: Session,
+    batch: Sequence[tuple[int, _ParsedRecipe, int]],
+    *,
+    create_ingredients: bool,
+    backfill_nutrition: bool,
+    backfill_ingredients: bool,
+    backfill_diet: bool,
+    incremental: bool,
+) -> tuple[dict[str, int], list[int]]:
+    """Merge one batch; returns counts and the ids of the recipes it wrote."""
+    for table in ("stage_recipes", "stage_nutrition", "stage_recipe_ingredients"):
+        db.execute(text(f"TRUNCATE {table}"))
+
+    _copy_rows(
+        db,
+        "stage_recipes",
+        _STAGE_RECIPE_COLUMNS,
+        (
+            (
+                r.recipe_id, r.name, r.description, r.instructions, r.prep_time, r.cook_time, r.servings,
+                r.cuisine_type.name if r.cuisine_type is not None else None,
+                r.is_vegetarian, False, False, False, r.image_url, r.content_hash,
+            )
+            for _, r, _ in batch
+        ),
+    )
+    _copy_rows(
+        db,
+        "stage_nutrition",
+        _NUTRITION_COLUMNS,
+        ((r.recipe_id, *r.nutrition) for _, r, _ in batch if r.nutrition is not None),
+    )
+    if create_ingredients:
+        _copy_rows(
+            db,
+            "stage_recipe_ingredients",
+            _LINK_COLUMNS,
+            (
+                (r.recipe_id, seq, ord_, part, notes)
+                for seq, r, _ in batch
+                for ord_, (part, notes) in enumerate(r.ingredients)
+            ),
+        )
+
+    counts = {"unchanged": 0, "updated": 0, "diet_updates": 0, "ingredient_links": 0}
+    if incremental:
+        counts["unchanged"] = db.execute(text(_SKIP_UNCHANGED_SQL)).rowcount
+        # Changed rows replace the recipe, its nutrition and its links.
+        backfill_nutrition = backfill_ingredients = True
+        backfill_diet = False
+    db.execute(text(_MARK_NEW_SQL))
+    if not (backfill_nutrition or backfill_ingredients or backfill_diet):
+        # Existing recipes are left untouched unless a backfill was asked for.
+        db.execute(text("DELETE FROM stage_recipes WHERE NOT is_new"))
+
+    counts["inserted"] = db.execute(text(_INSERT_RECIPES_SQL)).rowcount
+    if incremental:
+        counts["updated"] = db.execute(text(_UPDATE_RECIPES_SQL)).rowcount
+        db.execute(text(_DELETE_CHANGED_NUTRITION_SQL))
+        if create_ingredients:
+            db.execute(text(_DELETE_CHANGED_LINKS_SQL))
+    if backfill_diet:
+        counts["diet_updates"] = db.execute(text(_BACKFILL_DIET_SQL)).rowcount
+    action = _NUTRITION_UPDATE if backfill_nutrition else "NOTHING"
+    counts["nutrition_upserts"] = db.execute(text(_UPSERT_NUTRITION_SQL.format(action=action))).rowcount
+    if create_ingredients:
+        params = {"backfill": backfill_ingredients}
+        db.execute(text(_INSERT_INGREDIENTS_SQL), params)
+        # Incremental runs deleted the links of the recipes they rewrite.
+        existing_filter = _EXISTING_LINK_FILTER if backfill_ingredients and not incremental else ""
+        links_sql = _INSERT_LINKS_SQL.format(existing_filter=existing_filter)
+        counts["ingredient_links"] = db.execute(text(links_sql), params).rowcount
+    db.execute(text(_UPSERT_HASHES_SQL), {"incremental": incremental})
+    touched = list(db.execute(text("SELECT id FROM stage_recipes")).scalars())
+    return counts, touched
+
+
+def _load_checkpoint(path: Path, csv_path: Path) -> Optional[dict[str, Any]]:
+    if not path.exists():
+        return None
+    checkpoint = json.loads(path.read_text())
+    stat = csv_path.stat()
+    if checkpoint.get("source") != [str(csv_path.resolve()), stat.st_size, stat.st_mtime_ns]:
+        print(f"Ignoring checkpoint {path}: it was written for a different file")
+        return None
+    return checkpoint
+
+
+def _write_checkpoint(path: Path, csv_path: Path, offset: int, seen: int) -> None:
+    stat = csv_path.stat()
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps({
+        "source": [str(csv_path.resolve()), stat.st_size, stat.st_mtime_ns],
+        "offset": offset,
+        "seen": seen,
+    }))
+    os.replace(tmp, path)
+
+
+def seed_recipes_bulk(
+    *,
+    csv_path: Path,
+    limit: int,
+    create_ingredients: bool,
+    backfill_nutrition: bool,
+    backfill_ingredients: bool,
+    backfill_diet: bool,
+    batch_size: int,
+    workers: int = 0,
+    incremental: bool = False,
+    checkpoint_path: Optional[Path] = None,
+) -> None:
+    """seed_recipes with COPY + set-based merges; same resulting rows and counts.
+
+    Rows are parsed by `workers` processes (see _iter_parsed) while this
+    process merges batches.
+
+    A repeated RecipeId is merged in a later batch than its first row, so it is
+    handled as an existing recipe, as in the row-by-row path.
+
+    incremental=True skips rows whose content hash matches the last ingest
+    and rewrites the recipe, nutrition and links of changed ones; cards are
+    rebuilt only for recipes that were written. With `checkpoint_path`, the
+    offset of the last committed row (see _iter_parsed) is saved after every
+    batch, and a later run over the same unmodified file resumes from there.
+    """
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        for ddl in _STAGING_DDL:
+            db.execute(text(ddl))
+
+        checkpoint = _load_checkpoint(checkpoint_path, csv_path) if checkpoint_path else None
+        start_offset, seen = (checkpoint["offset"], checkpoint["seen"]) if checkpoint else (0, 0)
+        if checkpoint:
+            print(f"Resuming after row {seen} (offset {start_offset})")
+
+        totals = {
+            "inserted": 0, "updated": 0, "unchanged": 0,
+            "nutrition_upserts": 0, "ingredient_links": 0, "diet_updates": 0,
+        }
+        # Recipes written by non-incremental batches, refreshed once at the end.
+        written: list[int] = []
+        touched = 0
+        # (row number, parsed row, byte offset where the row starts)
+        batch: list[tuple[int, _ParsedRecipe, int]] = []
+        batch_ids: set[int] = set()
+        repeated: list[tuple[int, _ParsedRecipe, int]] = []
+        # Incremental runs apply only the first row of a RecipeId; otherwise
+        # repeated rows with different hashes would rewrite it on every run.
+        first_rows: set[int] = set()
+        if incremental and start_offset:
+            first_rows = _recipe_ids_before(csv_path, start_offset)
+        read_offset = start_offset
+        started = time.perf_counter()
+
+        def flush() -> None:
+            nonlocal touched
+            counts, ids = _merge_batch(
+                db,
+                batch,
+                create_ingredients=create_ingredients,
+                backfill_nutrition=backfill_nutrition,
+                backfill_ingredients=backfill_ingredients,
+                backfill_diet=backfill_diet,
+                incremental=incremental,
+            )
+            if incremental:
+                AllergyRecipeExclusion.refresh(db, recipe_ids=ids)
+                RecipeCard.refresh(db, ids)
+            else:
+                written.extend(ids)
+            db.commit()
+            touched += len(ids)
+            for key, value in counts.items():
+                totals[key] += value
+            batch.clear()
+            batch_ids.clear()
+            held = list(repeated)
+            repeated.clear()
+            if checkpoint_path:
+                # Everything before the first held-back row is committed.
+                if held:
+                    _write_checkpoint(checkpoint_path, csv_path, held[0][2], held[0][0] - 1)
+                else:
+                    _write_checkpoint(checkpoint_path, csv_path, read_offset, seen)
+            for item in held:
+                add(item)
+            elapsed = time.perf_counter() - started
+            print(f"  {seen} rows read, {totals['inserted']} recipes inserted, {seen / elapsed:,.0f} rows/s")
+
+        def add(item: tuple[int, _ParsedRecipe, int]) -> None:
+            if item[1].recipe_id in batch_ids:
+                repeated.append(item)
+            else:
+                batch_ids.add(item[1].recipe_id)
+                batch.append(item)
+
+        remaining = limit - seen if limit else 0
+        if not limit or remaining > 0:
+            for parsed, end in _iter_parsed(csv_path, remaining, workers, start_offset=start_offset):
+                seen += 1
+                row_start, read_offset = read_offset, end
+                if parsed is None:
+                    continue
+                if incremental:
+                    if parsed.recipe_id in first_rows:
+                        continue
+                    first_rows.add(parsed.recipe_id)
+                add((seen, parsed, row_start))
+                if len(batch) >= batch_size:
+                    flush()
+            while batch:
+                flush()
+
+        if touched or checkpoint:
+            # Incremental batches refreshed their own recipes' exclusions,
+            # masks and cards as they committed.
+            if checkpoint and not incremental:
+                # The interrupted run committed batches it never refreshed.
+                AllergyRecipeExclusion.refresh(db)
+                RecipeCard.refresh(db)
+            elif written:
+                AllergyRecipeExclusion.refresh(db, recipe_ids=written)
+                RecipeCard.refresh(db, written)
+            CatalogVersion.bump(db)
+            db.commit()
+        if checkpoint_path and checkpoint_path.exists():
+            checkpoint_path.unlink()
+        elapsed = time.perf_counter() - started
+        changes = f"updated recipes: {totals['updated']}, unchanged rows: {totals['unchanged']}, " if incremental else ""
+        print(
+            f"Seed complete. Seen rows: {seen}, inserted recipes: {totals['inserted']}, {changes}"
+            f"nutrition upserts: {totals['nutrition_upserts']}, ingredient links: {totals['ingredient_links']}, "
+            f"diet updates: {totals['diet_updates']} ({elapsed:.1f}s, {seen / max(elapsed, 1e-9):,.0f} rows/s)"
+        )
+    finally:
+        db.close()
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "--csv",
         dest="csv_path",
         default=str(Path(__file__).resolve().parents[3] / "data" / "raw" / "recipes.csv"),
+        help="recipes file: .csv, .csv.gz, .csv.zst (needs zstandard) or .parquet (needs pyarrow)",
     )
     parser.add_argument("--limit", type=int, default=2000)
     parser.add_argument("--create-ingredients", action="store_true")
@@ -373,12 +1122,36 @@ def main() -> None:
     parser.add_argument("--backfill-ingredients", action="store_true")
     parser.add_argument("--backfill-diet", action="store_true")
     parser.add_argument("--commit-every", type=int, default=250)
+    parser.add_argument("--bulk", action="store_true", help="COPY into staging tables and merge set-based")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per --bulk merge")
+    parser.add_argument("--workers", type=int, default=0, help="parser processes for --bulk (0: parse inline)")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="bulk mode that skips rows unchanged since the last ingest and rewrites changed ones",
+    )
+    parser.add_argument("--checkpoint", help="bulk mode progress file; an interrupted run resumes from it")
     args = parser.parse_args()
 
     csv_path = Path(args.csv_path)
     if not csv_path.exists():
         raise FileNotFoundError(str(csv_path))
 
+    if args.bulk or args.incremental or args.checkpoint:
+        seed_recipes_bulk(
+            csv_path=csv_path,
+            limit=args.limit,
+            create_ingredients=args.create_ingredients,
+            backfill_nutrition=bool(args.backfill_nutrition),
+            backfill_ingredients=bool(args.backfill_ingredients),
+            backfill_diet=bool(args.backfill_diet),
+            batch_size=max(args.batch_size, 1),
+            workers=args.workers,
+            incremental=bool(args.incremental),
+            checkpoint_path=Path(args.checkpoint) if args.checkpoint else None,
+        )
+        return
+
     seed_recipes(
         csv_path=csv_path,
         limit=args.limit,
@@ -0,0 +1,34 @@
+"""Per-recipe source row hashes for incremental ingest
+
+Revision ID: 3d8b6e0f4a25
+Revises: 9a4f1c7e2b60
+Create Date: 2026-10-19 15:21:09.402716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d8b6e0f4a25'
+down_revision: Union[str, Sequence[str], None] = '9a4f1c7e2b60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'recipe_source_hashes',
+        sa.Column('recipe_id', sa.Integer(), nullable=False),
+        sa.Column('content_hash', sa.String(length=32), nullable=False),
+        sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('recipe_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('recipe_source_hashes')
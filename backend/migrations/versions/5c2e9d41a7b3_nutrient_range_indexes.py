@@ -0,0 +1,70 @@
+"""Nutrient range indexes for search filters
+
+Revision ID: 5c2e9d41a7b3
+Revises: d5a7b3e6c210
+Create Date: 2026-10-19 10:12:44.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e9d41a7b3'
+down_revision: Union[str, Sequence[str], None] = 'd5a7b3e6c210'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CALORIE_BUCKET_SQL = (
+    "CASE WHEN calories < 400 THEN 'low' "
+    "WHEN calories <= 700 THEN 'medium' "
+    "WHEN calories > 700 THEN 'high' END"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'recipe_nutritional_info',
+        sa.Column('calorie_bucket', sa.String(), sa.Computed(CALORIE_BUCKET_SQL, persisted=True), nullable=True),
+    )
+    op.create_index(
+        'ix_recipe_nutrition_bucket_recipe',
+        'recipe_nutritional_info',
+        ['calorie_bucket', 'recipe_id'],
+        unique=False,
+        postgresql_include=['protein_g', 'carbs_g'],
+    )
+    op.create_index(
+        'ix_recipe_nutrition_high_protein',
+        'recipe_nutritional_info',
+        ['recipe_id', 'calorie_bucket'],
+        unique=False,
+        postgresql_where=sa.text('protein_g >= 20'),
+    )
+    op.create_index(
+        'ix_recipe_nutrition_low_carb',
+        'recipe_nutritional_info',
+        ['recipe_id', 'calorie_bucket'],
+        unique=False,
+        postgresql_where=sa.text('carbs_g <= 30'),
+    )
+    op.create_index(
+        'ix_recipe_nutrition_high_protein_low_carb',
+        'recipe_nutritional_info',
+        ['recipe_id', 'calorie_bucket'],
+        unique=False,
+        postgresql_where=sa.text('protein_g >= 20 AND carbs_g <= 30'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_recipe_nutrition_high_protein_low_carb', table_name='recipe_nutritional_info')
+    op.drop_index('ix_recipe_nutrition_low_carb', table_name='recipe_nutritional_info')
+    op.drop_index('ix_recipe_nutrition_high_protein', table_name='recipe_nutritional_info')
+    op.drop_index('ix_recipe_nutrition_bucket_recipe', table_name='recipe_nutritional_info')
+    op.drop_column('recipe_nutritional_info', 'calorie_bucket')
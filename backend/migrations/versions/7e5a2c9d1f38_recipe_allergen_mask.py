@@ -0,0 +1,52 @@
+"""Recipe allergen bitmask and per-allergy mask bits
+
+Revision ID: 7e5a2c9d1f38
+Revises: 3d8b6e0f4a25
+Create Date: 2026-10-19 18:02:44.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e5a2c9d1f38'
+down_revision: Union[str, Sequence[str], None] = '3d8b6e0f4a25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('recipes', sa.Column('allergen_mask', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('allergies', sa.Column('mask_bit', sa.SmallInteger(), nullable=True))
+    op.create_unique_constraint('allergies_mask_bit_key', 'allergies', ['mask_bit'])
+    # Bits 0..62 to the first 63 allergies, then masks from the current exclusions.
+    op.execute(
+        """
+        UPDATE allergies a SET mask_bit = n.rn - 1
+        FROM (SELECT id, row_number() OVER (ORDER BY id) AS rn FROM allergies) n
+        WHERE a.id = n.id AND n.rn <= 63
+        """
+    )
+    op.execute(
+        """
+        UPDATE recipes r SET allergen_mask = m.bits
+        FROM (
+            SELECT e.recipe_id, bit_or(1::bigint << a.mask_bit) AS bits
+            FROM allergy_recipe_exclusions e JOIN allergies a ON a.id = e.allergy_id
+            WHERE a.mask_bit IS NOT NULL
+            GROUP BY e.recipe_id
+        ) m
+        WHERE r.id = m.recipe_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('allergies_mask_bit_key', 'allergies', type_='unique')
+    op.drop_column('allergies', 'mask_bit')
+    op.drop_column('recipes', 'allergen_mask')
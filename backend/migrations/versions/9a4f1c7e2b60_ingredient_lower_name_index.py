@@ -0,0 +1,33 @@
+"""Unique case-insensitive ingredient names
+
+Revision ID: 9a4f1c7e2b60
+Revises: 5c2e9d41a7b3
+Create Date: 2026-10-19 14:03:27.551902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4f1c7e2b60'
+down_revision: Union[str, Sequence[str], None] = '5c2e9d41a7b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'uq_ingredients_lower_name',
+        'ingredients',
+        [sa.text('lower(name)')],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_ingredients_lower_name', table_name='ingredients')
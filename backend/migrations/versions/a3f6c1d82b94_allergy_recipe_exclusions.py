@@ -0,0 +1,44 @@
+"""Materialized allergy -> excluded recipe table
+
+Revision ID: a3f6c1d82b94
+Revises: e1b3779c9677
+Create Date: 2026-10-19 09:31:52.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f6c1d82b94'
+down_revision: Union[str, Sequence[str], None] = 'e1b3779c9677'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'allergy_recipe_exclusions',
+        sa.Column('allergy_id', sa.Integer(), nullable=False),
+        sa.Column('recipe_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['allergy_id'], ['allergies.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('allergy_id', 'recipe_id'),
+    )
+    op.create_index(
+        'ix_allergy_recipe_exclusions_recipe_allergy',
+        'allergy_recipe_exclusions',
+        ['recipe_id', 'allergy_id'],
+        unique=False,
+    )
+    # Rows are filled by AllergyRecipeExclusion.refresh(), which bootstrap
+    # runs (python -m app.scripts.bootstrap).
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_allergy_recipe_exclusions_recipe_allergy', table_name='allergy_recipe_exclusions')
+    op.drop_table('allergy_recipe_exclusions')
@@ -0,0 +1,34 @@
+"""Queue of new ingredients awaiting allergy re-mapping
+
+Revision ID: b4d7e1a9c352
+Revises: 7e5a2c9d1f38
+Create Date: 2026-10-19 20:41:07.532914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4d7e1a9c352'
+down_revision: Union[str, Sequence[str], None] = '7e5a2c9d1f38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'ingredient_remap_queue',
+        sa.Column('ingredient_id', sa.Integer(), nullable=False),
+        sa.Column('queued_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['ingredient_id'], ['ingredients.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('ingredient_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('ingredient_remap_queue')
@@ -0,0 +1,60 @@
+"""Denormalized recipe_cards table for search and list results
+
+Revision ID: c8e2f5a19d07
+Revises: a3f6c1d82b94
+Create Date: 2026-10-19 09:48:15.227391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e2f5a19d07'
+down_revision: Union[str, Sequence[str], None] = 'a3f6c1d82b94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # cuisinetype already exists (recipes.cuisine_type).
+    cuisine_type = postgresql.ENUM(
+        'INDIAN', 'ITALIAN', 'MEXICAN', 'CHINESE', 'JAPANESE', 'THAI', 'MEDITERRANEAN', 'AMERICAN', 'OTHER',
+        name='cuisinetype',
+        create_type=False,
+    )
+    op.create_table(
+        'recipe_cards',
+        sa.Column('recipe_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('image_url', sa.String(), nullable=True),
+        sa.Column('prep_time', sa.Integer(), nullable=True),
+        sa.Column('cook_time', sa.Integer(), nullable=True),
+        sa.Column('total_time', sa.Integer(), nullable=True),
+        sa.Column('servings', sa.Integer(), nullable=True),
+        sa.Column('cuisine_type', cuisine_type, nullable=True),
+        sa.Column('is_vegetarian', sa.Boolean(), nullable=True),
+        sa.Column('calories', sa.Float(), nullable=True),
+        sa.Column('protein_g', sa.Float(), nullable=True),
+        sa.Column('carbs_g', sa.Float(), nullable=True),
+        sa.Column('fat_g', sa.Float(), nullable=True),
+        sa.Column('fiber_g', sa.Float(), nullable=True),
+        sa.Column('sugar_g', sa.Float(), nullable=True),
+        sa.Column('sodium_mg', sa.Float(), nullable=True),
+        sa.Column('ingredients', postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column('ingredient_lines', postgresql.ARRAY(sa.String()), nullable=True),
+        sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('recipe_id'),
+    )
+    # Cards are built by RecipeCard.refresh(): seed_recipes after ingest, and
+    # bootstrap for any recipe without one.
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('recipe_cards')
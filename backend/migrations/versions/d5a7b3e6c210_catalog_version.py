@@ -0,0 +1,35 @@
+"""Catalog version counter keying search result caches
+
+Revision ID: d5a7b3e6c210
+Revises: c8e2f5a19d07
+Create Date: 2026-10-19 10:03:27.815460
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a7b3e6c210'
+down_revision: Union[str, Sequence[str], None] = 'c8e2f5a19d07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Single row (id=1), upserted by CatalogVersion.bump(); a missing row reads as version 0.
+    op.create_table(
+        'catalog_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('catalog_version')
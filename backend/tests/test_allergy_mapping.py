@@ -0,0 +1,25 @@
+from sqlalchemy import select
+
+from app.api.v1.allergies import auto_map
+from app.models.allergy import Allergy
+from app.models.ingredient import Ingredient
+
+
+def test_auto_map_uses_allergy_aliases(db, make_row, ingest_csv):
+    ingest_csv(
+        [
+            make_row(1, ["cheddar cheese", "salt"], ["1", "1"]),
+            make_row(2, ["whole milk", "oats"], ["1", "1"]),
+        ]
+    )
+    allergy = Allergy(name="Milk")
+    db.add(allergy)
+    db.commit()
+
+    out = auto_map(allergy.id, limit=25, db=db, current_user=None)
+    ids = dict(db.execute(select(Ingredient.name, Ingredient.id)).all())
+    # "cheese" is one of milk's aliases; the name alone would only find whole milk.
+    assert out.ingredient_ids == sorted([ids["cheddar cheese"], ids["whole milk"]])
+
+    # map_ingredients counts only new mappings.
+    assert Allergy.map_ingredients(db, [(allergy.id, i) for i in ids.values()]) == 2
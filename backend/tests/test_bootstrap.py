@@ -0,0 +1,35 @@
+from sqlalchemy import text
+
+from app.db.bootstrap import bootstrap
+
+
+def _state(db) -> tuple[int, int]:
+    db.rollback()
+    version = db.execute(text("SELECT coalesce(max(version), 0) FROM catalog_version")).scalar()
+    exclusions = db.execute(text("SELECT count(*) FROM allergy_recipe_exclusions")).scalar()
+    return version, exclusions
+
+
+def test_bootstrap_refreshes_only_when_something_changed(db, make_row, ingest_csv):
+    ingest_csv(
+        [
+            make_row(1, ["butter", "rice"], ["1", "1"]),
+            make_row(2, ["egg", "onion"], ["2", "1"]),
+            make_row(3, ["rice", "salt"], ["1", "1"]),
+        ]
+    )
+
+    # First run adds the default allergies and builds their exclusions.
+    assert bootstrap()
+    version, exclusions = _state(db)
+    assert exclusions == 2
+
+    # Nothing changed: no refresh and no catalog version bump.
+    assert bootstrap()
+    assert _state(db) == (version, exclusions)
+
+    # An emptied exclusion table (e.g. created by a migration) is rebuilt.
+    db.execute(text("DELETE FROM allergy_recipe_exclusions"))
+    db.commit()
+    assert bootstrap()
+    assert _state(db) == (version + 1, exclusions)
@@ -0,0 +1,30 @@
+import threading
+
+from app.core.config import settings
+from app.features.search import service
+
+
+def test_slow_batch_counts_as_one_breaker_failure(monkeypatch):
+    release = threading.Event()
+    started: list[str] = []
+
+    def slow_parse(query, api_key, model_name):
+        started.append(query)
+        release.wait(5)
+        return None
+
+    failures: list[int] = []
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "GEMINI_TIMEOUT_SECONDS", 0.2)
+    monkeypatch.setattr(service, "_llm_parse", slow_parse)
+    monkeypatch.setattr(service._gemini_breaker, "record_failure", lambda: failures.append(1))
+    try:
+        queries = [f"query {i}" for i in range(service.MAX_BATCH_QUERIES)]
+        results = service._parse_queries(queries)
+    finally:
+        release.set()
+
+    assert [source for _, source in results] == ["fallback"] * len(queries)
+    # Every call started together on the pool, and the batch is one failure.
+    assert len(started) == len(queries)
+    assert failures == [1]
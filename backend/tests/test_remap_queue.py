@@ -0,0 +1,31 @@
+from sqlalchemy import select
+
+from app.features.catalog.remap import drain_remap_queue
+from app.models.allergy import Allergy, AllergyIngredientMap, AllergyRecipeExclusion
+from app.models.ingredient import Ingredient
+
+
+def test_drain_maps_every_queued_match_in_batches(db, make_row, ingest_csv, monkeypatch):
+    db.add(Allergy(name="milk"))
+    db.commit()
+    cheeses = ["cheddar cheese", "cream cheese", "goat cheese", "feta cheese", "blue cheese"]
+    ingest_csv([make_row(i, [name, "salt"], ["1", "1"]) for i, name in enumerate(cheeses, start=1)])
+
+    limits: list = []
+    map_by_terms = Allergy.map_ingredients_by_terms
+
+    def spy(db, terms, limit=None, **kwargs):
+        limits.append(limit)
+        return map_by_terms(db, terms, limit, **kwargs)
+
+    monkeypatch.setattr(Allergy, "map_ingredients_by_terms", staticmethod(spy))
+    # Six new ingredients (five cheeses and salt), two per batch.
+    assert drain_remap_queue(db, batch_size=2) == (6, 5)
+    assert limits == [2, 2, 2]
+
+    mapped = db.execute(
+        select(Ingredient.name).join(AllergyIngredientMap, AllergyIngredientMap.ingredient_id == Ingredient.id)
+    ).scalars()
+    assert sorted(mapped) == sorted(cheeses)
+    excluded = db.execute(select(AllergyRecipeExclusion.recipe_id)).scalars()
+    assert sorted(excluded) == [1, 2, 3, 4, 5]
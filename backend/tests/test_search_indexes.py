@@ -0,0 +1,25 @@
+from app.features.search.service import _tier_conditions
+from app.scripts.check_search_indexes import nutrition_scans, tier_plans
+
+
+def _expected_index(tier) -> str:
+    if tier.high_protein and tier.low_carb:
+        return "ix_recipe_nutrition_high_protein_low_carb"
+    if tier.high_protein:
+        return "ix_recipe_nutrition_high_protein"
+    if tier.low_carb:
+        return "ix_recipe_nutrition_low_carb"
+    return "ix_recipe_nutrition_bucket_recipe"
+
+
+def test_every_nutrition_tier_uses_its_index(db):
+    checked = 0
+    for label, tier, plan in tier_plans(db):
+        if not _tier_conditions(tier):
+            continue
+        scans = nutrition_scans(plan)
+        assert not any(s.startswith("Seq Scan") for s in scans), (label, scans)
+        # Macro tiers read their partial index; calorie-only tiers the bucket index.
+        assert any(f"({_expected_index(tier)})" in s for s in scans), (label, scans)
+        checked += 1
+    assert checked == 45
@@ -0,0 +1,44 @@
+from sqlalchemy import event
+
+from app.features.search import service
+from app.models.user import User
+
+
+def test_search_nl_runs_one_candidate_query_per_page(db, db_engine, make_row, ingest_csv):
+    ingest_csv(
+        [
+            make_row(i, ["onion", "rice"], ["1", "1"], calories=str(100 + 60 * i), name=f"Rice bowl {i}", protein=str(5 * i))
+            for i in range(1, 13)
+        ]
+    )
+    user = User(email="search@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    service._result_cache.clear()
+    service._search_states.clear()
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db_engine, "before_cursor_execute", record)
+    try:
+        # Keyword terms, the high-protein relaxation cascade, and the calorie-bucket tiers.
+        for query in ["rice bowl", "high protein rice", "low calorie"]:
+            seen: list[int] = []
+            cursor = None
+            while True:
+                statements.clear()
+                _, _, results, cursor = service.search_nl(db, user, query, 5, cursor)
+                candidates = [s for s in statements if "FROM recipe_cards" in s]
+                assert len(candidates) == 1, (query, len(seen), candidates)
+                # The user's profile is read once, on first pages only.
+                profiles = [s for s in statements if "FROM user_profiles" in s]
+                assert len(profiles) == (0 if seen else 1), (query, len(seen), profiles)
+                seen.extend(r.id for r in results)
+                if cursor is None:
+                    break
+            assert len(seen) == len(set(seen)) == 12, query
+    finally:
+        event.remove(db_engine, "before_cursor_execute", record)
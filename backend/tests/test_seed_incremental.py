@@ -0,0 +1,72 @@
+from sqlalchemy import select, text
+
+from app.db.bootstrap import bootstrap
+from app.models.ingredient import Ingredient, RecipeIngredient
+from app.models.recipe import RecipeNutritionalInfo
+
+
+def _snapshot(db) -> tuple[list, list]:
+    db.rollback()
+    links = db.execute(
+        select(RecipeIngredient.recipe_id, Ingredient.name, RecipeIngredient.notes)
+        .join(Ingredient, Ingredient.id == RecipeIngredient.ingredient_id)
+        .order_by(RecipeIngredient.recipe_id, Ingredient.name)
+    ).all()
+    nutrition = db.execute(
+        select(RecipeNutritionalInfo.recipe_id, RecipeNutritionalInfo.calories).order_by(
+            RecipeNutritionalInfo.recipe_id
+        )
+    ).all()
+    return links, nutrition
+
+
+def test_incremental_rewrites_links_and_nutrition_of_changed_rows(db, make_row, ingest_csv):
+    original = [
+        make_row(1, ["onion", "garlic", "chickpeas"], ["1", "2", "1 cup"]),
+        make_row(2, ["rice", "salt"], ["1", "1"]),
+    ]
+    # Recipe 1 drops garlic, changes a quantity and loses its nutrition.
+    changed = [
+        make_row(1, ["onion", "chickpeas"], ["1", "2 cups"], calories=""),
+        make_row(2, ["rice", "salt"], ["1", "1"]),
+    ]
+
+    ingest_csv(original, name="v1.csv", incremental=True)
+    ingest_csv(changed, name="v2.csv", incremental=True)
+    links, nutrition = _snapshot(db)
+
+    assert [tuple(r) for r in links if r[0] == 1] == [(1, "chickpeas", "2 cups"), (1, "onion", "1")]
+    assert [tuple(r) for r in nutrition] == [(2, 250.0)]
+
+    # Same rows as a fresh ingest of the changed file.
+    db.execute(text("TRUNCATE recipes, recipe_source_hashes RESTART IDENTITY CASCADE"))
+    db.commit()
+    ingest_csv(changed, name="v2.csv")
+    assert _snapshot(db) == (links, nutrition)
+
+
+def test_bulk_rerun_without_new_rows_leaves_catalog_alone(db, make_row, ingest_csv):
+    rows = [
+        make_row(1, ["butter", "rice"], ["1", "1"]),
+        make_row(2, ["rice", "salt"], ["1", "1"]),
+    ]
+    ingest_csv(rows)
+    assert bootstrap()
+
+    def state() -> tuple[int, int, int]:
+        db.rollback()
+        return db.execute(
+            text(
+                "SELECT (SELECT coalesce(max(version), 0) FROM catalog_version),"
+                " (SELECT count(*) FROM allergy_recipe_exclusions),"
+                " (SELECT count(*) FROM recipe_cards)"
+            )
+        ).one()
+
+    version, exclusions, cards = state()
+    ingest_csv(rows)
+    assert state() == (version, exclusions, cards)
+
+    # Only the new recipe is refreshed, and the version moves once.
+    ingest_csv([*rows, make_row(3, ["egg", "butter"], ["2", "1"])])
+    assert state() == (version + 1, exclusions + 2, cards + 1)